@@ -1,9 +1,22 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+import json
+from typing import Any, Dict, List, Optional
 
-from app.models.ipo import IPOAnalysisRequest, IPOAnalysisResult, IPOScores
-from app.services.pdf_service import extract_pdf_text
-from app.services.ipo_analyzer import analyze_ipo_from_text
+from fastapi import APIRouter, UploadFile, File, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.models.ipo import BatchAnalysisResponse, IPOAnalysisRequest, IPOAnalysisResult
+from app.services.pdf_service import SpooledPDF, UploadTooLargeError, page_cache, spool_upload
+from app.services.analysis_pipeline import (
+    EmptyDocumentError,
+    PDFReadError,
+    run_analysis,
+    stream_analysis,
+)
+from app.services.batch_service import analyze_batch
+from app.services.ipo_analyzer import build_analysis_result
 from app.services.llm_service import LLMError
+from app.services.cache_service import analysis_cache
+from app.core.config import settings
 
 
 router = APIRouter(prefix="/ipo", tags=["ipo"])
@@ -11,10 +24,13 @@ router = APIRouter(prefix="/ipo", tags=["ipo"])
 
 @router.post("/analyze", response_model=IPOAnalysisResult)
 async def analyze_ipo(
+    response: Response,
     rhp: UploadFile = File(...),
 ):
     """
     Analyze IPO document. Takes only a PDF file and returns comprehensive analysis.
+    The X-Analysis-Path header says how it was produced (full, near_duplicate_rules,
+    near_duplicate_revised, cache_hit or coalesced).
     """
     # Basic file validations
     if rhp.content_type != "application/pdf":
@@ -23,20 +39,6 @@ async def analyze_ipo(
             detail="Uploaded file must be a PDF.",
         )
 
-    try:
-        rhp_text = await extract_pdf_text(rhp)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to read PDF: {e}",
-        )
-
-    if not rhp_text.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="RHP PDF appears to be empty or unreadable.",
-        )
-
     # Use default IPO data
     try:
         ipo_data = IPOAnalysisRequest(
@@ -52,8 +54,43 @@ async def analyze_ipo(
             detail=f"Invalid IPO data: {e}",
         )
 
+    # Stream the upload to disk, hashing it on the way
+    try:
+        spooled = await spool_upload(rhp, settings.MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+
+    try:
+        return await _analyze_spooled_pdf(spooled, ipo_data, response)
+    finally:
+        spooled.cleanup()
+
+
+async def _analyze_spooled_pdf(
+    spooled: SpooledPDF,
+    ipo_data: IPOAnalysisRequest,
+    response: Optional[Response] = None,
+) -> IPOAnalysisResult:
+    def progress(stage: str, details: Dict[str, Any]) -> None:
+        if stage == "analysis_path" and response is not None:
+            response.headers["X-Analysis-Path"] = details["path"]
+
     try:
-        analysis_dict = analyze_ipo_from_text(rhp_text, ipo_data)
+        analysis_dict = await run_analysis(spooled, ipo_data, progress)
+        return build_analysis_result(analysis_dict)
+    except PDFReadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read PDF: {e}",
+        )
+    except EmptyDocumentError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except LLMError as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -65,22 +102,100 @@ async def analyze_ipo(
             detail=f"Unexpected error during analysis: {e}",
         )
 
-    scores = analysis_dict["scores"]
-    financial_metrics_data = analysis_dict.get("financial_metrics", {})
-
-    result = IPOAnalysisResult(
-        company_overview=analysis_dict["company_overview"],
-        business_summary=analysis_dict["business_summary"],
-        financial_analysis=analysis_dict["financial_analysis"],
-        financial_metrics=financial_metrics_data,
-        key_strengths=analysis_dict["key_strengths"],
-        key_risks=analysis_dict["key_risks"],
-        valuation_analysis=analysis_dict["valuation_analysis"],
-        profit_potential=analysis_dict["profit_potential"],
-        investment_recommendation=analysis_dict["investment_recommendation"],
-        scores=IPOScores(**scores),
-        final_verdict=analysis_dict["final_verdict"],
-        final_comment=analysis_dict["final_comment"],
+
+@router.post("/analyze/stream")
+async def analyze_ipo_stream(
+    rhp: UploadFile = File(...),
+):
+    """
+    Streaming analysis as Server-Sent Events. Emits "stage" progress events,
+    a "field" event for each top-level result field as soon as the LLM has
+    generated it, then one "result" event with the final IPOAnalysisResult
+    (scores and verdict after the rules layer). Failures are sent as "error".
+    """
+    if rhp.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file must be a PDF.",
+        )
+
+    try:
+        spooled = await spool_upload(rhp, settings.MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+
+    async def event_stream():
+        try:
+            async for kind, payload in stream_analysis(spooled, IPOAnalysisRequest()):
+                if kind == "result":
+                    payload = build_analysis_result(payload).model_dump()
+                yield _sse(kind, payload)
+        except PDFReadError as e:
+            yield _sse("error", {"status_code": 500, "detail": f"Failed to read PDF: {e}"})
+        except EmptyDocumentError as e:
+            yield _sse("error", {"status_code": 400, "detail": str(e)})
+        except LLMError as e:
+            yield _sse("error", {"status_code": 502, "detail": f"LLM error: {e}"})
+        except Exception as e:
+            yield _sse("error", {"status_code": 500, "detail": f"Unexpected error during analysis: {e}"})
+        finally:
+            spooled.cleanup()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    return result
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_ipo_batch(
+    rhps: List[UploadFile] = File(...),
+):
+    """
+    Analyze several RHP PDFs in one request and return a ranked table of
+    verdicts and scores with per-document timings.
+    """
+    if len(rhps) > settings.BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_DOCUMENTS} documents per batch.",
+        )
+    for rhp in rhps:
+        if rhp.content_type != "application/pdf":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Uploaded file must be a PDF: {rhp.filename}",
+            )
+
+    documents = []
+    try:
+        for rhp in rhps:
+            try:
+                documents.append(await spool_upload(rhp, settings.MAX_UPLOAD_BYTES))
+            except UploadTooLargeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"{rhp.filename}: {e}",
+                )
+
+        return await analyze_batch(documents, IPOAnalysisRequest())
+    finally:
+        for document in documents:
+            document.cleanup()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters for the analysis result cache and the per-page
+    extracted text cache.
+    """
+    return {**analysis_cache.stats(), "page_text": page_cache.stats()}
@@ -0,0 +1,102 @@
+import json
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.config import settings
+from app.models.ipo import IPOAnalysisRequest
+from app.models.job import JobSubmitResponse, JobStatusResponse
+from app.services.job_service import JobQueueFullError, job_manager
+from app.services.pdf_service import UploadTooLargeError, spool_upload
+
+
+router = APIRouter(prefix="/ipo/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis_job(
+    rhp: UploadFile = File(...),
+):
+    """
+    Queue an IPO analysis and return its job id immediately.
+    Poll the status URL or follow the events URL for progress.
+    """
+    if rhp.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file must be a PDF.",
+        )
+
+    # Reject before spooling when there is no room in the queue
+    if job_manager.queue_depth >= job_manager.max_queue_depth:
+        return _queue_full_response()
+
+    try:
+        spooled = await spool_upload(rhp, settings.MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+
+    try:
+        job_id = await job_manager.submit(spooled, IPOAnalysisRequest())
+    except JobQueueFullError:
+        spooled.cleanup()
+        return _queue_full_response()
+
+    return JobSubmitResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"/api/v1/ipo/jobs/{job_id}",
+        events_url=f"/api/v1/ipo/jobs/{job_id}/events",
+    )
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_analysis_job(job_id: str):
+    """
+    Current status of an analysis job, with the result once completed.
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found.",
+        )
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_analysis_job_events(job_id: str):
+    """
+    Server-Sent Events stream of job progress: extraction, prompt building,
+    LLM call, rules layer, and finally completed/failed.
+    """
+    if await job_manager.get(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found.",
+        )
+
+    async def event_stream():
+        async for event in job_manager.events(job_id):
+            if event is None:
+                # Keep proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['seq']}\nevent: {event['stage']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _queue_full_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Analysis queue is full, please retry shortly."},
+        headers={"Retry-After": "30"},
+    )
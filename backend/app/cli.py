@@ -0,0 +1,67 @@
+"""
+Command line batch analysis.
+
+Usage (from backend/):
+    python -m app.cli rhp1.pdf rhp2.pdf ... [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, Any, List
+
+from app.core.log import setup_logging
+from app.models.ipo import IPOAnalysisRequest
+from app.services.batch_service import analyze_batch
+from app.services.llm_service import close_llm_clients
+from app.services.pdf_service import SpooledPDF, shutdown_pdf_pool
+
+
+def _print_table(batch: Dict[str, Any]) -> None:
+    header = f"{'#':>3}  {'verdict':<16} {'avg':>5} {'pages':>6} {'extract':>8} {'llm':>8} {'total':>8}  file"
+    print(header)
+    print("-" * len(header))
+    for item in batch["items"]:
+        timings = item["timings"]
+        verdict = item["final_verdict"] or "ERROR"
+        average = f"{item['average_score']:.1f}" if item["average_score"] is not None else "-"
+        pages = str(item["pages"]) if item["pages"] is not None else ("cache" if item["cached"] else "-")
+        print(
+            f"{item['rank']:>3}  {verdict:<16} {average:>5} {pages:>6} "
+            f"{timings['extract_seconds']:>7.1f}s {timings['llm_seconds']:>7.1f}s {timings['total_seconds']:>7.1f}s  "
+            f"{item['filename']}"
+        )
+        if item["error"]:
+            print(f"     {item['error']}")
+    print(f"\n{batch['succeeded']}/{batch['documents']} analysed in {batch['total_seconds']:.1f}s")
+
+
+async def _run(paths: List[str], llm_concurrency: int) -> Dict[str, Any]:
+    try:
+        documents = [SpooledPDF.from_path(path) for path in paths]
+        return await analyze_batch(documents, IPOAnalysisRequest(), llm_concurrency)
+    finally:
+        await close_llm_clients()
+        shutdown_pdf_pool()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze and rank several RHP PDFs.")
+    parser.add_argument("pdfs", nargs="+", help="RHP PDF files")
+    parser.add_argument("--json", dest="json_path", help="also write the full results to this file")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="parallel LLM calls")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    batch = asyncio.run(_run(args.pdfs, args.llm_concurrency))
+    _print_table(batch)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(batch, f, indent=2)
+
+    return 0 if batch["succeeded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,154 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o-mini"
 
+    # Logging: LOG_FORMAT is "text" (key=value) or "json". Prompt and
+    # document previews are only logged (at DEBUG) with LOG_PAYLOAD_PREVIEWS.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+    LOG_PAYLOAD_PREVIEWS: bool = False
+
+    # Provider SDKs, PDF libraries and numpy are imported on first use, so
+    # cold starts stay short. With WARMUP_ON_STARTUP they are loaded (and
+    # provider clients created) in the background at startup instead;
+    # GET /warmup does the same on demand, e.g. from a keep-warm ping.
+    WARMUP_ON_STARTUP: bool = False
+
+    # Adds a Server-Timing header with per-stage durations to API responses
+    # (not to streamed ones, whose headers are sent before the stages run)
+    SERVER_TIMING_HEADER: bool = False
+
+    # Providers tried in order when one fails (e.g. ["gemini", "groq"]);
+    # empty means just LLM_PROVIDER. Each gets LLM_MAX_ATTEMPTS attempts with
+    # exponential backoff and full jitter.
+    LLM_PROVIDER_CHAIN: List[str] = []
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 20.0
+
+    # A provider failing this many times in a row is skipped for
+    # LLM_BREAKER_RESET_SECONDS, then given one trial call
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Hedging: if the first provider has not answered after this many
+    # seconds, also ask the next one and use whichever answers first (0 = off)
+    LLM_HEDGE_DELAY_SECONDS: float = 0
+
+    # Request (RPM) and estimated prompt token (TPM) quotas per provider and
+    # across all providers; calls wait for quota in arrival order. 0 = unlimited.
+    GEMINI_RPM: float = 0
+    GEMINI_TPM: float = 0
+    GROQ_RPM: float = 0
+    GROQ_TPM: float = 0
+    LLM_GLOBAL_RPM: float = 0
+    LLM_GLOBAL_TPM: float = 0
+
+    # Thread pool size for LLM calls when a provider has no async client
+    LLM_EXECUTOR_WORKERS: int = 8
+
+    # Connection pool for the shared provider HTTP clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+
+    # Uploads are streamed to a temp file (UPLOAD_SPOOL_DIR, default system temp)
+    MAX_UPLOAD_BYTES: int = 150 * 1024 * 1024
+    UPLOAD_SPOOL_DIR: str = ""
+
+    # PDF extraction: "serial" or "parallel" (page ranges across a process pool)
+    PDF_EXTRACTION_MODE: str = "serial"
+    PDF_EXTRACTION_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 40
+
+    # Page text backend: "pdfium" or "pypdf" (fast, no layout analysis) or
+    # "pdfplumber". Fast output that looks garbled or table-heavy (more than
+    # PDF_FAST_TABLE_LINE_RATIO of lines mostly numbers) is redone with pdfplumber.
+    PDF_TEXT_EXTRACTOR: str = "pdfium"
+    PDF_FAST_MAX_GARBLED_RATIO: float = 0.02
+    PDF_FAST_TABLE_LINE_RATIO: float = 0.3
+
+    # Page triage: a cheap first pass maps pages to RHP sections (PDF outline,
+    # else the table of contents, else headings in the top
+    # PDF_TRIAGE_HEADER_BAND of each page) and only pages of sections weighted
+    # at least PDF_TRIAGE_MIN_SECTION_WEIGHT (see rhp_sections) are extracted.
+    # Documents under PDF_TRIAGE_MIN_PAGES or whose sections cannot be mapped
+    # are extracted in full.
+    PDF_PAGE_TRIAGE: bool = False
+    PDF_TRIAGE_MIN_PAGES: int = 40
+    PDF_TRIAGE_MIN_SECTION_WEIGHT: float = 0.7
+    PDF_TRIAGE_TOC_PAGES: int = 15
+    PDF_TRIAGE_HEADER_BAND: float = 0.15
+
+    # Scanned pages (images with under PDF_OCR_MIN_CHARS characters of text
+    # layer) are rendered at PDF_OCR_DPI and OCRed locally with Tesseract
+    # (needs pytesseract and the tesseract binary; logged and skipped when
+    # missing), at most PDF_OCR_MAX_PAGES per document, across the PDF
+    # process pool. OCR text is kept in the page text cache.
+    PDF_OCR_ENABLED: bool = True
+    PDF_OCR_LANG: str = "eng"
+    PDF_OCR_DPI: int = 200
+    PDF_OCR_MIN_CHARS: int = 20
+    PDF_OCR_MAX_PAGES: int = 100
+
+    # Per-page extracted text cache, keyed on each page's content stream hash,
+    # so re-uploads and revised RHPs only extract new or changed pages.
+    # An empty path disables it.
+    PAGE_CACHE_PATH: str = ".cache/page_text.sqlite3"
+    PAGE_CACHE_MAX_ENTRIES: int = 200000
+
+    # Near-duplicate reuse across DRHP/RHP versions: MinHash signatures of
+    # extracted RHPs (word shingles) are indexed on disk at
+    # SIMILARITY_INDEX_PATH (empty disables). A new upload at least
+    # SIMILARITY_THRESHOLD similar to an analysed one reuses its analysis:
+    # with no changed sections only the rules layer re-runs; otherwise the
+    # changed sections are sent to the LLM to revise the earlier analysis,
+    # if they fit in SIMILARITY_MAX_CHANGED_TOKENS.
+    SIMILARITY_INDEX_PATH: str = ".cache/similarity_index.sqlite3"
+    SIMILARITY_INDEX_MAX_ENTRIES: int = 5000
+    SIMILARITY_THRESHOLD: float = 0.9
+    SIMILARITY_SHINGLE_WORDS: int = 5
+    SIMILARITY_NUM_PERM: int = 128
+    SIMILARITY_BANDS: int = 32
+    SIMILARITY_MAX_CHANGED_TOKENS: int = 30000
+
+    # Yearly revenue/profit figures are parsed from the restated financial
+    # statements (pdfplumber tables on at most FINANCIAL_TABLES_MAX_PAGES
+    # candidate pages) instead of being extracted by the LLM
+    FINANCIAL_TABLES_ENABLED: bool = True
+    FINANCIAL_TABLES_MAX_PAGES: int = 12
+
+    # Prompt budget: RHP sections are ranked by relevance and kept until the
+    # whole prompt fits in this many (estimated) tokens. 0 sends the full text.
+    PROMPT_TOKEN_BUDGET: int = 60000
+    PROMPT_CHARS_PER_TOKEN: int = 4
+    PROMPT_MIN_PARTIAL_SECTION_CHARS: int = 2000
+
+    # Analysis mode: "single" (one LLM call), "map_reduce" (summarise sections
+    # concurrently, then one reduction call) or "auto" (map_reduce above the threshold)
+    ANALYSIS_MODE: str = "auto"
+    MAP_REDUCE_THRESHOLD_TOKENS: int = 200000
+    MAP_REDUCE_CHUNK_TOKENS: int = 30000
+    MAP_REDUCE_CONCURRENCY: int = 4
+    MAP_REDUCE_MIN_SECTION_WEIGHT: float = 0.1
+
+    # Background analysis jobs (POST /ipo/jobs). Needs a long-running server,
+    # not a serverless function. Finished jobs and their events are deleted
+    # JOB_RETENTION_SECONDS after they finish (0 keeps them).
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_MAX_DEPTH: int = 16
+    JOB_STORE_PATH: str = ".cache/jobs.sqlite3"
+    JOB_RETENTION_SECONDS: float = 7 * 24 * 3600
+
+    # Batch analysis (POST /ipo/analyze/batch and app.cli)
+    BATCH_MAX_DOCUMENTS: int = 40
+    BATCH_LLM_CONCURRENCY: int = 4
+
+    # Analysis result cache: "memory", "sqlite" or "none"
+    ANALYSIS_CACHE_BACKEND: str = "memory"
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 256
+    ANALYSIS_CACHE_TTL_SECONDS: float = 7 * 24 * 3600  # 0 disables expiry
+    ANALYSIS_CACHE_PATH: str = ".cache/analysis_cache.sqlite3"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,146 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+# Set per HTTP request (X-Request-ID) or per background job
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, exc_info=None, **fields: Any) -> None:
+    """
+    Log a structured record: an event name plus key/value fields
+    (sizes, durations, ids). Nothing is built when the level is disabled.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields}, stacklevel=2)
+
+
+def log_preview(logger: logging.Logger, event: str, text: str, limit: int) -> None:
+    """
+    Debug preview of a prompt or document. Off unless LOG_PAYLOAD_PREVIEWS
+    is set, so document content does not reach the logs in production.
+    """
+    if settings.LOG_PAYLOAD_PREVIEWS and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(event, extra={"fields": {"chars": len(text), "preview": text[:limit]}}, stacklevel=2)
+
+
+class _RequestIdFilter(logging.Filter):
+    # Runs on the calling thread, where the request's context is visible
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them; only the
+    message arguments and traceback are resolved here, since they cannot be
+    rendered later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    `time level logger event request_id=... key=value ...`, or one JSON
+    object per line when json_lines is set.
+    """
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+        request_id = getattr(record, "request_id", "-")
+
+        if self.json_lines:
+            payload = {
+                "time": f"{timestamp}.{int(record.msecs):03d}",
+                "level": record.levelname,
+                "logger": record.name,
+                "event": record.getMessage(),
+                "request_id": request_id,
+                **fields,
+            }
+            if record.exc_text:
+                payload["exc"] = record.exc_text
+            return json.dumps(payload, default=str)
+
+        pairs = " ".join(f"{key}={_format_value(value)}" for key, value in fields.items())
+        line = f"{timestamp}.{int(record.msecs):03d} {record.levelname:<7} {record.name} {record.getMessage()} request_id={request_id}"
+        if pairs:
+            line += " " + pairs
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return str(round(value, 3))
+    text = str(value)
+    if not text or any(char.isspace() or char in "\"=" for char in text):
+        return json.dumps(text)
+    return text
+
+
+def setup_logging() -> None:
+    """
+    Route the "app" loggers through an unbounded queue to a listener thread
+    that does the formatting and stream I/O, so logging calls on the request
+    path never block on stderr. Safe to call more than once.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(KeyValueFormatter(json_lines=settings.LOG_FORMAT == "json"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _handler = _NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(_RequestIdFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.addHandler(_handler)
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the listener thread.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger("app").removeHandler(_handler)
+        _listener.stop()
+        _listener = None
+        _handler = None
@@ -0,0 +1,246 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans fast local stages and slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKEN_BUCKETS = (1000, 5000, 10000, 25000, 50000, 100000, 200000, 500000, 1000000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(tuple(str(labels[name]) for name in self.labelnames))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _CallbackMetric:
+    """
+    A metric whose samples are read when /metrics is scraped, for counters
+    that already live elsewhere (e.g. cache hit/miss counts).
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, collect: Callable[[], List[Tuple[Dict[str, str], float]]]):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(list(labels), list(labels.values()))} {_format_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics in the Prometheus text exposition format.
+    Per process: with several server workers, each exposes its own values.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_callback(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        collect: Callable[[], List[Tuple[Dict[str, str], float]]],
+    ) -> None:
+        self._register(_CallbackMetric(name, kind, help_text, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "ipo_stage_seconds",
+    "Time spent in each analysis pipeline stage",
+    ["stage"],
+)
+LLM_ATTEMPT_SECONDS = registry.histogram(
+    "ipo_llm_attempt_seconds",
+    "Latency of each LLM provider call attempt",
+    ["provider", "outcome"],
+)
+LLM_RETRIES = registry.counter(
+    "ipo_llm_retries_total",
+    "LLM call attempts that failed and were retried",
+    ["provider"],
+)
+LLM_HEDGES = registry.counter(
+    "ipo_llm_hedges_total",
+    "Hedged LLM requests sent to a second provider",
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "ipo_llm_rate_limit_wait_seconds",
+    "Time LLM calls waited for rate limiter quota",
+    ["provider"],
+)
+COALESCED_ANALYSES = registry.counter(
+    "ipo_coalesced_analyses_total",
+    "Analyses that joined an identical in-flight analysis instead of calling the LLM",
+)
+ANALYSIS_PATHS = registry.counter(
+    "ipo_analysis_paths_total",
+    "Analyses by how they were produced (full, near-duplicate reuse, cache)",
+    ["path"],
+)
+PDF_PAGES = registry.counter(
+    "ipo_pdf_pages_total",
+    "RHP pages processed: extracted, read from the page cache, skipped by triage or OCRed",
+    ["source"],
+)
+PROMPT_CHARS = registry.counter(
+    "ipo_prompt_chars_total",
+    "Characters sent to the LLM in analysis prompts",
+)
+PROMPT_TOKENS = registry.histogram(
+    "ipo_prompt_tokens",
+    "Estimated tokens per analysis prompt",
+    buckets=TOKEN_BUCKETS,
+)
+
+
+# Per-request stage durations for the Server-Timing header; None when not collected
+request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Observe a stage duration, and add it to the current request's timings.
+    """
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
@@ -1,12 +1,44 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
+from app.core.log import log_event, request_id_var, setup_logging
+from app.core.metrics import registry, request_timings, server_timing_header
 from app.api.v1.ipo_routes import router as ipo_router
+from app.api.v1.job_routes import router as job_router
+from app.services.job_service import job_manager
+from app.services.llm_service import close_llm_clients
+from app.services.pdf_service import shutdown_pdf_pool
+from app.services.warmup import warm_up
+
+
+logger = logging.getLogger("app.requests")
+
+BATCH_PATH = "/api/v1/ipo/analyze/batch"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_manager.start()
+    if settings.WARMUP_ON_STARTUP:
+        # In the background: the server accepts requests meanwhile
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+    await job_manager.stop()
+    # Release pooled LLM provider connections and PDF workers on shutdown
+    await close_llm_clients()
+    shutdown_pdf_pool()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME)
+    setup_logging()
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
     # CORS
     app.add_middleware(
@@ -17,8 +49,62 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Reject oversized uploads from Content-Length, before the body is parsed.
+    # A batch may carry BATCH_MAX_DOCUMENTS files; spool_upload enforces
+    # MAX_UPLOAD_BYTES on each of them.
+    @app.middleware("http")
+    async def limit_upload_size(request: Request, call_next):
+        max_bytes = settings.MAX_UPLOAD_BYTES
+        if request.url.path == BATCH_PATH:
+            max_bytes *= settings.BATCH_MAX_DOCUMENTS
+        content_length = request.headers.get("content-length")
+        # Allow some slack for multipart boundaries and headers
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": f"Upload exceeds the limit of {max_bytes} bytes."},
+            )
+        return await call_next(request)
+
+    # Tag every log record of a request with its id and log one line per request
+    @app.middleware("http")
+    async def request_context(request: Request, call_next):
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        timings_token = request_timings.set({} if settings.SERVER_TIMING_HEADER else None)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            timings = request_timings.get()
+            if timings:
+                response.headers["Server-Timing"] = server_timing_header(timings)
+            log_event(
+                logger, "request",
+                method=request.method,
+                path=request.url.path,
+                status=response.status_code,
+                seconds=time.perf_counter() - started,
+            )
+            return response
+        finally:
+            request_timings.reset(timings_token)
+            request_id_var.reset(token)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        # Prometheus text exposition format
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/warmup", include_in_schema=False)
+    async def warmup():
+        # Keep-warm hook: load SDKs and PDF libraries before the first analysis
+        timings = await asyncio.get_running_loop().run_in_executor(None, warm_up)
+        return {"status": "warm", "seconds": timings}
+
     # Include routers
     app.include_router(ipo_router, prefix="/api/v1")
+    app.include_router(job_router, prefix="/api/v1")
 
     return app
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class IPOAnalysisRequest(BaseModel):
     issue_price: float = 100.0
@@ -47,4 +47,31 @@ class IPOAnalysisResult(BaseModel):
     investment_recommendation: str
     scores: IPOScores
     final_verdict: str
-    final_comment: str
\ No newline at end of file
+    final_comment: str
+
+
+class BatchDocumentTimings(BaseModel):
+    extract_seconds: float = 0.0
+    llm_wait_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
+class BatchAnalysisItem(BaseModel):
+    rank: int
+    filename: str
+    final_verdict: Optional[str] = None
+    average_score: Optional[float] = None
+    scores: Optional[IPOScores] = None
+    pages: Optional[int] = None
+    cached: bool = False
+    error: Optional[str] = None
+    timings: BatchDocumentTimings
+    result: Optional[IPOAnalysisResult] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    documents: int
+    succeeded: int
+    total_seconds: float
+    items: List[BatchAnalysisItem]
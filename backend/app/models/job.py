@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+
+from app.models.ipo import IPOAnalysisResult
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    filename: Optional[str] = None
+    result: Optional[IPOAnalysisResult] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
@@ -0,0 +1,287 @@
+import asyncio
+import contextlib
+import copy
+import logging
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.log import log_event
+from app.core.metrics import ANALYSIS_PATHS, COALESCED_ANALYSES, record_stage
+from app.models.ipo import IPOAnalysisRequest
+from app.services.cache_service import analysis_cache, make_cache_key, make_context_key
+from app.services.financial_tables import extract_financial_metrics_async
+from app.services.ipo_analyzer import (
+    ProgressCallback,
+    finalize_analysis,
+    request_ipo_analysis_async,
+    revise_ipo_analysis_async,
+    stream_ipo_analysis_async,
+)
+from app.services.llm_service import get_llm_models
+from app.services.pdf_service import SpooledPDF, extract_pdf_text
+from app.services.rhp_sections import estimate_tokens
+from app.services.similarity_index import (
+    DocumentSignature,
+    NearDuplicate,
+    document_signature,
+    named_sections,
+    similarity_index,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Analyses currently running, by cache key (single-flight)
+_in_flight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+class PDFReadError(Exception):
+    pass
+
+
+class EmptyDocumentError(Exception):
+    pass
+
+
+def analysis_cache_key(spooled: SpooledPDF, ipo_data: IPOAnalysisRequest) -> str:
+    # Content-addressed cache: same PDF + inputs + provider chain -> same analysis
+    return make_cache_key(
+        pdf_sha256=spooled.sha256,
+        ipo_data=ipo_data,
+        providers=get_llm_models(),
+    )
+
+
+async def _extract_text(spooled: SpooledPDF, progress: Optional[ProgressCallback]) -> str:
+    try:
+        rhp_text = await extract_pdf_text(spooled, progress=progress)
+    except Exception as e:
+        raise PDFReadError(str(e)) from e
+
+    if not rhp_text.strip():
+        raise EmptyDocumentError("RHP PDF appears to be empty or unreadable.")
+    return rhp_text
+
+
+async def _extract_inputs(
+    spooled: SpooledPDF,
+    progress: Optional[ProgressCallback],
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    # Statement tables are parsed alongside text extraction; None when not found
+    rhp_text, financial_metrics = await asyncio.gather(
+        _extract_text(spooled, progress),
+        extract_financial_metrics_async(spooled, progress),
+    )
+    return rhp_text, financial_metrics
+
+
+async def run_analysis(
+    spooled: SpooledPDF,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    llm_slots: Optional[asyncio.Semaphore] = None,
+) -> Dict[str, Any]:
+    """
+    Full pipeline for one uploaded RHP:
+    cache lookup -> extract text and financial tables -> analyze -> cache store -> return dict.
+    An identical analysis already in flight is awaited instead of repeated.
+    LLM calls wait for one of llm_slots when given (batches).
+    Raises PDFReadError, EmptyDocumentError or LLMError.
+    """
+    cache_key = analysis_cache_key(spooled, ipo_data)
+
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        if progress:
+            progress("cache_hit", {})
+        _report_path(progress, "cache_hit")
+        return cached
+
+    while cache_key in _in_flight:
+        leader = _in_flight[cache_key]
+        COALESCED_ANALYSES.inc()
+        if progress:
+            progress("coalesced", {})
+        _report_path(progress, "coalesced")
+        try:
+            # Shielded: a follower going away must not cancel the leader
+            return await asyncio.shield(leader)
+        except asyncio.CancelledError:
+            if not leader.cancelled():
+                raise
+            # The leader's client went away; run it ourselves
+
+    task = asyncio.ensure_future(_analyze_uncached(spooled, ipo_data, cache_key, progress, llm_slots))
+    _in_flight[cache_key] = task
+    task.add_done_callback(lambda done: _in_flight.pop(cache_key) if _in_flight.get(cache_key) is done else None)
+    return await task
+
+
+async def _analyze_uncached(
+    spooled: SpooledPDF,
+    ipo_data: IPOAnalysisRequest,
+    cache_key: str,
+    progress: Optional[ProgressCallback],
+    llm_slots: Optional[asyncio.Semaphore] = None,
+) -> Dict[str, Any]:
+    rhp_text, financial_metrics = await _extract_inputs(spooled, progress)
+
+    context = make_context_key(ipo_data, get_llm_models())
+    signature, match = await _find_near_duplicate(rhp_text, context)
+    if match is not None and financial_metrics is None and "financial_metrics" not in match.analysis:
+        # Neither this document's tables nor the earlier analysis give the
+        # yearly figures, and a revision only sees the changed sections
+        match = None
+
+    if match is not None and not match.changed_sections:
+        # Same sections as an analysed version: only the rules layer re-runs,
+        # against this version's text, financials and inputs
+        path = "near_duplicate_rules"
+        llm_raw = copy.deepcopy(match.analysis)
+    else:
+        changed_parts = _changed_section_parts(rhp_text, match) if match is not None else None
+        async with _llm_slot(llm_slots, progress):
+            if changed_parts is not None:
+                path = "near_duplicate_revised"
+                llm_raw = await revise_ipo_analysis_async(
+                    match.analysis, changed_parts, ipo_data, progress=progress, financial_metrics=financial_metrics
+                )
+            else:
+                path = "full"
+                llm_raw = await request_ipo_analysis_async(
+                    rhp_text, ipo_data, progress=progress, financial_metrics=financial_metrics
+                )
+
+    # Copied before the rules layer mutates it, for later versions to reuse,
+    # with the figures this document's tables gave
+    stored = copy.deepcopy(llm_raw)
+    if financial_metrics is not None:
+        stored["financial_metrics"] = financial_metrics
+
+    analysis_dict = finalize_analysis(llm_raw, ipo_data, financial_metrics, rhp_text)
+    if signature is not None:
+        # Only once it passed validation: an indexed analysis is reused as is
+        await asyncio.get_running_loop().run_in_executor(
+            None, similarity_index.add, cache_key, context, signature, stored
+        )
+    if progress:
+        progress("rules_applied", {"final_verdict": analysis_dict.get("final_verdict")})
+    _report_path(progress, path, match)
+    analysis_cache.set(cache_key, analysis_dict)
+
+    return analysis_dict
+
+
+@contextlib.asynccontextmanager
+async def _llm_slot(llm_slots: Optional[asyncio.Semaphore], progress: Optional[ProgressCallback]):
+    if llm_slots is None:
+        yield
+        return
+    started = time.perf_counter()
+    async with llm_slots:
+        if progress:
+            progress("llm_slot_acquired", {"wait_seconds": round(time.perf_counter() - started, 3)})
+        yield
+
+
+async def _find_near_duplicate(
+    rhp_text: str,
+    context: str,
+) -> Tuple[Optional[DocumentSignature], Optional[NearDuplicate]]:
+    if not similarity_index.enabled:
+        return None, None
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    signature = await loop.run_in_executor(None, document_signature, rhp_text)
+    match = await loop.run_in_executor(
+        None, similarity_index.find, context, signature, settings.SIMILARITY_THRESHOLD
+    )
+    record_stage("similarity_lookup", time.perf_counter() - started)
+    return signature, match
+
+
+def _changed_section_parts(rhp_text: str, match: NearDuplicate) -> Optional[List[str]]:
+    """
+    Text of the sections that changed since the matched version, each under
+    its heading, or None when together they exceed SIMILARITY_MAX_CHANGED_TOKENS
+    (a full analysis is then cheaper to trust than a large revision).
+    """
+    sections = named_sections(rhp_text)
+    parts = []
+    for name in match.changed_sections:
+        section = sections.get(name)
+        if section is None:
+            parts.append(f"\n[SECTION REMOVED: {name.split('#')[0]}]\n")
+        else:
+            parts.append(f"\n[SECTION: {section.title}]\n{rhp_text[section.start:section.end]}\n")
+    if sum(estimate_tokens(part) for part in parts) > settings.SIMILARITY_MAX_CHANGED_TOKENS:
+        return None
+    return parts
+
+
+def _report_path(
+    progress: Optional[ProgressCallback],
+    path: str,
+    match: Optional[NearDuplicate] = None,
+) -> None:
+    # How the analysis was produced: full, near_duplicate_rules,
+    # near_duplicate_revised, cache_hit or coalesced
+    ANALYSIS_PATHS.inc(path=path)
+    details: Dict[str, Any] = {"path": path}
+    if match is not None:
+        details["similarity"] = round(match.similarity, 3)
+        details["changed_sections"] = match.changed_sections
+    log_event(logger, "analysis_path", **details)
+    if progress:
+        progress("analysis_path", details)
+
+
+async def stream_analysis(
+    spooled: SpooledPDF,
+    ipo_data: IPOAnalysisRequest,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of run_analysis. Yields ("stage", {...}) progress
+    events, ("field", {"key", "value"}) for each completed top-level field
+    and finally ("result", analysis_dict). Cache hits are served, but the
+    near-duplicate paths are not taken: streaming runs the full analysis.
+    """
+    stages: List[Tuple[str, Dict[str, Any]]] = []
+
+    def progress(stage: str, details: Dict[str, Any]) -> None:
+        stages.append((stage, details))
+
+    def drain() -> List[Tuple[str, Dict[str, Any]]]:
+        events = [("stage", {"stage": stage, **details}) for stage, details in stages]
+        stages.clear()
+        return events
+
+    cache_key = analysis_cache_key(spooled, ipo_data)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        yield "stage", {"stage": "cache_hit"}
+        for key, value in cached.items():
+            yield "field", {"key": key, "value": value}
+        yield "result", cached
+        return
+
+    yield "stage", {"stage": "upload_received", "bytes": spooled.size}
+    rhp_text, financial_metrics = await _extract_inputs(spooled, progress)
+    for event in drain():
+        yield event
+
+    async for kind, payload in stream_ipo_analysis_async(
+        rhp_text, ipo_data, progress=progress, financial_metrics=financial_metrics
+    ):
+        for event in drain():
+            yield event
+        if kind == "field":
+            key, value = payload
+            yield "field", {"key": key, "value": value}
+        else:
+            analysis_cache.set(cache_key, payload)
+            for event in drain():
+                yield event
+            yield "result", payload
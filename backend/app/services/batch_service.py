@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Dict, Any, List
+
+from app.core.config import settings
+from app.models.ipo import IPOAnalysisRequest
+from app.services.analysis_pipeline import run_analysis
+from app.services.ipo_analyzer import build_analysis_result
+from app.services.pdf_service import SpooledPDF
+
+
+# Lower is better when ranking a batch
+VERDICT_RANK = {"apply": 0, "high-risk-apply": 1, "avoid": 2}
+
+
+async def analyze_batch(
+    documents: List[SpooledPDF],
+    ipo_data: IPOAnalysisRequest,
+    llm_concurrency: int = None,
+) -> Dict[str, Any]:
+    """
+    Analyze many RHPs at once and return them ranked by verdict and score.
+
+    Each document goes through run_analysis (cache, single-flight,
+    near-duplicate reuse), all at once: extraction of later documents
+    overlaps with LLM calls for earlier ones. LLM calls are bounded by
+    llm_concurrency and the provider rate limiter. One failing document
+    does not fail the batch.
+    """
+    started = time.perf_counter()
+    llm_slots = asyncio.Semaphore(llm_concurrency or settings.BATCH_LLM_CONCURRENCY)
+
+    rows = await asyncio.gather(
+        *(_analyze_document(document, ipo_data, llm_slots) for document in documents)
+    )
+
+    return {
+        "documents": len(rows),
+        "succeeded": sum(1 for row in rows if row["error"] is None),
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "items": rank_batch_results(rows),
+    }
+
+
+async def _analyze_document(
+    document: SpooledPDF,
+    ipo_data: IPOAnalysisRequest,
+    llm_slots: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    timings = {"extract_seconds": 0.0, "llm_wait_seconds": 0.0, "llm_seconds": 0.0}
+    row: Dict[str, Any] = {
+        "filename": document.filename or "document.pdf",
+        "pages": None,
+        "cached": False,
+        "error": None,
+        "result": None,
+        "timings": timings,
+    }
+    llm_started: List[float] = []
+
+    def progress(stage: str, details: Dict[str, Any]) -> None:
+        elapsed = time.perf_counter() - started
+        if stage == "cache_hit":
+            row["cached"] = True
+        elif stage == "pages_extracted":
+            row["pages"] = details["total_pages"]
+        if stage in ("pages_extracted", "financials_extracted"):
+            timings["extract_seconds"] = max(timings["extract_seconds"], elapsed)
+        elif stage == "llm_slot_acquired":
+            timings["llm_wait_seconds"] = details["wait_seconds"]
+            llm_started.append(elapsed)
+        elif stage == "llm_completed" and llm_started:
+            timings["llm_seconds"] = elapsed - llm_started[0]
+
+    try:
+        result = await run_analysis(document, ipo_data, progress, llm_slots)
+        # Checked per document: an invalid result fails its row, not the batch
+        row["result"] = build_analysis_result(result).model_dump()
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    timings["total_seconds"] = time.perf_counter() - started
+    for key in timings:
+        timings[key] = round(timings[key], 3)
+    return row
+
+
+def rank_batch_results(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Order by verdict (apply > high-risk-apply > avoid), then by average score.
+    Failed documents go last.
+    """
+    for row in rows:
+        result = row["result"]
+        if result is None:
+            row.update(final_verdict=None, scores=None, average_score=None)
+            continue
+        scores = result.get("scores") or {}
+        row["final_verdict"] = result.get("final_verdict")
+        row["scores"] = scores
+        row["average_score"] = round(sum(scores.values()) / len(scores), 2) if scores else None
+
+    def sort_key(row: Dict[str, Any]):
+        if row["error"] is not None:
+            return (1, 0, 0.0)
+        return (0, VERDICT_RANK.get(row["final_verdict"], len(VERDICT_RANK)), -(row["average_score"] or 0.0))
+
+    ranked = sorted(rows, key=sort_key)
+    for rank, row in enumerate(ranked, start=1):
+        row["rank"] = rank
+    return ranked
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.ipo import IPOAnalysisRequest
+
+
+def make_cache_key(
+    pdf_sha256: str,
+    ipo_data: IPOAnalysisRequest,
+    providers: List[str],
+) -> str:
+    """
+    Build a content-addressed cache key from the RHP hash, the IPO inputs
+    and the resolved provider chain ("provider:model" entries, in order).
+    """
+    payload = json.dumps(
+        {
+            "pdf": pdf_sha256,
+            "ipo": ipo_data.model_dump(),
+            "providers": providers,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_context_key(ipo_data: IPOAnalysisRequest, providers: List[str]) -> str:
+    """
+    Like make_cache_key without the RHP: analyses with the same context key
+    differ only in the document analysed.
+    """
+    payload = json.dumps(
+        {
+            "ipo": ipo_data.model_dump(),
+            "providers": providers,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with size and TTL eviction.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk cache stored in a single SQLite file, survives restarts.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl_seconds: float = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl_seconds and now - stored_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            # Evict least recently used rows beyond the size limit
+            self._conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                " SELECT key FROM analysis_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+
+class AnalysisCache:
+    """
+    Result cache for IPO analyses with hit/miss counters.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.ANALYSIS_CACHE_BACKEND,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def _build_backend():
+    backend = settings.ANALYSIS_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryCacheBackend(
+            max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+        )
+    elif backend == "sqlite":
+        return SQLiteCacheBackend(
+            path=settings.ANALYSIS_CACHE_PATH,
+            max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+        )
+    elif backend == "none":
+        return None
+    else:
+        raise ValueError(f"Unsupported analysis cache backend: {backend}")
+
+
+analysis_cache = AnalysisCache(_build_backend())
+
+registry.register_callback(
+    "ipo_analysis_cache_lookups_total",
+    "counter",
+    "Analysis result cache lookups",
+    lambda: [({"result": "hit"}, analysis_cache.hits), ({"result": "miss"}, analysis_cache.misses)],
+)
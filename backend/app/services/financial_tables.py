@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.log import log_event
+from app.core.metrics import record_stage
+from app.services.pdf_service import PDFSource, SpooledPDF, import_pypdfium2, open_pdf, pdfium_lock
+
+# numpy is imported on first use, keeping it off serverless cold starts
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# A page is a candidate when its text matches all of these (lowercased)
+_STATEMENT_PAGE_RES = [
+    re.compile(r"restated|audited"),
+    re.compile(r"statement of profit and loss|profit and loss|income statement"),
+    re.compile(r"revenue from operations|total income|total revenue"),
+]
+
+# FY2024, Fiscal 2024, FY 24, 2023-24, March 31, 2024, 31 March 2024, 2024
+_YEAR_RE = re.compile(
+    r"\b(?P<start>(?:19|20)\d{2})\s*[-–/]\s*(?P<end>\d{2})\b"
+    r"|(?:FY|F\.Y\.|Fiscal|Financial Year)\s*'?(?P<fy>(?:19|20)?\d{2})\b"
+    r"|(?:March|Mar\.?)\s*31,?\s*(?P<march>(?:19|20)\d{2})\b"
+    r"|\b31(?:st)?\s*(?:March|Mar\.?),?\s*(?P<march2>(?:19|20)\d{2})\b"
+    r"|\b(?P<plain>(?:19|20)\d{2})\b",
+    re.IGNORECASE,
+)
+_NUMBER_RE = re.compile(r"^\(?-?[\d,]*\d(?:\.\d+)?\)?$")
+_DASHES = {"-", "–", "—", "nil", "NIL", "Nil"}
+
+_UNIT_RE = re.compile(r"in\s*(?:₹|rs\.?|inr)?\s*(million|mn|lakhs?|crores?|cr|thousands?)", re.IGNORECASE)
+# Multipliers to the millions used by FinancialMetrics
+_UNIT_TO_MILLIONS = {"million": 1.0, "mn": 1.0, "lakh": 0.1, "crore": 10.0, "cr": 10.0, "thousand": 0.001}
+
+_REVENUE_LABELS = [
+    re.compile(r"^revenue from operations"),
+    re.compile(r"^total revenue"),
+    re.compile(r"^total income"),
+]
+_PROFIT_LABELS = [
+    re.compile(r"^(restated )?(net )?profit ?(/ ?\(?loss\)?)? (after tax|for the (year|period))"),
+    re.compile(r"^(restated )?(net )?profit ?(/ ?\(?loss\)?)?$"),
+    re.compile(r"^profit after tax"),
+    re.compile(r"^net profit"),
+]
+
+# Changes smaller than this (% revenue growth, margin points) count as "stable"
+TREND_THRESHOLD = 2.0
+
+
+def _fiscal_year(match: "re.Match") -> str:
+    if match.group("start"):
+        return f"FY{int(match.group('start')) + 1}"
+    fy = match.group("fy")
+    if fy:
+        return f"FY{fy if len(fy) == 4 else '20' + fy}"
+    return f"FY{match.group('march') or match.group('march2') or match.group('plain')}"
+
+
+def _parse_number(token: str) -> Optional[float]:
+    token = token.strip().replace("₹", "")
+    if token in _DASHES:
+        return 0.0
+    if not _NUMBER_RE.match(token):
+        return None
+    negative = token.startswith("(") or token.startswith("-")
+    value = float(token.strip("()-").replace(",", ""))
+    return -value if negative else value
+
+
+def _split_row(cells: List[str]) -> Tuple[str, List[float]]:
+    """
+    Split a row into its label and the numbers that follow it.
+    """
+    tokens = " ".join(cell for cell in cells if cell).split()
+    values: List[float] = []
+    while tokens:
+        value = _parse_number(tokens[-1])
+        if value is None:
+            break
+        values.insert(0, value)
+        tokens.pop()
+    label = re.sub(r"\s+", " ", " ".join(tokens)).strip(" :").lower()
+    return label, values
+
+
+def _header_years(row_text: str) -> List[Optional[str]]:
+    """
+    Fiscal year of each column of a header row, or [] when the row is not
+    one. Stub period columns ("Sep 30, 2024" beside "March 31, 2024") share
+    a fiscal year with a full-year column; they are None, keeping the
+    fiscal year end (or explicit FY) column, else the last one.
+    """
+    # Figures such as 2,024.50 are values, not a header
+    if re.search(r"\d[.,]\d", row_text):
+        return []
+    matches = list(_YEAR_RE.finditer(row_text))
+    years: List[Optional[str]] = [_fiscal_year(match) for match in matches]
+    keep: Dict[str, int] = {}
+    for i, (year, match) in enumerate(zip(years, matches)):
+        if year not in keep or match.group("plain") is None or matches[keep[year]].group("plain") is not None:
+            keep[year] = i
+    if len(keep) < 2:
+        return []
+    return [year if keep[year] == i else None for i, year in enumerate(years)]
+
+
+def _match_label(label: str, patterns: List["re.Pattern"]) -> Optional[int]:
+    for priority, pattern in enumerate(patterns):
+        if pattern.search(label):
+            return priority
+    return None
+
+
+def parse_statement_rows(rows: List[List[str]], unit: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    Find the year header, revenue row and profit row in a statement table
+    (rows of cell strings) and return {"years", "revenue", "profit"} in
+    millions, oldest year first, or None.
+    """
+    columns: List[Optional[str]] = []
+    found: Dict[str, Tuple[int, List[float]]] = {}
+
+    for cells in rows:
+        row_text = " ".join(cell for cell in cells if cell)
+        if not columns:
+            columns = _header_years(row_text)
+            continue
+
+        label, values = _split_row(cells)
+        if len(values) < len(columns):
+            continue
+        # Leading numbers (note references) are dropped by taking the last
+        # ones; stub period columns are left out
+        values = [value for value, year in zip(values[-len(columns):], columns) if year is not None]
+        for key, patterns in (("revenue", _REVENUE_LABELS), ("profit", _PROFIT_LABELS)):
+            priority = _match_label(label, patterns)
+            if priority is not None and (key not in found or priority < found[key][0]):
+                found[key] = (priority, values)
+
+    years = [year for year in columns if year is not None]
+    if not years or "revenue" not in found or "profit" not in found:
+        return None
+
+    import numpy as np
+
+    order = np.argsort([int(year[2:]) for year in years], kind="stable")
+    return {
+        "years": [years[i] for i in order],
+        "revenue": np.asarray(found["revenue"][1], dtype=float)[order] * unit,
+        "profit": np.asarray(found["profit"][1], dtype=float)[order] * unit,
+    }
+
+
+def compute_financial_metrics(years: List[str], revenue: "np.ndarray", profit: "np.ndarray") -> Dict[str, Any]:
+    """
+    FinancialMetrics from yearly revenue and profit/(loss), oldest first.
+    """
+    import numpy as np
+
+    revenue = np.asarray(revenue, dtype=float)
+    profit = np.asarray(profit, dtype=float)
+
+    gains = np.clip(profit, 0, None)
+    losses = np.clip(-profit, 0, None)
+    margins = np.divide(profit * 100, revenue, out=np.zeros_like(profit), where=revenue != 0)
+    growth = np.zeros_like(revenue)
+    previous = revenue[:-1]
+    growth[1:] = np.divide(
+        (revenue[1:] - previous) * 100, previous, out=np.zeros_like(previous), where=previous != 0
+    )
+
+    average_growth = growth[1:].mean() if len(growth) > 1 else 0.0
+    margin_change = margins[-1] - margins[0]
+
+    yearly_data = [
+        {
+            "year": year,
+            "revenue": round(float(rev), 2),
+            "profit": round(float(gain), 2),
+            "loss": round(float(loss), 2),
+            "margin": round(float(margin), 2),
+            "growth_rate": round(float(rate), 2),
+        }
+        for year, rev, gain, loss, margin, rate in zip(years, revenue, gains, losses, margins, growth)
+    ]
+
+    return {
+        "yearly_data": yearly_data,
+        "total_revenue": round(float(revenue.sum()), 2),
+        "total_profit": round(float(gains.sum()), 2),
+        "total_loss": round(float(losses.sum()), 2),
+        "avg_margin": round(float(margins.mean()), 2),
+        "revenue_growth_trend": (
+            "increasing" if average_growth > TREND_THRESHOLD
+            else "decreasing" if average_growth < -TREND_THRESHOLD
+            else "stable"
+        ),
+        "profitability_trend": (
+            "improving" if margin_change > TREND_THRESHOLD
+            else "declining" if margin_change < -TREND_THRESHOLD
+            else "stable"
+        ),
+    }
+
+
+def find_statement_pages(source: PDFSource, max_pages: int) -> Tuple[List[int], int]:
+    """
+    Scan page text with PDFium (fast, no layout analysis) for restated
+    profit and loss statements.
+    Returns: (page indices, pages scanned)
+    """
+    candidates = []
+    scanned = 0
+    # The lock is taken per page so extraction running alongside is not
+    # held up for the whole scan
+    with pdfium_lock:
+        document = import_pypdfium2().PdfDocument(source)
+        total_pages = len(document)
+    try:
+        for i in range(total_pages):
+            with pdfium_lock:
+                page = document[i]
+                textpage = page.get_textpage()
+                text = textpage.get_text_bounded().lower()
+                textpage.close()
+                page.close()
+            scanned += 1
+            if all(pattern.search(text) for pattern in _STATEMENT_PAGE_RES):
+                candidates.append(i)
+                if len(candidates) >= max_pages:
+                    break
+    finally:
+        with pdfium_lock:
+            document.close()
+    return candidates, scanned
+
+
+def _page_rows(page) -> List[List[List[str]]]:
+    """
+    Row candidates for one page: ruled tables first, then text lines, which
+    also covers whitespace-aligned statements without ruling lines.
+    """
+    tables = [
+        [[(cell or "").replace("\n", " ") for cell in row] for row in table]
+        for table in page.extract_tables()
+    ]
+    lines = [[line] for line in (page.extract_text() or "").splitlines()]
+    return tables + [lines]
+
+
+def extract_financial_metrics(source: PDFSource) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Deterministic FinancialMetrics from the restated financial statements,
+    with pdfplumber table detection run only on candidate pages.
+    Returns: (financial_metrics or None, stats)
+    """
+    started = time.perf_counter()
+    pages, scanned = find_statement_pages(source, settings.FINANCIAL_TABLES_MAX_PAGES)
+
+    best = None
+    best_page = None
+    with open_pdf(source) as pdf:
+        for i in pages:
+            page = pdf.pages[i]
+            match = _UNIT_RE.search(page.extract_text() or "")
+            unit = _UNIT_TO_MILLIONS[match.group(1).lower().rstrip("s")] if match else 1.0
+            for rows in _page_rows(page):
+                parsed = parse_statement_rows(rows, unit)
+                if parsed and (best is None or len(parsed["years"]) > len(best["years"])):
+                    best, best_page = parsed, i
+            page.close()
+            # Statements usually show three fiscal years plus a stub period
+            if best is not None and len(best["years"]) >= 3:
+                break
+
+    stats = {
+        "pages_scanned": scanned,
+        "candidate_pages": len(pages),
+        "statement_page": best_page + 1 if best_page is not None else None,
+        "years": best["years"] if best else [],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    if best is None:
+        return None, stats
+    return compute_financial_metrics(best["years"], best["revenue"], best["profit"]), stats
+
+
+async def extract_financial_metrics_async(
+    pdf: SpooledPDF,
+    progress=None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run extract_financial_metrics off the event loop. Failures are logged
+    and return None, in which case the LLM extracts the figures as before.
+    """
+    if not settings.FINANCIAL_TABLES_ENABLED or import_pypdfium2() is None:
+        return None
+
+    loop = asyncio.get_event_loop()
+    try:
+        metrics, stats = await loop.run_in_executor(None, extract_financial_metrics, pdf.path)
+    except Exception as e:
+        log_event(logger, "financial_tables_failed", logging.WARNING, error=str(e))
+        return None
+
+    record_stage("financial_tables", stats["seconds"])
+    log_event(
+        logger, "financial_tables_extracted",
+        years=len(stats["years"]),
+        statement_page=stats["statement_page"],
+        candidate_pages=stats["candidate_pages"],
+        pages_scanned=stats["pages_scanned"],
+        seconds=stats["seconds"],
+    )
+    if progress is not None:
+        progress("financials_extracted", stats)
+    return metrics
@@ -1,20 +1,88 @@
-from typing import Dict, Any
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple, Union
 
-from app.models.ipo import IPOAnalysisRequest
-from app.services.llm_service import call_llm, LLMError
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.log import log_event
+from app.core.metrics import PROMPT_CHARS, PROMPT_TOKENS, record_stage, timed
+from app.models.ipo import IPOAnalysisRequest, IPOAnalysisResult, IPOScores
+from app.services.json_stream import IncrementalJSONObjectParser
+from app.services.llm_service import (
+    LLMError,
+    call_llm,
+    call_llm_async,
+    parse_llm_json,
+    stream_llm_async,
+)
+from app.services.prompt import Prompt
 from app.services.rules_engine import apply_rules_layer
+from app.services.rhp_sections import (
+    RHPSection,
+    chunk_sections,
+    estimate_tokens,
+    section_weight,
+    select_relevant_parts,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Called as progress(stage, details) at each pipeline stage (job API, streaming)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def _report(progress: Optional[ProgressCallback], stage: str, **details: Any) -> None:
+    if progress is not None:
+        progress(stage, details)
+
+
+FINANCIAL_METRICS_TASK = """4. financial_metrics: Extract and structure YEARLY financial data (CRITICAL):
+   - For each year available, provide: year, revenue (in millions), profit (in millions), loss (in millions), profit margin (%), revenue growth rate (%)
+   - Calculate: total_revenue, total_profit, total_loss, avg_margin
+   - Identify: revenue_growth_trend ("increasing", "decreasing", "stable"), profitability_trend ("improving", "declining", "stable")
+   - Return as array of yearly objects with these exact fields"""
+
+FINANCIAL_METRICS_SCHEMA = """
+  "financial_metrics": {
+    "yearly_data": [
+      {"year": "2021", "revenue": 100.5, "profit": 15.2, "loss": 0, "margin": 15.1, "growth_rate": 0},
+      {"year": "2022", "revenue": 125.3, "profit": 22.5, "loss": 0, "margin": 17.9, "growth_rate": 24.8},
+      {"year": "2023", "revenue": 156.8, "profit": 31.2, "loss": 0, "margin": 19.9, "growth_rate": 25.1}
+    ],
+    "total_revenue": 382.6,
+    "total_profit": 68.9,
+    "total_loss": 0,
+    "avg_margin": 17.6,
+    "revenue_growth_trend": "increasing",
+    "profitability_trend": "improving"
+  },"""
 
 
-def build_ipo_prompt(rhp_text: str, ipo_data: IPOAnalysisRequest) -> str:
+def format_financial_metrics(financial_metrics: Dict[str, Any]) -> str:
     """
-    Build the prompt for the IPO analysis LLM call.
-    Keep RHP text truncated to avoid massive context.
+    Compact text form of pre-computed FinancialMetrics for the prompt.
     """
-    # Use all extracted text for comprehensive analysis
-    # No truncation - send complete document content to LLM
-    truncated_rhp = rhp_text  # Full document content for accurate analysis
+    lines = [
+        f"- {row['year']}: revenue {row['revenue']:,.2f}, profit {row['profit']:,.2f}, "
+        f"loss {row['loss']:,.2f}, margin {row['margin']:.1f}%, growth {row['growth_rate']:.1f}%"
+        for row in financial_metrics["yearly_data"]
+    ]
+    lines.append(
+        f"- Totals: revenue {financial_metrics['total_revenue']:,.2f}, profit {financial_metrics['total_profit']:,.2f}, "
+        f"loss {financial_metrics['total_loss']:,.2f}, average margin {financial_metrics['avg_margin']:.1f}%; "
+        f"revenue {financial_metrics['revenue_growth_trend']}, profitability {financial_metrics['profitability_trend']}"
+    )
+    return "\n".join(lines)
 
-    return f"""You are an experienced IPO equity analyst. Provide balanced, comprehensive analysis for investment decision-making.
+
+# The analysis prompt is split around the RHP text once, at import time, so
+# each request only formats the short IPO data block and the document is
+# referenced as its own part instead of being copied into a larger string.
+IPO_PROMPT_HEADER = """You are an experienced IPO equity analyst. Provide balanced, comprehensive analysis for investment decision-making.
 
 IMPORTANT INSTRUCTIONS:
 - Perform thorough analysis considering BOTH strengths AND weaknesses
@@ -38,15 +106,17 @@ Analysis Guidelines:
 - Evaluate if valuation offers reasonable entry point
 
 RHP TEXT (may be long, focus on business, financials, risks, opportunities):
-{truncated_rhp}
+"""
 
-IPO DATA:
-- Issue Price: {ipo_data.issue_price}
-- GMP (may be 0 if not applicable): {ipo_data.gmp}
-- Subscription (Retail): {ipo_data.sub_retail}x
-- Subscription (NII): {ipo_data.sub_nii}x
-- Subscription (QIB): {ipo_data.sub_qib}x
+IPO_PROMPT_FOOTER = """
 
+IPO DATA:
+- Issue Price: {issue_price}
+- GMP (may be 0 if not applicable): {gmp}
+- Subscription (Retail): {sub_retail}x
+- Subscription (NII): {sub_nii}x
+- Subscription (QIB): {sub_qib}x
+{financial_data}
 Tasks:
 1. company_overview: Brief overview of the company, its sector, market position, and growth potential (3-4 lines).
 2. business_summary: Concise business model, operations, and market opportunity (4-5 lines).
@@ -56,11 +126,7 @@ Tasks:
    - Debt/leverage levels and financial health
    - Cash flow health and capital efficiency
    - Growth prospects and market expansion
-4. financial_metrics: Extract and structure YEARLY financial data (CRITICAL):
-   - For each year available, provide: year, revenue (in millions), profit (in millions), loss (in millions), profit margin (%), revenue growth rate (%)
-   - Calculate: total_revenue, total_profit, total_loss, avg_margin
-   - Identify: revenue_growth_trend ("increasing", "decreasing", "stable"), profitability_trend ("improving", "declining", "stable")
-   - Return as array of yearly objects with these exact fields
+{financial_metrics_task}
 5. key_strengths: List 4-5 main strengths and competitive advantages (as array of strings).
 6. key_risks: List 5-6 main risks/concerns and mitigation factors (as array of strings).
 7. valuation_analysis: Is the IPO fairly valued? Consider market comparables, growth potential, and entry point (3-4 lines).
@@ -88,20 +154,7 @@ Return ONLY valid JSON in this EXACT schema:
 {{
   "company_overview": "...",
   "business_summary": "...",
-  "financial_analysis": "...",
-  "financial_metrics": {{
-    "yearly_data": [
-      {{"year": "2021", "revenue": 100.5, "profit": 15.2, "loss": 0, "margin": 15.1, "growth_rate": 0}},
-      {{"year": "2022", "revenue": 125.3, "profit": 22.5, "loss": 0, "margin": 17.9, "growth_rate": 24.8}},
-      {{"year": "2023", "revenue": 156.8, "profit": 31.2, "loss": 0, "margin": 19.9, "growth_rate": 25.1}}
-    ],
-    "total_revenue": 382.6,
-    "total_profit": 68.9,
-    "total_loss": 0,
-    "avg_margin": 17.6,
-    "revenue_growth_trend": "increasing",
-    "profitability_trend": "improving"
-  }},
+  "financial_analysis": "...",{financial_metrics_schema}
   "key_strengths": ["strength1", "strength2", "strength3", "strength4", "strength5"],
   "key_risks": ["risk1", "risk2", "risk3", "risk4", "risk5", "risk6"],
   "valuation_analysis": "...",
@@ -118,30 +171,306 @@ Return ONLY valid JSON in this EXACT schema:
 }}"""
 
 
-def analyze_ipo_from_text(rhp_text: str, ipo_data: IPOAnalysisRequest) -> Dict[str, Any]:
+def build_ipo_prompt(
+    rhp_text: Union[str, Sequence[str]],
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Prompt:
     """
-    Full flow: build prompt -> call LLM -> apply rules -> return dict.
+    Build the prompt for the IPO analysis LLM call.
+    rhp_text is used as given, either as one string or as a sequence of
+    parts (see select_relevant_parts); see prepare_ipo_prompt for section
+    selection. When financial_metrics were already parsed from the restated
+    statements, the LLM is given them instead of being asked to extract them
+    (task 4).
     """
-    print("\n" + "="*80)
-    print(" IPO ANALYSIS STARTED")
-    print("="*80)
-    print(f"RHP Text Length: {len(rhp_text)} characters")
-    print(f"Issue Price: {ipo_data.issue_price}")
-    print(f"GMP: {ipo_data.gmp}")
-    print(f"Subscription - Retail: {ipo_data.sub_retail}x, NII: {ipo_data.sub_nii}x, QIB: {ipo_data.sub_qib}x")
-    print("="*80 + "\n")
-    
-    prompt = build_ipo_prompt(rhp_text, ipo_data)
+    rhp_parts = [rhp_text] if isinstance(rhp_text, str) else rhp_text
+    return Prompt([IPO_PROMPT_HEADER, *rhp_parts, _format_prompt_footer(ipo_data, financial_metrics)])
 
-    llm_raw = call_llm(prompt)
-    
-    print("\n" + "="*80)
-    print(" LLM RESPONSE RECEIVED")
-    print("="*80)
-    print(f"Response Keys: {list(llm_raw.keys())}")
-    print(f"Final Verdict: {llm_raw.get('final_verdict', 'N/A')}")
-    print(f"Scores: {llm_raw.get('scores', {})}")
-    print("="*80 + "\n")
+
+def _format_prompt_footer(
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> str:
+    # IPO data, tasks and schema; shared by the analysis and revision prompts
+    if financial_metrics is not None:
+        financial_data = f"""
+RESTATED FINANCIALS (in millions, parsed from the RHP's financial statements; use these figures):
+{format_financial_metrics(financial_metrics)}
+"""
+        financial_metrics_task = "4. financial_metrics: Already extracted (RESTATED FINANCIALS above). Do NOT return this field."
+        financial_metrics_schema = ""
+    else:
+        financial_data = ""
+        financial_metrics_task = FINANCIAL_METRICS_TASK
+        financial_metrics_schema = FINANCIAL_METRICS_SCHEMA
+
+    return IPO_PROMPT_FOOTER.format(
+        issue_price=ipo_data.issue_price,
+        gmp=ipo_data.gmp,
+        sub_retail=ipo_data.sub_retail,
+        sub_nii=ipo_data.sub_nii,
+        sub_qib=ipo_data.sub_qib,
+        financial_data=financial_data,
+        financial_metrics_task=financial_metrics_task,
+        financial_metrics_schema=financial_metrics_schema,
+    )
+
+
+REVISION_PROMPT_HEADER = """You are an experienced IPO equity analyst. The company has re-filed its offer document (for example the RHP after the DRHP, or an addendum). You analysed the earlier version and most of the document is unchanged.
+
+Below are your earlier analysis and the sections of the new document that changed. Revise the analysis where the changes matter (price band, issue size, financial figures, new or removed risks, promoter changes) and keep everything else as it was.
+
+EARLIER ANALYSIS (JSON):
+"""
+
+
+def build_revision_prompt(
+    previous_analysis: Dict[str, Any],
+    changed_parts: Sequence[str],
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Prompt:
+    """
+    Prompt to revise an earlier version's analysis given only the changed
+    sections of the new RHP (each prefixed with its heading). The answer
+    uses the same schema as build_ipo_prompt.
+    """
+    return Prompt([
+        REVISION_PROMPT_HEADER,
+        json.dumps(previous_analysis, indent=1),
+        "\n\nCHANGED SECTIONS OF THE NEW RHP:\n",
+        *changed_parts,
+        _format_prompt_footer(ipo_data, financial_metrics),
+    ])
+
+
+def prepare_ipo_prompt(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Prompt:
+    """
+    Select the most relevant RHP sections so the whole prompt stays within
+    PROMPT_TOKEN_BUDGET, then build the prompt.
+    """
+    with timed("build_prompt"):
+        rhp_budget = 0
+        if settings.PROMPT_TOKEN_BUDGET > 0:
+            instruction_tokens = estimate_tokens(build_ipo_prompt("", ipo_data, financial_metrics))
+            rhp_budget = max(settings.PROMPT_TOKEN_BUDGET - instruction_tokens, 1000)
+
+        selected_parts, stats = select_relevant_parts(rhp_text, rhp_budget)
+        prompt = build_ipo_prompt(selected_parts, ipo_data, financial_metrics)
+
+    PROMPT_CHARS.inc(len(prompt))
+    PROMPT_TOKENS.observe(estimate_tokens(prompt))
+    log_event(logger, "prompt_prepared", prompt_chars=len(prompt), **stats)
+    return prompt
+
+
+SECTION_SUMMARY_PROMPT_HEADER = """You are an experienced IPO equity analyst reading one section of a Red Herring Prospectus (RHP).
+Summarize this section for a later investment analysis of the whole document.
+
+- Keep every material number (revenue, profit, margins, debt, issue size, price band, dates) with its year or period.
+- Keep concrete risks, strengths, promoter details and uses of issue proceeds.
+- Skip legal boilerplate and repeated definitions.
+
+SECTION: {section_title}
+SECTION TEXT (may be imperfect OCR, do your best):
+"""
+
+SECTION_SUMMARY_PROMPT_FOOTER = """
+
+Return ONLY valid JSON in this EXACT schema:
+
+{
+  "summary": "8-15 lines of dense analyst notes",
+  "key_figures": ["FY2024 revenue: 1,234.5 million", "..."],
+  "risks": ["..."],
+  "strengths": ["..."]
+}"""
+
+
+def build_section_summary_prompt(section_title: str, section_text: str) -> Prompt:
+    """
+    Map-step prompt: condense one RHP section into analyst notes.
+    """
+    return Prompt([
+        SECTION_SUMMARY_PROMPT_HEADER.format(section_title=section_title),
+        section_text,
+        SECTION_SUMMARY_PROMPT_FOOTER,
+    ])
+
+
+def _format_section_notes(title: str, notes: Dict[str, Any]) -> str:
+    lines = [f"[SECTION NOTES: {title}]", str(notes.get("summary", "")).strip()]
+    for label, key in (("Key figures", "key_figures"), ("Risks", "risks"), ("Strengths", "strengths")):
+        items = notes.get(key) or []
+        if items:
+            lines.append(f"{label}: " + "; ".join(str(item) for item in items))
+    return "\n".join(lines)
+
+
+def _use_map_reduce(rhp_text: str) -> bool:
+    if settings.ANALYSIS_MODE == "map_reduce":
+        return True
+    if settings.ANALYSIS_MODE == "auto":
+        return estimate_tokens(rhp_text) > settings.MAP_REDUCE_THRESHOLD_TOKENS
+    return False
+
+
+async def _map_sections(
+    rhp_text: str,
+    chunks: List[RHPSection],
+    progress: Optional[ProgressCallback] = None,
+) -> List[str]:
+    """
+    Summarise chunks concurrently, at most MAP_REDUCE_CONCURRENCY at a time.
+    Returns the formatted notes in document order; failed chunks are skipped.
+    """
+    semaphore = asyncio.Semaphore(settings.MAP_REDUCE_CONCURRENCY)
+    done = [0]
+
+    async def summarize(chunk: RHPSection) -> Dict[str, Any]:
+        async with semaphore:
+            prompt = build_section_summary_prompt(chunk.title, rhp_text[chunk.start:chunk.end])
+            result = await call_llm_async(prompt)
+        done[0] += 1
+        _report(progress, "section_summarized", section=chunk.title, done=done[0], total=len(chunks))
+        return result
+
+    results = await asyncio.gather(*(summarize(chunk) for chunk in chunks), return_exceptions=True)
+
+    notes = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            # Cancellation (a BaseException) is not a failed chunk
+            raise result
+        if isinstance(result, Exception):
+            log_event(
+                logger, "section_summary_failed", logging.WARNING,
+                section=chunk.title, start=chunk.start, end=chunk.end, error=str(result),
+            )
+            continue
+        notes.append(_format_section_notes(chunk.title, result))
+
+    if not notes:
+        raise LLMError(f"All {len(chunks)} section summaries failed")
+    return notes
+
+
+async def _build_map_reduce_prompt(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Prompt:
+    """
+    Map step: summarise sections concurrently, then build the usual analysis
+    prompt over the section notes so the reduction returns the same schema.
+    """
+    chunks = [
+        chunk
+        for chunk in chunk_sections(rhp_text, settings.MAP_REDUCE_CHUNK_TOKENS)
+        if section_weight(chunk.key) >= settings.MAP_REDUCE_MIN_SECTION_WEIGHT
+    ]
+
+    _report(progress, "map_started", sections=len(chunks))
+    started = time.perf_counter()
+    notes = await _map_sections(rhp_text, chunks, progress)
+    record_stage("map_sections", time.perf_counter() - started)
+    log_event(
+        logger, "map_completed",
+        sections=len(chunks),
+        summarised=len(notes),
+        concurrency=settings.MAP_REDUCE_CONCURRENCY,
+        seconds=time.perf_counter() - started,
+    )
+
+    notes_text = (
+        "The RHP was too long to send in full. Below are analyst notes for each of its sections, in document order.\n\n"
+        + "\n\n".join(notes)
+    )
+    return prepare_ipo_prompt(notes_text, ipo_data, financial_metrics)
+
+
+async def _build_analysis_prompt_async(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Prompt:
+    _log_analysis_start(rhp_text, ipo_data)
+
+    if _use_map_reduce(rhp_text):
+        prompt = await _build_map_reduce_prompt(rhp_text, ipo_data, progress, financial_metrics)
+    else:
+        prompt = prepare_ipo_prompt(rhp_text, ipo_data, financial_metrics)
+
+    _report(progress, "prompt_built", prompt_chars=len(prompt))
+    return prompt
+
+
+def _log_analysis_start(rhp_text: str, ipo_data: IPOAnalysisRequest) -> None:
+    log_event(
+        logger, "analysis_started",
+        rhp_chars=len(rhp_text),
+        issue_price=ipo_data.issue_price,
+        gmp=ipo_data.gmp,
+        sub_retail=ipo_data.sub_retail,
+        sub_nii=ipo_data.sub_nii,
+        sub_qib=ipo_data.sub_qib,
+    )
+
+
+def build_analysis_result(analysis_dict: Dict[str, Any]) -> IPOAnalysisResult:
+    """
+    The API model for an analysis. Raises LLMError when the LLM output does
+    not fit it (e.g. a missing score).
+    """
+    try:
+        scores = analysis_dict["scores"]
+        financial_metrics_data = analysis_dict.get("financial_metrics", {})
+
+        return IPOAnalysisResult(
+            company_overview=analysis_dict["company_overview"],
+            business_summary=analysis_dict["business_summary"],
+            financial_analysis=analysis_dict["financial_analysis"],
+            financial_metrics=financial_metrics_data,
+            key_strengths=analysis_dict["key_strengths"],
+            key_risks=analysis_dict["key_risks"],
+            valuation_analysis=analysis_dict["valuation_analysis"],
+            profit_potential=analysis_dict["profit_potential"],
+            investment_recommendation=analysis_dict["investment_recommendation"],
+            scores=IPOScores(**scores),
+            final_verdict=analysis_dict["final_verdict"],
+            final_comment=analysis_dict["final_comment"],
+        )
+    except (KeyError, TypeError, ValidationError) as e:
+        raise LLMError(f"LLM response does not match the analysis schema: {e}")
+
+
+def finalize_analysis(
+    llm_raw: Dict[str, Any],
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+    rhp_text: str = "",
+) -> Dict[str, Any]:
+    """
+    Validate the LLM response, apply the rules layer and check the result
+    against IPOAnalysisResult, so nothing invalid is cached or reused.
+    Pre-computed financial_metrics replace whatever the LLM returned.
+    """
+    if financial_metrics is not None:
+        llm_raw["financial_metrics"] = financial_metrics
+
+    log_event(
+        logger, "llm_response",
+        keys=",".join(llm_raw.keys()),
+        final_verdict=llm_raw.get("final_verdict", "N/A"),
+        scores=json.dumps(llm_raw.get("scores", {})),
+    )
 
     # Ensure basic keys exist; if not, raise to client
     required_keys = [
@@ -163,15 +492,154 @@ def analyze_ipo_from_text(rhp_text: str, ipo_data: IPOAnalysisRequest) -> Dict[s
             raise LLMError(f"LLM response missing key: {key}")
 
     # rules engine will modify scores & verdict if needed
-    adjusted = apply_rules_layer(
-        llm_result=llm_raw,
-        ipo_inputs={
-            "issue_price": ipo_data.issue_price,
-            "gmp": ipo_data.gmp,
-            "sub_retail": ipo_data.sub_retail,
-            "sub_nii": ipo_data.sub_nii,
-            "sub_qib": ipo_data.sub_qib,
-        },
+    with timed("rules"):
+        adjusted = apply_rules_layer(
+            llm_result=llm_raw,
+            ipo_inputs={
+                "issue_price": ipo_data.issue_price,
+                "gmp": ipo_data.gmp,
+                "sub_retail": ipo_data.sub_retail,
+                "sub_nii": ipo_data.sub_nii,
+                "sub_qib": ipo_data.sub_qib,
+            },
+            rhp_text=rhp_text,
+        )
+
+    build_analysis_result(adjusted)
+    return adjusted
+
+
+def analyze_ipo_from_text(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Full flow: build prompt -> call LLM -> apply rules -> return dict.
+    """
+    _log_analysis_start(rhp_text, ipo_data)
+
+    prompt = prepare_ipo_prompt(rhp_text, ipo_data, financial_metrics)
+
+    started = time.perf_counter()
+    llm_raw = call_llm(prompt)
+    record_stage("llm_call", time.perf_counter() - started)
+    log_event(
+        logger, "llm_completed",
+        provider=settings.LLM_PROVIDER, prompt_chars=len(prompt), seconds=time.perf_counter() - started,
+    )
+
+    return finalize_analysis(llm_raw, ipo_data, financial_metrics, rhp_text)
+
+
+async def _call_analysis_llm_async(prompt: Prompt, progress: Optional[ProgressCallback]) -> Dict[str, Any]:
+    _report(progress, "llm_started", provider=settings.LLM_PROVIDER)
+    started = time.perf_counter()
+    llm_raw = await call_llm_async(prompt)
+    record_stage("llm_call", time.perf_counter() - started)
+    log_event(
+        logger, "llm_completed",
+        provider=settings.LLM_PROVIDER, prompt_chars=len(prompt), seconds=time.perf_counter() - started,
+    )
+    _report(progress, "llm_completed", seconds=round(time.perf_counter() - started, 3))
+    return llm_raw
+
+
+async def request_ipo_analysis_async(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    The LLM's analysis, before validation and the rules layer
+    (see finalize_analysis). Large RHPs go through the map-reduce flow.
+    """
+    prompt = await _build_analysis_prompt_async(rhp_text, ipo_data, progress, financial_metrics)
+    return await _call_analysis_llm_async(prompt, progress)
+
+
+async def revise_ipo_analysis_async(
+    previous_analysis: Dict[str, Any],
+    changed_parts: Sequence[str],
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    An earlier version's LLM analysis revised for the changed sections of a
+    re-filed RHP, before validation and the rules layer.
+    """
+    prompt = build_revision_prompt(previous_analysis, changed_parts, ipo_data, financial_metrics)
+    _report(progress, "prompt_built", prompt_chars=len(prompt))
+    return await _call_analysis_llm_async(prompt, progress)
+
+
+async def analyze_ipo_from_text_async(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Same flow as analyze_ipo_from_text, but awaits the LLM call so the
+    event loop stays free for other requests. Large RHPs go through the
+    map-reduce flow (see ANALYSIS_MODE).
+    """
+    llm_raw = await request_ipo_analysis_async(rhp_text, ipo_data, progress, financial_metrics)
+
+    result = finalize_analysis(llm_raw, ipo_data, financial_metrics, rhp_text)
+    _report(progress, "rules_applied", final_verdict=result.get("final_verdict"))
+    return result
+
+
+async def stream_ipo_analysis_async(
+    rhp_text: str,
+    ipo_data: IPOAnalysisRequest,
+    progress: Optional[ProgressCallback] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming flow: yields ("field", (key, value)) for each top-level field
+    as soon as the LLM has finished generating it, then ("result", dict)
+    once the rules layer has run. Streamed scores/verdict are the raw LLM
+    values; the final result is authoritative.
+    """
+    prompt = await _build_analysis_prompt_async(rhp_text, ipo_data, progress, financial_metrics)
+    if financial_metrics is not None:
+        # Known before the LLM starts
+        yield "field", ("financial_metrics", financial_metrics)
+
+    _report(progress, "llm_started", provider=settings.LLM_PROVIDER)
+    started = time.perf_counter()
+    parser = IncrementalJSONObjectParser()
+    chunks: List[str] = []
+    first_token_seconds = None
+    # Whichever provider in the chain answered
+    answered: List[str] = []
+
+    async for chunk in stream_llm_async(prompt, on_provider=answered.append):
+        if first_token_seconds is None:
+            first_token_seconds = time.perf_counter() - started
+            _report(progress, "llm_streaming", first_token_seconds=round(first_token_seconds, 3))
+        chunks.append(chunk)
+        for field in parser.feed(chunk):
+            if financial_metrics is not None and field[0] == "financial_metrics":
+                continue
+            yield "field", field
+
+    record_stage("llm_call", time.perf_counter() - started)
+    provider = answered[0] if answered else None
+    log_event(
+        logger, "llm_completed",
+        provider=provider or settings.LLM_PROVIDER,
+        prompt_chars=len(prompt),
+        first_token_seconds=first_token_seconds or 0.0,
+        seconds=time.perf_counter() - started,
     )
+    _report(progress, "llm_completed", seconds=round(time.perf_counter() - started, 3))
 
-    return adjusted
\ No newline at end of file
+    llm_raw = parse_llm_json("".join(chunks), provider)
+    result = finalize_analysis(llm_raw, ipo_data, financial_metrics, rhp_text)
+    _report(progress, "rules_applied", final_verdict=result.get("final_verdict"))
+    yield "result", result
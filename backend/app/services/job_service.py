@@ -0,0 +1,409 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from app.core.config import settings
+from app.core.log import log_event, request_id_var
+from app.models.ipo import IPOAnalysisRequest
+from app.services.analysis_pipeline import run_analysis
+from app.services.ipo_analyzer import build_analysis_result
+from app.services.pdf_service import SpooledPDF
+
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# How often finished jobs past their retention are deleted
+SWEEP_INTERVAL_SECONDS = 3600.0
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobStore:
+    """
+    SQLite-backed store for analysis jobs and their progress events. If the
+    database cannot be opened (e.g. a read-only filesystem) jobs are kept in
+    memory for the life of the process instead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use so importing the app never touches the disk
+        if self._db is None:
+            self._db = self._open()
+        return self._db
+
+    def _open(self) -> sqlite3.Connection:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            return self._create_tables(sqlite3.connect(self.path, check_same_thread=False))
+        except (sqlite3.Error, OSError) as e:
+            log_event(logger, "job_store_in_memory", logging.WARNING, path=self.path, error=str(e))
+            self.path = ":memory:"
+            return self._create_tables(sqlite3.connect(self.path, check_same_thread=False))
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " filename TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (job_id, seq));"
+        )
+        conn.commit()
+        return conn
+
+    def create(self, job_id: str, filename: Optional[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, stage, filename, created_at, updated_at)"
+                " VALUES (?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, filename, now, now),
+            )
+            self._conn.commit()
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        stage: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (status, stage, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def add_event(self, job_id: str, stage: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            seq = self._insert_event(job_id, stage, data, now)
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ?", (stage, now, job_id)
+            )
+            self._conn.commit()
+        return {"seq": seq, "stage": stage, "data": data, "time": now}
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        data: Dict[str, Any],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Set a terminal status and add its event in one transaction, so a
+        reader that sees the status also sees the event.
+        """
+        now = time.time()
+        with self._lock:
+            seq = self._insert_event(job_id, status, data, now)
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (status, status, json.dumps(result) if result is not None else None, error, now, job_id),
+            )
+            self._conn.commit()
+        return {"seq": seq, "stage": status, "data": data, "time": now}
+
+    def _insert_event(self, job_id: str, stage: str, data: Dict[str, Any], now: float) -> int:
+        seq = self._conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        self._conn.execute(
+            "INSERT INTO job_events (job_id, seq, stage, data, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, seq, stage, json.dumps(data), now),
+        )
+        return seq
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, stage, filename, result, error, created_at, updated_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "stage": row[2],
+            "filename": row[3],
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7],
+        }
+
+    def events(self, job_id: str, after_seq: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, stage, data, created_at FROM job_events"
+                " WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq),
+            ).fetchall()
+        return [
+            {"seq": seq, "stage": stage, "data": json.loads(data), "time": created_at}
+            for seq, stage, data, created_at in rows
+        ]
+
+    def fail_unfinished(self, reason: str) -> int:
+        """
+        Mark jobs left queued/running by a previous process as failed.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', stage = 'failed', error = ?, updated_at = ?"
+                " WHERE status NOT IN ('completed', 'failed')",
+                (reason, time.time()),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def prune(self, finished_before: float) -> int:
+        """
+        Delete jobs that finished before this time, with their events.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_events WHERE job_id IN"
+                " (SELECT id FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?)",
+                (finished_before,),
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                (finished_before,),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class JobManager:
+    """
+    Bounded in-process worker pool for analysis jobs.
+    Submissions beyond JOB_QUEUE_MAX_DEPTH are rejected (backpressure).
+    Store writes run on one background thread, off the event loop and in
+    the order they were made; reads run in the default executor.
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_queue_depth: int, retention_seconds: float = 0):
+        self.store = store
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.retention_seconds = retention_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _write(self, method, *args, **kwargs) -> asyncio.Future:
+        return asyncio.get_event_loop().run_in_executor(self._writer, partial(method, *args, **kwargs))
+
+    def _read(self, method, *args) -> asyncio.Future:
+        return asyncio.get_event_loop().run_in_executor(None, method, *args)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._read(self.store.get, job_id)
+
+    async def start(self) -> None:
+        interrupted = await self._write(self.store.fail_unfinished, "Interrupted by server restart")
+        if interrupted:
+            log_event(logger, "jobs_interrupted", logging.WARNING, jobs=interrupted)
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.retention_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Drop spooled uploads of jobs that never ran
+        while self._queue is not None and not self._queue.empty():
+            job_id, spooled, _ = self._queue.get_nowait()
+            spooled.cleanup()
+            await self._finish(job_id, "failed", error="Server shut down before the job ran")
+
+    async def submit(self, spooled: SpooledPDF, ipo_data: IPOAnalysisRequest) -> str:
+        """
+        Queue an analysis and return its job id. Takes ownership of spooled.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+        if self._queue.full():
+            raise JobQueueFullError(f"Analysis queue is full ({self.max_queue_depth} jobs waiting)")
+
+        job_id = uuid.uuid4().hex
+        # Queued before the worker's writes, so the row exists when it runs
+        created = self._write(self.store.create, job_id, spooled.filename)
+        self._queue.put_nowait((job_id, spooled, ipo_data))
+        self._publish(job_id, "queued", {"queue_depth": self._queue.qsize()})
+        await created
+        return job_id
+
+    async def events(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield stored events, then live ones until the job finishes.
+        Yields None when no event arrived within `heartbeat` seconds.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            last_seq = 0
+            for event in await self._read(self.store.events, job_id):
+                last_seq = event["seq"]
+                yield event
+
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job["status"] in TERMINAL_STATUSES:
+                # Finished between the replay and the status check
+                for event in await self._read(self.store.events, job_id, last_seq):
+                    yield event
+                return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["seq"] <= last_seq:
+                    continue
+                last_seq = event["seq"]
+                yield event
+                if event["stage"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def _publish(self, job_id: str, stage: str, data: Dict[str, Any]) -> asyncio.Future:
+        written = self._write(self.store.add_event, job_id, stage, data)
+        written.add_done_callback(partial(self._deliver, job_id))
+        return written
+
+    async def _finish(self, job_id: str, status: str, data: Optional[Dict[str, Any]] = None, **fields: Any) -> None:
+        written = self._write(self.store.finish, job_id, status, data or {}, **fields)
+        written.add_done_callback(partial(self._deliver, job_id))
+        await written
+
+    def _deliver(self, job_id: str, written: asyncio.Future) -> None:
+        if written.cancelled():
+            return
+        if written.exception() is not None:
+            log_event(logger, "job_event_write_failed", logging.WARNING, job_id=job_id, error=str(written.exception()))
+            return
+        for queue in self._subscribers.get(job_id, []):
+            queue.put_nowait(written.result())
+
+    async def _sweeper(self) -> None:
+        while True:
+            try:
+                pruned = await self._write(self.store.prune, time.time() - self.retention_seconds)
+            except (sqlite3.Error, OSError) as e:
+                log_event(logger, "job_prune_failed", logging.WARNING, error=str(e))
+            else:
+                if pruned:
+                    log_event(logger, "jobs_pruned", jobs=pruned)
+            await asyncio.sleep(min(SWEEP_INTERVAL_SECONDS, self.retention_seconds))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, spooled, ipo_data = await self._queue.get()
+            try:
+                await self._run(job_id, spooled, ipo_data)
+            finally:
+                spooled.cleanup()
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, spooled: SpooledPDF, ipo_data: IPOAnalysisRequest) -> None:
+        # Each worker task has its own context; tag this job's log records
+        request_id_var.set(job_id)
+        started = time.perf_counter()
+        self._write(self.store.update, job_id, "running", "started")
+        self._publish(job_id, "started", {})
+
+        def progress(stage: str, details: Dict[str, Any]) -> None:
+            self._publish(job_id, stage, details)
+
+        try:
+            result = await run_analysis(spooled, ipo_data, progress=progress)
+            # Stored as the status response's result model, so it must fit it
+            result = build_analysis_result(result).model_dump()
+        except asyncio.CancelledError:
+            # Subscribers wait for a terminal event
+            await self._finish(job_id, "failed", {"error": "Cancelled"}, error="Cancelled")
+            raise
+        except Exception as e:
+            await self._finish(job_id, "failed", {"error": str(e)}, error=f"{type(e).__name__}: {e}")
+            log_event(
+                logger, "job_failed", logging.WARNING,
+                error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - started,
+            )
+            return
+
+        await self._finish(job_id, "completed", {"final_verdict": result.get("final_verdict")}, result=result)
+        log_event(logger, "job_completed", seconds=time.perf_counter() - started)
+
+
+job_manager = JobManager(
+    store=JobStore(settings.JOB_STORE_PATH),
+    workers=settings.JOB_WORKERS,
+    max_queue_depth=settings.JOB_QUEUE_MAX_DEPTH,
+    retention_seconds=settings.JOB_RETENTION_SECONDS,
+)
@@ -0,0 +1,87 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    feed() accepts raw text chunks as they arrive from the LLM and returns
+    every top-level field whose value has been fully received, so callers
+    can forward e.g. "company_overview" before "scores" has been generated.
+    Leading markdown fences or chatter before the first "{" are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # next character to scan
+        self._field_start = 0  # start of the current "key": value member
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.done = False
+        self.fields: Dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.done or not chunk:
+            return []
+
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+        i = self._pos
+
+        while i < len(buffer):
+            ch = buffer[i]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._field_start = i + 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._parse_member(buffer[self._field_start:i]))
+                    self.done = True
+                    i += 1
+                    break
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._parse_member(buffer[self._field_start:i]))
+                self._field_start = i + 1
+            i += 1
+
+        # Drop text that can no longer be part of an unfinished member
+        if self._started and self._field_start > 0:
+            trim = min(self._field_start, i)
+            self._buffer = buffer[trim:]
+            self._field_start -= trim
+            i -= trim
+        self._pos = i
+        return completed
+
+    def _parse_member(self, text: str) -> List[Tuple[str, Any]]:
+        if not text.strip():
+            return []
+        try:
+            member = json.loads("{" + text + "}")
+        except ValueError:
+            # Malformed member; the full-response parse will report it
+            return []
+        self.fields.update(member)
+        return list(member.items())
@@ -1,146 +1,875 @@
+import asyncio
 import json
+import logging
+import random
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional
 
 from app.core.config import settings
+from app.core.log import log_event, log_preview
+from app.core.metrics import (
+    LLM_ATTEMPT_SECONDS,
+    LLM_HEDGES,
+    LLM_RATE_LIMIT_WAIT_SECONDS,
+    LLM_RETRIES,
+    registry,
+    timed,
+)
+from app.services.prompt import PromptText, prompt_parts
+from app.services.rhp_sections import estimate_tokens
 
-try:
-    from groq import Groq
-except ImportError:
-    Groq = None
 
-try:
-    from google import genai
-except ImportError:
-    genai = None
+logger = logging.getLogger(__name__)
+
+# Bounded pool for providers without a native async client
+_llm_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_EXECUTOR_WORKERS,
+    thread_name_prefix="llm",
+)
 
 
 class LLMError(Exception):
     pass
 
 
-def _get_gemini_client():
+class LLMConfigError(LLMError):
+    """
+    A provider cannot be called as configured (missing API key or SDK,
+    unknown provider). Not retried and not counted by its circuit breaker.
+    """
+
+
+# Provider clients are created once per process and reused, so HTTP
+# connections stay alive between analyses. Closed on app shutdown.
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+# Provider SDKs are imported on first use, and only for the providers
+# actually called: google-genai alone takes ~0.5 s to import, which every
+# serverless cold start would otherwise pay.
+def _import_genai():
+    try:
+        from google import genai
+    except ImportError:
+        raise LLMConfigError("google-genai package is not installed. Run: pip install google-genai")
+    return genai
+
+
+def _import_groq():
+    try:
+        import groq
+    except ImportError:
+        raise LLMConfigError("groq package is not installed. Run: pip install groq")
+    return groq
+
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _get_or_create_client(name: str, factory: Callable[[], Any]) -> Any:
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory()
+                _clients[name] = client
+    return client
+
+
+def _create_gemini_client():
     if not settings.GEMINI_API_KEY:
-        raise LLMError("GEMINI_API_KEY is not set. Please add it to your .env file.")
-    if genai is None:
-        raise LLMError("google-genai package is not installed. Run: pip install google-genai")
-    return genai.Client(api_key=settings.GEMINI_API_KEY)
+        raise LLMConfigError("GEMINI_API_KEY is not set. Please add it to your .env file.")
+    genai = _import_genai()
+    limits = _http_limits()
+    return genai.Client(
+        api_key=settings.GEMINI_API_KEY,
+        http_options={
+            "client_args": {"limits": limits},
+            "async_client_args": {"limits": limits},
+        },
+    )
 
 
-def _get_groq_client() -> Groq:
+def _create_groq_client():
     if not settings.GROQ_API_KEY:
-        raise LLMError("GROQ_API_KEY is not set. Please add it to your .env file.")
-    if Groq is None:
-        raise LLMError("groq package is not installed. Run: pip install groq")
-    return Groq(api_key=settings.GROQ_API_KEY)
-
-
-def call_gemini_llm(prompt: str) -> Dict[str, Any]:
-    """
-    Call Google Gemini API and expect JSON output with retry logic.
-    """
-    max_retries = 3
-    retry_delay = 2
-    
-    # Log the prompt being sent
-    print("\n" + "="*80)
-    print(" SENDING TO GEMINI API")
-    print("="*80)
-    print(f"Model: {settings.GEMINI_MODEL}")
-    print(f"Prompt Length: {len(prompt)} characters")
-    print(f"Temperature: 1")
-    print(f"Max Tokens: 8192")
-    print("\n--- PROMPT CONTENT ---")
-    print(prompt[:1000] + "..." if len(prompt) > 1000 else prompt)
-    print("="*80 + "\n")
-    
-    for attempt in range(max_retries):
-        try:
-            client = _get_gemini_client()
-            response = client.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=[
-                    {
-                        "role": "user",
-                        "parts": [
-                            {
-                                "text": f"You are a precise IPO analyst. Respond with valid JSON only, no markdown formatting.\n\n{prompt}"
-                            }
-                        ]
-                    }
-                ],
-                config={
-                    "temperature": 1,
-                    "max_output_tokens": 8192,
-                    "top_p": 1,
-                }
-            )
-            
-            content = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            elif content.startswith("```"):
-                content = content[3:]  # Remove ```
-            
-            if content.endswith("```"):
-                content = content[:-3]  # Remove trailing ```
-            
-            content = content.strip()
+        raise LLMConfigError("GROQ_API_KEY is not set. Please add it to your .env file.")
+    groq = _import_groq()
+    import httpx
 
-            try:
-                return json.loads(content)
-            except Exception as e:
-                raise LLMError(f"Failed to parse JSON from Gemini: {e}\nRaw: {content}")
-                
-        except Exception as e:
-            if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
-                print(f"Gemini API error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait_time}s...")
-                time.sleep(wait_time)
+    return groq.Groq(
+        api_key=settings.GROQ_API_KEY,
+        http_client=httpx.Client(limits=_http_limits()),
+    )
+
+
+def _create_async_groq_client():
+    if not settings.GROQ_API_KEY:
+        raise LLMConfigError("GROQ_API_KEY is not set. Please add it to your .env file.")
+    groq = _import_groq()
+    import httpx
+
+    return groq.AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        http_client=httpx.AsyncClient(limits=_http_limits()),
+    )
+
+
+def _get_gemini_client():
+    return _get_or_create_client("gemini", _create_gemini_client)
+
+
+def _get_groq_client():
+    return _get_or_create_client("groq", _create_groq_client)
+
+
+def _get_async_groq_client():
+    return _get_or_create_client("groq_async", _create_async_groq_client)
+
+
+async def close_llm_clients() -> None:
+    """
+    Close pooled provider clients and their HTTP connections.
+    """
+    with _clients_lock:
+        clients = dict(_clients)
+        _clients.clear()
+
+    for name, client in clients.items():
+        try:
+            if name == "gemini":
+                await client.aio.aclose()
+                client.close()
+            elif name == "groq_async":
+                await client.close()
             else:
-                raise LLMError(f"Gemini error after {max_retries} attempts: {e}")
+                client.close()
+        except Exception as e:
+            log_event(logger, "llm_client_close_failed", logging.WARNING, client=name, error=str(e))
+
+
+GEMINI_PREAMBLE = "You are a precise IPO analyst. Respond with valid JSON only, no markdown formatting.\n\n"
+
+
+def _gemini_request(prompt: PromptText) -> Dict[str, Any]:
+    # Each prompt part is its own content part, so the document is not
+    # copied into a combined string
+    return {
+        "model": settings.GEMINI_MODEL,
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": GEMINI_PREAMBLE}] + [{"text": part} for part in prompt_parts(prompt)],
+            }
+        ],
+        "config": {
+            "temperature": 1,
+            "max_output_tokens": 8192,
+            "top_p": 1,
+        },
+    }
+
+
+def _groq_request(prompt: PromptText) -> Dict[str, Any]:
+    return {
+        "model": settings.GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are a precise IPO analyst."},
+            {"role": "user", "content": str(prompt)},
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 1,
+        "max_completion_tokens": 8192,
+        "top_p": 1,
+        "stream": False,
+        "timeout": 30.0,
+    }
+
+
+def _parse_gemini_json(text: str) -> Dict[str, Any]:
+    return _parse_fenced_json(text, "Gemini")
+
+
+def _parse_fenced_json(text: str, provider: str) -> Dict[str, Any]:
+    content = text.strip()
+
+    # Remove markdown code blocks if present
+    if content.startswith("```json"):
+        content = content[7:]  # Remove ```json
+    elif content.startswith("```"):
+        content = content[3:]  # Remove ```
+
+    if content.endswith("```"):
+        content = content[:-3]  # Remove trailing ```
+
+    content = content.strip()
+
+    try:
+        with timed("json_parse"):
+            return json.loads(content)
+    except Exception as e:
+        raise LLMError(f"Failed to parse JSON from {provider}: {e}\nRaw: {content}")
+
+
+def _parse_groq_json(content: str) -> Dict[str, Any]:
+    try:
+        with timed("json_parse"):
+            return json.loads(content)
+    except Exception as e:
+        raise LLMError(f"Failed to parse JSON from Groq: {e}\nRaw: {content}")
+
+
+def _observe_attempt(provider: str, started: float, outcome: str) -> None:
+    LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - started, provider=provider, outcome=outcome)
 
 
-def call_groq_llm(prompt: str) -> Dict[str, Any]:
+def _log_gemini_prompt(prompt: PromptText) -> None:
+    log_event(logger, "gemini_request", model=settings.GEMINI_MODEL, prompt_chars=len(prompt))
+    log_preview(logger, "gemini_prompt_preview", prompt, 1000)
+
+
+def call_gemini_llm(prompt: PromptText) -> Dict[str, Any]:
+    """
+    One Gemini call, parsed as JSON. Retries and failover are the
+    dispatcher's job (see call_llm).
+    """
+    _log_gemini_prompt(prompt)
+    client = _get_gemini_client()
+
+    try:
+        response = client.models.generate_content(**_gemini_request(prompt))
+    except Exception as e:
+        raise LLMError(f"Gemini error: {e}")
+
+    return _parse_gemini_json(response.text)
+
+
+def call_groq_llm(prompt: PromptText) -> Dict[str, Any]:
     """
     Call Groq chat completion API and expect JSON output.
     """
     client = _get_groq_client()
 
     try:
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a precise IPO analyst."},
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=1,
-            max_completion_tokens=8192,
-            top_p=1,
-            stream=False,
-            timeout=30.0,
-        )
+        response = client.chat.completions.create(**_groq_request(prompt))
     except Exception as e:
         raise LLMError(f"Groq error: {e}")
 
-    content = response.choices[0].message.content
+    return _parse_groq_json(response.choices[0].message.content)
+
+
+async def call_gemini_llm_async(prompt: PromptText) -> Dict[str, Any]:
+    """
+    One async Gemini call via the SDK's aio client.
+    """
+    _log_gemini_prompt(prompt)
+    client = _get_gemini_client()
 
     try:
-        return json.loads(content)
+        aio = getattr(client, "aio", None)
+        if aio is not None:
+            response = await aio.models.generate_content(**_gemini_request(prompt))
+        else:
+            # Older SDKs without an aio client: run in the bounded pool
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _llm_executor,
+                lambda: client.models.generate_content(**_gemini_request(prompt)),
+            )
     except Exception as e:
-        raise LLMError(f"Failed to parse JSON from Groq: {e}\nRaw: {content}")
+        raise LLMError(f"Gemini error: {e}")
+
+    return _parse_gemini_json(response.text)
+
+
+async def call_groq_llm_async(prompt: PromptText) -> Dict[str, Any]:
+    """
+    Async Groq chat completion call.
+    """
+    client = _get_async_groq_client()
+
+    try:
+        response = await client.chat.completions.create(**_groq_request(prompt))
+    except Exception as e:
+        raise LLMError(f"Groq error: {e}")
+
+    return _parse_groq_json(response.choices[0].message.content)
+
+
+async def stream_gemini_llm_async(prompt: PromptText) -> AsyncIterator[str]:
+    """
+    Stream Gemini output as text deltas. Not retried once output has started.
+    """
+    _log_gemini_prompt(prompt)
+    client = _get_gemini_client()
+
+    try:
+        aio = getattr(client, "aio", None)
+        if aio is not None:
+            stream = await aio.models.generate_content_stream(**_gemini_request(prompt))
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        else:
+            # Older SDKs without an aio client: one call in the bounded
+            # pool, as a single delta
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _llm_executor,
+                lambda: client.models.generate_content(**_gemini_request(prompt)),
+            )
+            if response.text:
+                yield response.text
+    except Exception as e:
+        raise LLMError(f"Gemini streaming error: {e}")
+
+
+async def stream_groq_llm_async(prompt: PromptText) -> AsyncIterator[str]:
+    """
+    Stream Groq output as text deltas. JSON mode is not used while streaming;
+    the prompt already asks for JSON only.
+    """
+    client = _get_async_groq_client()
+    request = _groq_request(prompt)
+    request.pop("response_format")
+    request["stream"] = True
+
+    try:
+        stream = await client.chat.completions.create(**request)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise LLMError(f"Groq streaming error: {e}")
+
+
+class _TokenBucket:
+    """
+    Refills at per_minute / 60 units per second up to one minute's worth,
+    matching how provider quotas are stated. 0 means unlimited.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.clock = clock
+        self.updated = clock()
+
+    def wait_time(self, amount: float) -> float:
+        if not self.capacity:
+            return 0.0
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A single request larger than the bucket waits for a full bucket
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Token buckets for requests per minute and (estimated) prompt tokens per
+    minute. Callers wait for quota instead of getting 429s, and are served
+    in arrival order (asyncio.Lock is FIFO). Blocking callers use
+    acquire_sync from their own threads against the same buckets.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0, clock: Callable[[], float] = time.monotonic):
+        self.requests = _TokenBucket(requests_per_minute, clock)
+        self.tokens = _TokenBucket(tokens_per_minute, clock)
+        self.waiting = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._sync_lock = threading.Lock()
+        # Guards the buckets, which the event loop and blocking callers share
+        self._buckets_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests.capacity or self.tokens.capacity)
+
+    def _try_take(self, tokens: int) -> float:
+        """
+        Take one request of this many tokens if it fits in both buckets
+        (returns 0), else the time to wait before trying again.
+        """
+        with self._buckets_lock:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait <= 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+            return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until one request of this many tokens fits in both buckets.
+        Returns the time spent waiting.
+        """
+        if not self.enabled:
+            return 0.0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait = self._try_take(tokens)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+        return time.perf_counter() - started
+
+    def acquire_sync(self, tokens: int = 0) -> float:
+        """
+        Blocking acquire, for callers outside the event loop.
+        """
+        if not self.enabled:
+            return 0.0
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            with self._sync_lock:
+                while True:
+                    wait = self._try_take(tokens)
+                    if wait <= 0:
+                        break
+                    time.sleep(wait)
+        finally:
+            self.waiting -= 1
+        return time.perf_counter() - started
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+# Shared by every provider, for quotas that span them (e.g. one account)
+GLOBAL_LIMITER = "global"
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    limiter = _rate_limiters.get(provider)
+    if limiter is None:
+        rpm, tpm = {
+            GLOBAL_LIMITER: (settings.LLM_GLOBAL_RPM, settings.LLM_GLOBAL_TPM),
+            "gemini": (settings.GEMINI_RPM, settings.GEMINI_TPM),
+            "groq": (settings.GROQ_RPM, settings.GROQ_TPM),
+        }.get(provider, (0, 0))
+        limiter = _rate_limiters[provider] = RateLimiter(rpm, tpm)
+    return limiter
+
+
+async def _acquire_quota(provider: str, prompt: PromptText) -> None:
+    tokens = estimate_tokens(prompt)
+    waited = await get_rate_limiter(GLOBAL_LIMITER).acquire(tokens)
+    waited += await get_rate_limiter(provider).acquire(tokens)
+    if waited > 0:
+        LLM_RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=provider)
+
+
+def _acquire_quota_sync(provider: str, prompt: PromptText) -> None:
+    tokens = estimate_tokens(prompt)
+    waited = get_rate_limiter(GLOBAL_LIMITER).acquire_sync(tokens)
+    waited += get_rate_limiter(provider).acquire_sync(tokens)
+    if waited > 0:
+        LLM_RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=provider)
+
+
+registry.register_callback(
+    "ipo_llm_rate_limit_waiting",
+    "gauge",
+    "Requests queued for rate limiter quota",
+    lambda: [({"limiter": name}, limiter.waiting) for name, limiter in list(_rate_limiters.items())],
+)
+
+
+class LLMProvider(NamedTuple):
+    """
+    One provider as seen by the dispatcher. call/call_sync make a single
+    attempt and return the parsed JSON (raising on errors or invalid JSON);
+    stream yields raw text deltas.
+    """
+    call: Callable[[PromptText], Awaitable[Dict[str, Any]]]
+    call_sync: Optional[Callable[[PromptText], Dict[str, Any]]] = None
+    stream: Optional[Callable[[PromptText], AsyncIterator[str]]] = None
+    model: str = ""
+
+
+_providers: Dict[str, LLMProvider] = {
+    "gemini": LLMProvider(call_gemini_llm_async, call_gemini_llm, stream_gemini_llm_async),
+    "groq": LLMProvider(call_groq_llm_async, call_groq_llm, stream_groq_llm_async),
+}
+
+
+def register_provider(name: str, provider: LLMProvider) -> None:
+    """
+    Add or replace a provider, e.g. a local fake for tests and benchmarks.
+    """
+    _providers[name] = provider
+    _breakers.pop(name, None)
+
+
+def provider_chain() -> List[str]:
+    """
+    Providers in the order they are tried: LLM_PROVIDER_CHAIN, or just
+    LLM_PROVIDER when no chain is configured.
+    """
+    return list(settings.LLM_PROVIDER_CHAIN) or [settings.LLM_PROVIDER]
+
+
+# Pooled clients each built-in provider uses, for warm_up_llm_clients
+_provider_clients: Dict[str, List[Callable[[], Any]]] = {
+    "gemini": [_get_gemini_client],
+    "groq": [_get_groq_client, _get_async_groq_client],
+}
+
+
+def warm_up_llm_clients() -> None:
+    """
+    Import the SDKs of the providers in the chain and create their clients
+    ahead of the first call. Failures (missing API key or package) are
+    logged; the first call reports them again.
+    """
+    for name in provider_chain():
+        for get_client in _provider_clients.get(name, []):
+            try:
+                get_client()
+            except LLMError as e:
+                log_event(logger, "llm_warm_up_failed", logging.WARNING, provider=name, error=str(e))
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, so a provider that
+    is down is skipped instead of costing every request its retries. After
+    reset_seconds one trial call is let through (half-open): success closes
+    the breaker, failure opens it again. A call that ends with neither
+    (cancelled) must release() its slot.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        End an allowed call without a verdict on the provider, e.g. when it
+        was cancelled, so a half-open trial is not held forever.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        breaker = _breakers.setdefault(
+            provider,
+            CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS),
+        )
+    return breaker
+
+
+registry.register_callback(
+    "ipo_llm_circuit_open",
+    "gauge",
+    "1 while a provider's circuit breaker is open",
+    lambda: [({"provider": name}, int(breaker.state == "open")) for name, breaker in list(_breakers.items())],
+)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for retry number attempt (0-based).
+    """
+    ceiling = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+def _get_provider(name: str) -> LLMProvider:
+    provider = _providers.get(name)
+    if provider is None:
+        raise LLMConfigError(f"Unsupported LLM provider: {name}")
+    return provider
+
+
+def _log_retry(name: str, attempt: int, wait: float, error: Exception) -> None:
+    LLM_RETRIES.inc(provider=name)
+    log_event(
+        logger, "llm_retry", logging.WARNING,
+        provider=name, attempt=attempt + 1, max_attempts=settings.LLM_MAX_ATTEMPTS,
+        wait_seconds=wait, error=str(error),
+    )
+
+
+async def _call_provider_async(name: str, prompt: PromptText) -> Dict[str, Any]:
+    """
+    Call one provider with retries, honouring its rate limiter and breaker.
+    """
+    provider = _get_provider(name)
+    breaker = get_circuit_breaker(name)
+    last_error: Optional[Exception] = None
+
+    for attempt in range(settings.LLM_MAX_ATTEMPTS):
+        if not breaker.allow():
+            raise LLMError(f"{name} circuit breaker is open" + (f" (last error: {last_error})" if last_error else ""))
+        started = time.perf_counter()
+        try:
+            await _acquire_quota(name, prompt)
+            started = time.perf_counter()
+            result = await provider.call(prompt)
+        except LLMConfigError:
+            # Retrying cannot help, and the provider itself is not failing
+            breaker.release()
+            raise
+        except Exception as e:
+            _observe_attempt(name, started, "error")
+            breaker.record_failure()
+            last_error = e
+            if attempt < settings.LLM_MAX_ATTEMPTS - 1:
+                wait = backoff_delay(attempt)
+                _log_retry(name, attempt, wait, e)
+                await asyncio.sleep(wait)
+            continue
+        except BaseException:
+            # Cancelled (e.g. the losing hedge) while queued or in flight
+            breaker.release()
+            raise
+        _observe_attempt(name, started, "ok")
+        breaker.record_success()
+        return result
+
+    raise LLMError(f"{name} error after {settings.LLM_MAX_ATTEMPTS} attempts: {last_error}")
+
+
+async def _call_chain_async(prompt: PromptText, chain: List[str]) -> Dict[str, Any]:
+    errors = []
+    for name in chain:
+        try:
+            return await _call_provider_async(name, prompt)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            log_event(logger, "llm_provider_failed", logging.WARNING, provider=name, error=str(e))
+    raise LLMError("All LLM providers failed. " + "; ".join(errors))
+
+
+async def _call_hedged_async(prompt: PromptText, chain: List[str]) -> Dict[str, Any]:
+    """
+    Start the first provider; if it has not succeeded within
+    LLM_HEDGE_DELAY_SECONDS (or fails sooner), also start the rest of the
+    chain, and return whichever valid result arrives first.
+    """
+    primary = asyncio.create_task(_call_provider_async(chain[0], prompt))
+    done, _ = await asyncio.wait({primary}, timeout=settings.LLM_HEDGE_DELAY_SECONDS)
+    if primary in done and primary.exception() is None:
+        return primary.result()
+
+    LLM_HEDGES.inc()
+    log_event(logger, "llm_hedge_started", primary=chain[0], hedge=chain[1], primary_failed=primary.done())
+    hedge = asyncio.create_task(_call_chain_async(prompt, chain[1:]))
+    pending = {hedge} if primary.done() else {primary, hedge}
+    errors = [f"{chain[0]}: {primary.exception()}"] if primary.done() else []
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                errors.append(str(task.exception()))
+        raise LLMError("All LLM providers failed. " + "; ".join(errors))
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _provider_model(name: str) -> str:
+    if name == "gemini":
+        return settings.GEMINI_MODEL
+    elif name == "groq":
+        return settings.GROQ_MODEL
+    provider = _providers.get(name)
+    return provider.model if provider is not None else ""
+
+
+def get_llm_model() -> str:
+    """
+    Model name of the first provider in the chain.
+    """
+    return _provider_model(provider_chain()[0])
+
+
+def get_llm_models() -> List[str]:
+    """
+    "provider:model" for every provider in the chain, any of which may
+    answer a call.
+    """
+    return [f"{name}:{_provider_model(name)}" for name in provider_chain()]
+
+
+def call_llm(prompt: PromptText) -> Dict[str, Any]:
+    """
+    Dispatcher for LLM provider: tries the provider chain in order, each
+    provider with retries and exponential backoff, within the same rate
+    limits as the async calls. No hedging (blocking).
+    """
+    errors = []
+    for name in provider_chain():
+        provider = _get_provider(name)
+        if provider.call_sync is None:
+            errors.append(f"{name}: no synchronous client")
+            continue
+        breaker = get_circuit_breaker(name)
+        for attempt in range(settings.LLM_MAX_ATTEMPTS):
+            if not breaker.allow():
+                errors.append(f"{name}: circuit breaker is open")
+                break
+            started = time.perf_counter()
+            try:
+                _acquire_quota_sync(name, prompt)
+                started = time.perf_counter()
+                result = provider.call_sync(prompt)
+            except LLMConfigError as e:
+                breaker.release()
+                errors.append(f"{name}: {e}")
+                break
+            except Exception as e:
+                _observe_attempt(name, started, "error")
+                breaker.record_failure()
+                if attempt == settings.LLM_MAX_ATTEMPTS - 1:
+                    errors.append(f"{name}: error after {settings.LLM_MAX_ATTEMPTS} attempts: {e}")
+                    break
+                wait = backoff_delay(attempt)
+                _log_retry(name, attempt, wait, e)
+                time.sleep(wait)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            _observe_attempt(name, started, "ok")
+            breaker.record_success()
+            return result
+    raise LLMError("All LLM providers failed. " + "; ".join(errors))
+
+
+async def call_llm_async(prompt: PromptText) -> Dict[str, Any]:
+    """
+    Async dispatcher for LLM provider. Does not block the event loop.
+    Tries the provider chain in order, or hedges across it when
+    LLM_HEDGE_DELAY_SECONDS is set and more than one provider is configured.
+    """
+    chain = provider_chain()
+    if settings.LLM_HEDGE_DELAY_SECONDS > 0 and len(chain) > 1:
+        return await _call_hedged_async(prompt, chain)
+    return await _call_chain_async(prompt, chain)
+
+
+async def stream_llm_async(
+    prompt: PromptText,
+    on_provider: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming dispatcher for LLM provider: yields raw text deltas. Fails
+    over to the next provider only while no output has been sent.
+    on_provider is called with the name of the provider that answers,
+    before its first delta.
+    """
+    errors = []
+    for name in provider_chain():
+        provider = _get_provider(name)
+        breaker = get_circuit_breaker(name)
+        if provider.stream is None or not breaker.allow():
+            errors.append(f"{name}: unavailable")
+            continue
+
+        started = time.perf_counter()
+        streamed = False
+        try:
+            await _acquire_quota(name, prompt)
+            started = time.perf_counter()
+            async for chunk in provider.stream(prompt):
+                if not streamed and on_provider is not None:
+                    on_provider(name)
+                streamed = True
+                yield chunk
+        except LLMConfigError as e:
+            breaker.release()
+            errors.append(f"{name}: {e}")
+            log_event(logger, "llm_provider_failed", logging.WARNING, provider=name, error=str(e))
+            continue
+        except Exception as e:
+            _observe_attempt(name, started, "error")
+            breaker.record_failure()
+            if streamed:
+                raise
+            errors.append(f"{name}: {e}")
+            log_event(logger, "llm_provider_failed", logging.WARNING, provider=name, error=str(e))
+            continue
+        except BaseException:
+            # Cancelled or closed mid-stream, e.g. the SSE client went away
+            breaker.release()
+            raise
+        _observe_attempt(name, started, "ok")
+        breaker.record_success()
+        return
+    raise LLMError("All LLM providers failed. " + "; ".join(errors))
 
 
-def call_llm(prompt: str) -> Dict[str, Any]:
+def parse_llm_json(text: str, provider: Optional[str] = None) -> Dict[str, Any]:
     """
-    Dispatcher for LLM provider.
+    Parse a complete (streamed) LLM response from provider (default: the
+    first in the chain), tolerating markdown fences.
     """
-    if settings.LLM_PROVIDER == "gemini":
-        return call_gemini_llm(prompt)
-    elif settings.LLM_PROVIDER == "groq":
-        return call_groq_llm(prompt)
-    else:
-        raise LLMError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
\ No newline at end of file
+    return _parse_fenced_json(text, (provider or provider_chain()[0]).capitalize())
@@ -1,63 +1,981 @@
 from fastapi import UploadFile
-import pdfplumber
 import io
 import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from app.core.config import settings
+from app.core.log import log_event, log_preview
+from app.core.metrics import PDF_PAGES, record_stage, registry
+from app.services.rhp_sections import (
+    FRONT_MATTER_KEY,
+    classify_heading,
+    find_headings,
+    parse_toc_entries,
+    section_weight,
+)
 
-def _extract_pdf_text_sync(content: bytes, max_chars: int = None) -> tuple:
+
+# PDF libraries are imported on first use rather than with this module:
+# pdfplumber (with pdfminer) and pypdfium2 would otherwise add ~0.25 s to
+# every serverless cold start, including requests that never open a PDF.
+def _import_pdfplumber():
+    import pdfplumber
+
+    return pdfplumber
+
+
+def import_pypdfium2():
+    """
+    pypdfium2, or None when it is not installed. Hold pdfium_lock while
+    using it.
+    """
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
+
+def _import_pypdf():
+    try:
+        import pypdf
+    except ImportError:
+        return None
+    return pypdf
+
+
+def _import_pytesseract():
+    try:
+        import pytesseract
+    except ImportError:
+        return None
+    return pytesseract
+
+
+def warm_up_pdf_libraries() -> None:
+    """
+    Import the PDF libraries extraction uses, ahead of the first upload.
+    """
+    _import_pdfplumber()
+    import_pypdfium2()
+    if settings.PDF_TEXT_EXTRACTOR == "pypdf":
+        _import_pypdf()
+    if settings.PDF_OCR_ENABLED:
+        ocr_available()
+
+
+# A PDF is either a path on disk (uploads) or raw bytes (benchmarks, scripts)
+PDFSource = Union[str, bytes]
+
+# Bump when the extraction output for an unchanged page would change
+PAGE_CACHE_VERSION = "page-text-2"
+
+# Characters that only show up when a font has no usable text mapping
+_GARBLED_CHAR_RE = re.compile("[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]")
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_NUMBER_TOKEN_RE = re.compile(r"^\(?[-+]?[\d,]*\d(\.\d+)?\)?%?$")
+
+# Cover pages before printed page 1 that page triage allows for when it
+# maps table-of-contents page numbers to PDF pages
+_MAX_TOC_PAGE_OFFSET = 60
+
+logger = logging.getLogger(__name__)
+
+_process_pool = None
+# True inside the pool's worker processes, which must not submit to the pool
+_in_pool_worker = False
+# Whether Tesseract can be run; checked on first use
+_ocr_available: Optional[bool] = None
+
+# PDFium is not thread-safe; worker processes each have their own copy
+pdfium_lock = threading.Lock()
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class SpooledPDF:
+    """
+    An uploaded PDF streamed to a temp file on disk, with its SHA-256 and size.
+    """
+
+    def __init__(self, path: str, sha256: str, size: int, filename: str = None, owned: bool = True):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.filename = filename
+        self.owned = owned  # only temp files we created are deleted
+
+    @classmethod
+    def from_path(cls, path: str, chunk_size: int = 1024 * 1024) -> "SpooledPDF":
+        """
+        Wrap an existing PDF on disk (CLI, scripts). cleanup() leaves it in place.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+                size += len(chunk)
+        return cls(path, hasher.hexdigest(), size, os.path.basename(path), owned=False)
+
+    def cleanup(self) -> None:
+        if not self.owned:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class PageTextCache:
+    """
+    On-disk cache of extracted text per page, keyed on a fingerprint of the
+    page's content streams, fonts and box. Shared by the extraction worker
+    processes, each of which opens its own SQLite connection.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        # Connections must not cross fork() into the extraction workers
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_text ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            # e.g. a read-only filesystem: extract without caching
+            log_event(logger, "page_cache_disabled", logging.WARNING, path=self.path, error=str(e))
+            self.path = ""
+            return None
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        if not self.enabled or not keys:
+            return {}
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            found: Dict[str, str] = {}
+            unique = list(dict.fromkeys(keys))
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    conn.execute(
+                        f"SELECT key, text FROM page_text WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                )
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE page_text SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                conn.commit()
+        return found
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        if not self.enabled or not items:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.executemany(
+                "INSERT OR REPLACE INTO page_text (key, text, accessed_at) VALUES (?, ?, ?)",
+                [(key, text, now) for key, text in items.items()],
+            )
+            # Evict least recently used pages beyond the size limit
+            conn.execute(
+                "DELETE FROM page_text WHERE key IN ("
+                " SELECT key FROM page_text ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def record(self, pages: int, cached_pages: int) -> None:
+        """
+        Count one extraction. Called in the parent process, since the
+        lookups themselves may have happened in worker processes.
+        """
+        with self._lock:
+            self.hits += cached_pages
+            self.misses += pages - cached_pages
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+page_cache = PageTextCache(settings.PAGE_CACHE_PATH, settings.PAGE_CACHE_MAX_ENTRIES)
+
+registry.register_callback(
+    "ipo_page_cache_lookups_total",
+    "counter",
+    "Per-page extracted text cache lookups",
+    lambda: [({"result": "hit"}, page_cache.hits), ({"result": "miss"}, page_cache.misses)],
+)
+
+
+def _record_extraction(
+    pages_read: int,
+    cached_pages: int,
+    seconds: float,
+    skipped_pages: int = 0,
+    ocr_pages: int = 0,
+) -> None:
+    page_cache.record(pages_read, cached_pages)
+    PDF_PAGES.inc(pages_read - cached_pages, source="extracted")
+    PDF_PAGES.inc(cached_pages, source="cache")
+    PDF_PAGES.inc(skipped_pages, source="skipped")
+    PDF_PAGES.inc(ocr_pages, source="ocr")
+    record_stage("extract_pdf", seconds)
+
+
+class TextExtractor:
+    """
+    Page text backend. extract() returns the text of the requested pages;
+    pages it cannot handle are left out and go to the layout extractor.
+    """
+
+    name = ""
+    # Fast backends skip layout analysis; their output is checked page by
+    # page and poor pages are re-extracted with pdfplumber
+    fast = False
+
+    def extract(self, pdf, source: PDFSource, indices: List[int]) -> Dict[int, str]:
+        raise NotImplementedError
+
+
+class PdfplumberExtractor(TextExtractor):
+    """
+    Character-level layout analysis. Slow, but the reference output and the
+    best choice for tables.
+    """
+
+    name = "pdfplumber"
+
+    def extract(self, pdf, source: PDFSource, indices: List[int]) -> Dict[int, str]:
+        texts = {}
+        for i in indices:
+            page = pdf.pages[i]
+            texts[i] = page.extract_text() or ""
+            # Drop pdfplumber's per-page layout cache, otherwise RSS grows with page count
+            page.close()
+        return texts
+
+
+class PdfiumExtractor(TextExtractor):
+    """
+    PDFium's text page API (pypdfium2, already installed with pdfplumber).
+    """
+
+    name = "pdfium"
+    fast = True
+
+    def extract(self, pdf, source: PDFSource, indices: List[int]) -> Dict[int, str]:
+        pypdfium2 = import_pypdfium2()
+        if pypdfium2 is None:
+            raise RuntimeError("pypdfium2 is not installed. Install it with: pip install pypdfium2")
+        texts = {}
+        with pdfium_lock:
+            document = pypdfium2.PdfDocument(source)
+            try:
+                for i in indices:
+                    page = document[i]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_bounded()
+                    textpage.close()
+                    page.close()
+                    texts[i] = text.replace("\r\n", "\n").replace("\r", "\n")
+            finally:
+                document.close()
+        return texts
+
+
+class PypdfExtractor(TextExtractor):
+    """
+    pypdf's content stream text extraction (pure Python, optional dependency).
+    """
+
+    name = "pypdf"
+    fast = True
+
+    def extract(self, pdf, source: PDFSource, indices: List[int]) -> Dict[int, str]:
+        pypdf = _import_pypdf()
+        if pypdf is None:
+            raise RuntimeError("pypdf is not installed. Install it with: pip install pypdf")
+        reader = pypdf.PdfReader(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+        return {i: reader.pages[i].extract_text() or "" for i in indices}
+
+
+TEXT_EXTRACTORS: Dict[str, TextExtractor] = {
+    extractor.name: extractor
+    for extractor in (PdfplumberExtractor(), PdfiumExtractor(), PypdfExtractor())
+}
+
+
+def get_text_extractor(name: str = None) -> TextExtractor:
+    name = name or settings.PDF_TEXT_EXTRACTOR
+    try:
+        return TEXT_EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown PDF_TEXT_EXTRACTOR {name!r}, expected one of {sorted(TEXT_EXTRACTORS)}"
+        )
+
+
+def needs_layout_extraction(text: str) -> bool:
+    """
+    True when fast-path output should be redone with pdfplumber: empty
+    pages, garbled text (unmapped glyphs, missing word spacing) and
+    table-heavy pages such as financial statements.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return True
+
+    garbled = len(_GARBLED_CHAR_RE.findall(stripped)) + 8 * len(_CID_RE.findall(stripped))
+    if garbled / len(stripped) > settings.PDF_FAST_MAX_GARBLED_RATIO:
+        return True
+
+    words = stripped.split()
+    if sum(len(word) for word in words) / len(words) > 20:
+        return True
+
+    lines = [line.split() for line in stripped.splitlines() if line.strip()]
+    numeric_lines = 0
+    for tokens in lines:
+        numbers = sum(1 for token in tokens if _NUMBER_TOKEN_RE.match(token))
+        if numbers >= 3 and numbers * 2 >= len(tokens):
+            numeric_lines += 1
+    return numeric_lines / len(lines) > settings.PDF_FAST_TABLE_LINE_RATIO
+
+
+def _stream_bytes(obj) -> bytes:
+    from pdfminer.pdftypes import resolve1
+
+    stream = resolve1(obj)
+    if stream is None:
+        return b""
+    # Raw (still compressed) bytes are cheaper than decoding and just as unique
+    data = stream.get_rawdata()
+    if data is None:
+        data = stream.get_data()
+    return data or b""
+
+
+def page_fingerprint(page, extractor: str = "") -> str:
+    """
+    Hash of everything text extraction depends on for one page: its content
+    streams, the fonts they reference (text mapping), the page box and the
+    configured extractor.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    hasher = hashlib.sha256(f"{PAGE_CACHE_VERSION}:{extractor}".encode())
+    hasher.update(repr(page.bbox).encode())
+
+    page_obj = page.page_obj
+    for content in page_obj.contents:
+        stream_data = _stream_bytes(content)
+        hasher.update(len(stream_data).to_bytes(8, "big"))
+        hasher.update(stream_data)
+
+    fonts = resolve1((page_obj.resources or {}).get("Font")) or {}
+    for name in sorted(fonts, key=str):
+        font = resolve1(fonts[name]) or {}
+        hasher.update(repr((str(name), str(font.get("BaseFont")), str(font.get("Encoding")))).encode())
+        if "ToUnicode" in font:
+            hasher.update(hashlib.sha256(_stream_bytes(font["ToUnicode"])).digest())
+
+    return hasher.hexdigest()
+
+
+def _extract_pages(pdf, source: PDFSource, indices: List[int]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Extract text for the given pages of an open PDF, reusing cached text
+    for pages whose fingerprint has been seen before. Pages the configured
+    fast extractor handles poorly are re-extracted with pdfplumber.
+    Returns: (texts, {"cached_pages", "fallback_pages"})
+    """
+    extractor = get_text_extractor()
+    keys = {}
+    if page_cache.enabled:
+        keys = {i: page_fingerprint(pdf.pages[i], extractor.name) for i in indices}
+    cached = page_cache.get_many(list(keys.values()))
+
+    texts = {i: cached[keys[i]] for i in indices if keys.get(i) in cached}
+    missing = [i for i in indices if i not in texts]
+    fallback_pages = 0
+
+    if missing and extractor.fast:
+        extracted = extractor.extract(pdf, source, missing)
+        retry = [i for i in missing if i not in extracted or needs_layout_extraction(extracted[i])]
+        extracted.update(TEXT_EXTRACTORS["pdfplumber"].extract(pdf, source, retry))
+        fallback_pages = len(retry)
+    elif missing:
+        extracted = extractor.extract(pdf, source, missing)
+    else:
+        extracted = {}
+
+    texts.update(extracted)
+    if keys:
+        page_cache.set_many({keys[i]: text for i, text in extracted.items()})
+
+    counts = {"cached_pages": len(indices) - len(missing), "fallback_pages": fallback_pages}
+    return [texts[i] for i in indices], counts
+
+
+def open_pdf(source: PDFSource):
+    """
+    Open a PDF (path or bytes) with pdfplumber.
+    """
+    pdfplumber = _import_pdfplumber()
+    if isinstance(source, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def _init_pool_worker(overrides: Dict[str, Any]) -> None:
+    global _in_pool_worker
+    _in_pool_worker = True
+    # Workers start from a fresh interpreter: carry over settings changed at runtime
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def _pool_context():
+    # Not fork: a worker forked while another thread holds pdfium_lock (or
+    # any other lock) would inherit it taken and block on its first use
+    try:
+        return multiprocessing.get_context("forkserver")
+    except ValueError:
+        return multiprocessing.get_context("spawn")
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_EXTRACTION_WORKERS,
+            mp_context=_pool_context(),
+            initializer=_init_pool_worker,
+            initargs=(settings.model_dump(),),
+        )
+    return _process_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """
+    Stop the PDF extraction worker processes, if they were started.
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def join_pages(pages: List[str]) -> str:
+    """
+    Document text with each page followed by a newline, built in a single
+    copy without a temporary string per page.
+    """
+    return "\n".join([*pages, ""])
+
+
+def _page_text(document, index: int, band: float = 1.0) -> str:
+    """
+    PDFium text of one page, or of its top `band` fraction (running headers).
+    """
+    page = document[index]
+    textpage = page.get_textpage()
+    try:
+        if band >= 1.0:
+            text = textpage.get_text_bounded()
+        else:
+            _, height = page.get_size()
+            text = textpage.get_text_bounded(bottom=height * (1.0 - band), top=height)
+    finally:
+        textpage.close()
+        page.close()
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _outline_section_starts(document, total_pages: int) -> Dict[int, str]:
+    # Unrecognised bookmarks end the previous section (None, kept by triage)
+    # unless nested under a recognised one, whose section they belong to
+    starts = {}
+    parents: Dict[int, Optional[str]] = {}
+    for bookmark in document.get_toc(max_depth=2):
+        key = classify_heading(bookmark.get_title() or "")
+        if key is None and bookmark.level > 0:
+            key = parents.get(bookmark.level - 1)
+        parents[bookmark.level] = key
+        dest = bookmark.get_dest()
+        index = dest.get_index() if dest is not None else None
+        if index is not None and 0 <= index < total_pages:
+            starts.setdefault(index, key)
+    return starts
+
+
+def _toc_section_starts(document, total_pages: int) -> Dict[int, str]:
+    entries: List[Tuple[str, int]] = []
+    toc_end = 0
+    for i in range(min(settings.PDF_TRIAGE_TOC_PAGES, total_pages)):
+        page_entries = parse_toc_entries(_page_text(document, i))
+        if page_entries:
+            entries.extend(page_entries)
+            toc_end = i
+        elif entries:
+            break
+    if len(entries) < 2:
+        return {}
+
+    # Printed page numbers usually start after unnumbered cover pages: find
+    # the offset at which the first listed section's heading appears
+    key, printed = entries[0]
+    for offset in range(_MAX_TOC_PAGE_OFFSET):
+        index = printed - 1 + offset
+        if index >= total_pages:
+            return {}
+        if index > toc_end and key in find_headings(_page_text(document, index, settings.PDF_TRIAGE_HEADER_BAND)):
+            break
+    else:
+        return {}
+
+    return {
+        printed - 1 + offset: key
+        for key, printed in entries
+        if 0 <= printed - 1 + offset < total_pages
+    }
+
+
+def _header_section_starts(document, total_pages: int) -> Dict[int, str]:
+    # Section headings or running headers at the top of each page
+    starts = {}
+    current = None
+    for i in range(total_pages):
+        headings = find_headings(_page_text(document, i, settings.PDF_TRIAGE_HEADER_BAND))
+        if headings and headings[0] != current:
+            current = headings[0]
+            starts[i] = current
+    return starts
+
+
+_SECTION_MAPPERS = (
+    ("outline", _outline_section_starts),
+    ("toc", _toc_section_starts),
+    ("headers", _header_section_starts),
+)
+
+
+def map_section_pages(source: PDFSource, total_pages: int) -> Tuple[List[Optional[str]], str]:
+    """
+    First triage pass: the RHP section of every page, from the PDF outline
+    (bookmarks), else the table of contents, else headings at the top of
+    each page; whichever first finds at least two known sections.
+    Pages under an unrecognised bookmark or TOC entry map to None.
+    Returns: (section key per page, method), or ([], "") when nothing was found
+    """
+    with pdfium_lock:
+        document = import_pypdfium2().PdfDocument(source)
+        try:
+            for method, find_starts in _SECTION_MAPPERS:
+                starts = find_starts(document, total_pages)
+                if len({key for key in starts.values() if key}) >= 2:
+                    break
+            else:
+                return [], ""
+        finally:
+            document.close()
+
+    page_sections: List[Optional[str]] = []
+    key: Optional[str] = FRONT_MATTER_KEY
+    for i in range(total_pages):
+        key = starts.get(i, key)
+        page_sections.append(key)
+    return page_sections, method
+
+
+def triage_pages(source: PDFSource, total_pages: int) -> List[int]:
+    """
+    Page indices to extract: with PDF_PAGE_TRIAGE, the pages of sections
+    weighted at least PDF_TRIAGE_MIN_SECTION_WEIGHT (business, financials,
+    risk factors, promoters, objects of the issue, ...). Pages of unknown
+    sections are kept. Everything when triage is off, the document is
+    short or its sections cannot be mapped.
+    """
+    all_pages = list(range(total_pages))
+    if not settings.PDF_PAGE_TRIAGE or import_pypdfium2() is None or total_pages < settings.PDF_TRIAGE_MIN_PAGES:
+        return all_pages
+
+    started = time.perf_counter()
+    page_sections, method = map_section_pages(source, total_pages)
+    indices = [
+        i for i, key in enumerate(page_sections)
+        if key is None or section_weight(key) >= settings.PDF_TRIAGE_MIN_SECTION_WEIGHT
+    ]
+    if not indices:
+        indices = all_pages
+
+    log_event(
+        logger, "pdf_triaged",
+        method=method or "unmapped",
+        total_pages=total_pages,
+        pages=len(indices),
+        seconds=time.perf_counter() - started,
+    )
+    return indices
+
+
+def ocr_available() -> bool:
+    """
+    Whether scanned pages can be OCRed: pytesseract and the tesseract
+    binary are installed.
+    """
+    global _ocr_available
+    if _ocr_available is None:
+        pytesseract = _import_pytesseract()
+        try:
+            _ocr_available = pytesseract is not None and bool(pytesseract.get_tesseract_version())
+        except Exception:
+            _ocr_available = False
+    return _ocr_available
+
+
+def _ocr_page_list(source: PDFSource, indices: List[int], dpi: int, lang: str) -> Dict[int, str]:
+    """
+    Render the given pages with PDFium and OCR them with Tesseract. Runs
+    inside a worker process, or inline for a single page.
+    """
+    pytesseract = _import_pytesseract()
+    texts = {}
+    with pdfium_lock:
+        document = import_pypdfium2().PdfDocument(source)
+    try:
+        for i in indices:
+            with pdfium_lock:
+                page = document[i]
+                try:
+                    image = page.render(scale=dpi / 72, grayscale=True).to_pil()
+                finally:
+                    page.close()
+            # Tesseract runs as a subprocess, outside the PDFium lock
+            texts[i] = pytesseract.image_to_string(image, lang=lang)
+    finally:
+        with pdfium_lock:
+            document.close()
+    return texts
+
+
+def _run_ocr(source: PDFSource, indices: List[int]) -> Dict[int, str]:
+    # Spread across the process pool, except inside a pool worker (batch
+    # extraction, parallel mode), which OCRs its own pages
+    dpi, lang = settings.PDF_OCR_DPI, settings.PDF_OCR_LANG
+    workers = settings.PDF_EXTRACTION_WORKERS
+    if _in_pool_worker or workers <= 1 or len(indices) == 1:
+        return _ocr_page_list(source, indices, dpi, lang)
+
+    pool = _get_process_pool()
+    futures = [
+        pool.submit(_ocr_page_list, source, indices[start:end], dpi, lang)
+        for start, end in _split_page_ranges(len(indices), workers)
+    ]
+    texts: Dict[int, str] = {}
+    for future in futures:
+        texts.update(future.result())
+    return texts
+
+
+def ocr_scanned_pages(pdf, source: PDFSource, indices: List[int], pages: List[str]) -> Dict[str, int]:
+    """
+    Second pass over extracted pages: pages with (almost) no text layer that
+    contain images are scanned, and their text is replaced in place by OCR
+    output, from the page text cache when the page was OCRed before.
+    Returns: {"scanned_pages", "ocr_pages"}
+    """
+    counts = {"scanned_pages": 0, "ocr_pages": 0}
+    if not settings.PDF_OCR_ENABLED:
+        return counts
+
+    # Only near-empty pages have their objects parsed to look for images
+    scanned = [
+        position for position, text in enumerate(pages)
+        if len(text.strip()) < settings.PDF_OCR_MIN_CHARS and pdf.pages[indices[position]].images
+    ]
+    counts["scanned_pages"] = len(scanned)
+    if not scanned:
+        return counts
+    if len(scanned) > settings.PDF_OCR_MAX_PAGES:
+        log_event(
+            logger, "pdf_ocr_truncated", logging.WARNING,
+            scanned_pages=len(scanned), max_pages=settings.PDF_OCR_MAX_PAGES,
+        )
+        scanned = scanned[:settings.PDF_OCR_MAX_PAGES]
+
+    keys = {}
+    if page_cache.enabled:
+        extractor = f"ocr:{settings.PDF_OCR_LANG}:{settings.PDF_OCR_DPI}"
+        keys = {position: page_fingerprint(pdf.pages[indices[position]], extractor) for position in scanned}
+    cached = page_cache.get_many(list(keys.values()))
+    texts = {position: cached[keys[position]] for position in scanned if keys.get(position) in cached}
+    missing = [position for position in scanned if position not in texts]
+
+    if missing and not ocr_available():
+        log_event(
+            logger, "pdf_ocr_unavailable", logging.WARNING,
+            scanned_pages=len(missing), detail="install pytesseract and the tesseract binary",
+        )
+    elif missing:
+        started = time.perf_counter()
+        ocr_texts = _run_ocr(source, [indices[position] for position in missing])
+        record_stage("ocr", time.perf_counter() - started)
+        for position in missing:
+            texts[position] = ocr_texts[indices[position]]
+        if keys:
+            page_cache.set_many({keys[position]: texts[position] for position in missing})
+
+    for position, text in texts.items():
+        pages[position] = text
+    counts["ocr_pages"] = len(texts)
+    return counts
+
+
+def _extract_pdf_text_sync(content: PDFSource, max_chars: int = None, indices: List[int] = None) -> tuple:
     """
     Synchronous PDF text extraction without character limit.
-    Extracts ALL content from the PDF document for comprehensive analysis.
-    Returns: (text, total_pages, pages_read)
+    Extracts ALL content from the PDF document for comprehensive analysis,
+    or with PDF_PAGE_TRIAGE only the pages of relevant sections (or the
+    given page indices). Unchanged pages come from the page text cache.
+    Scanned pages are OCRed (see ocr_scanned_pages).
+    Returns: (text, total_pages, pages_read,
+              {"cached_pages", "fallback_pages", "skipped_pages", "scanned_pages", "ocr_pages"})
     """
-    text = ""
-    pages_read = 0
-    
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
+    with open_pdf(content) as pdf:
         total_pages = len(pdf.pages)
-        for page in pdf.pages:
-            page_text = page.extract_text() or ""
-            text += page_text + "\n"
-            pages_read += 1
-    
-    return text, total_pages, pages_read
+        if indices is None:
+            indices = triage_pages(content, total_pages)
+        pages, counts = _extract_pages(pdf, content, indices)
+        counts.update(ocr_scanned_pages(pdf, content, indices, pages))
+
+    counts["skipped_pages"] = total_pages - len(pages)
+    text = join_pages(pages)
+    return text, total_pages, len(pages), counts
+
+
+def _extract_page_list(content: PDFSource, indices: List[int]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Extract text for the given pages. Runs inside a worker process.
+    Returns: (texts, {"cached_pages", "fallback_pages"})
+    """
+    with open_pdf(content) as pdf:
+        return _extract_pages(pdf, content, indices)
+
+
+def _split_page_ranges(total_pages: int, parts: int) -> List[Tuple[int, int]]:
+    parts = max(1, min(parts, total_pages))
+    size, extra = divmod(total_pages, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _extract_pdf_text_parallel(content: PDFSource, workers: int = None) -> tuple:
+    """
+    Parallel PDF text extraction. Splits the pages to extract (all of them,
+    or the triaged ones) into contiguous runs, extracts them in a process
+    pool and reassembles them in page order. Small documents are extracted
+    serially, where process start-up would dominate.
+    Scanned pages are then OCRed across the same pool.
+    Returns: (text, total_pages, pages_read,
+              {"cached_pages", "fallback_pages", "skipped_pages", "scanned_pages", "ocr_pages"})
+    """
+    workers = workers or settings.PDF_EXTRACTION_WORKERS
+
+    with open_pdf(content) as pdf:
+        total_pages = len(pdf.pages)
+    indices = triage_pages(content, total_pages)
+
+    if workers <= 1 or len(indices) < settings.PDF_PARALLEL_MIN_PAGES:
+        return _extract_pdf_text_sync(content, indices=indices)
+
+    # One run of pages per worker. Pass a path where possible so the PDF
+    # bytes are not pickled into every worker.
+    ranges = _split_page_ranges(len(indices), workers)
+    pool = _get_process_pool()
+    futures = [pool.submit(_extract_page_list, content, indices[start:end]) for start, end in ranges]
+
+    pages: List[str] = []
+    counts = {"cached_pages": 0, "fallback_pages": 0}
+    for future in futures:
+        texts, range_counts = future.result()
+        pages.extend(texts)
+        for key, value in range_counts.items():
+            counts[key] += value
+
+    with open_pdf(content) as pdf:
+        counts.update(ocr_scanned_pages(pdf, content, indices, pages))
 
+    counts["skipped_pages"] = total_pages - len(pages)
+    text = join_pages(pages)
+    return text, total_pages, len(pages), counts
 
-async def extract_pdf_text(file: UploadFile, max_chars: int = None) -> str:
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int = None,
+    chunk_size: int = 1024 * 1024,
+) -> SpooledPDF:
+    """
+    Stream an upload to a temp file in chunks, hashing as it goes, so the
+    PDF is never held in memory. Raises UploadTooLargeError past max_bytes.
     """
-    Reads an uploaded PDF file and extracts ALL text asynchronously.
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise UploadTooLargeError(f"Upload is {declared_size} bytes, limit is {max_bytes} bytes.")
+
+    hasher = hashlib.sha256()
+    size = 0
+    # File I/O and hashing run in the default executor, off the event loop
+    loop = asyncio.get_running_loop()
+    spool = await loop.run_in_executor(
+        None,
+        partial(
+            tempfile.NamedTemporaryFile,
+            prefix="rhp-", suffix=".pdf", dir=settings.UPLOAD_SPOOL_DIR or None, delete=False,
+        ),
+    )
+
+    def write(chunk: bytes) -> None:
+        hasher.update(chunk)
+        spool.write(chunk)
+
+    try:
+        try:
+            await file.seek(0)
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds the limit of {max_bytes} bytes.")
+                await loop.run_in_executor(None, write, chunk)
+        finally:
+            await loop.run_in_executor(None, spool.close)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+
+    return SpooledPDF(spool.name, hasher.hexdigest(), size, file.filename)
+
+
+async def extract_pdf_text(
+    pdf: SpooledPDF,
+    max_chars: int = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> str:
+    """
+    Extracts ALL text from a spooled PDF asynchronously, opening it from disk.
     No character limit - extracts complete document for comprehensive analysis.
     """
-    # Read the file content into memory
-    content = await file.read()
-    
-    print("\n" + "="*80)
-    print("📄 PDF EXTRACTION STARTED")
-    print("="*80)
-    print(f"File Name: {file.filename}")
-    print(f"File Size: {len(content)} bytes")
-    print(f"Extraction Mode: FULL DOCUMENT (No Limit)")
+    started = time.perf_counter()
+    if progress is not None:
+        progress("extraction_started", {"bytes": pdf.size})
     
-    # Run CPU-intensive PDF processing in thread pool
+    # Run CPU-intensive PDF processing off the event loop
+    if settings.PDF_EXTRACTION_MODE == "parallel":
+        extract = partial(_extract_pdf_text_parallel, pdf.path)
+    else:
+        extract = partial(_extract_pdf_text_sync, pdf.path, max_chars)
+
     loop = asyncio.get_event_loop()
-    text, total_pages, pages_read = await loop.run_in_executor(
-        None,
-        partial(_extract_pdf_text_sync, content, max_chars)
+    text, total_pages, pages_read, counts = await loop.run_in_executor(None, extract)
+    cached_pages = counts["cached_pages"]
+    _record_extraction(
+        pages_read, cached_pages, time.perf_counter() - started, counts["skipped_pages"], counts["ocr_pages"]
     )
     
-    # Calculate percentage of document read
-    percentage_read = (pages_read / total_pages * 100) if total_pages > 0 else 0
-    
-    print(f"\n✅ PDF EXTRACTION COMPLETED")
-    print(f"Total Pages in Document: {total_pages}")
-    print(f"Pages Read: {pages_read} ({percentage_read:.1f}%)")
-    print(f"Extracted Text Length: {len(text)} characters")
-    print(f"\n--- EXTRACTED TEXT PREVIEW (First 500 chars) ---")
-    print(text[:500] + "..." if len(text) > 500 else text)
-    print("="*80 + "\n")
-    
-    # Reset file pointer in case something else wants to read it later
-    await file.seek(0)
+    log_event(
+        logger, "pdf_extracted",
+        bytes=pdf.size,
+        mode=settings.PDF_EXTRACTION_MODE,
+        extractor=settings.PDF_TEXT_EXTRACTOR,
+        total_pages=total_pages,
+        pages=pages_read,
+        cached_pages=cached_pages,
+        fallback_pages=counts["fallback_pages"],
+        skipped_pages=counts["skipped_pages"],
+        scanned_pages=counts["scanned_pages"],
+        ocr_pages=counts["ocr_pages"],
+        chars=len(text),
+        seconds=time.perf_counter() - started,
+    )
+    log_preview(logger, "pdf_text_preview", text, 500)
+
+    if progress is not None:
+        progress(
+            "pages_extracted",
+            {
+                "pages": pages_read,
+                "total_pages": total_pages,
+                "cached_pages": cached_pages,
+                "fallback_pages": counts["fallback_pages"],
+                "skipped_pages": counts["skipped_pages"],
+                "ocr_pages": counts["ocr_pages"],
+                "chars": len(text),
+            },
+        )
     
     return text
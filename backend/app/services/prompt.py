@@ -0,0 +1,68 @@
+from typing import Iterable, Tuple, Union
+
+
+class Prompt:
+    """
+    A prompt kept as the ordered text parts it was built from (instruction
+    header, document text, instruction footer), so a multi-megabyte RHP is
+    referenced rather than copied into one string. Providers that accept
+    several content parts send them as they are; str(prompt) joins them
+    once, on first use, for providers that need a single string.
+    """
+
+    __slots__ = ("parts", "_length", "_text")
+
+    def __init__(self, parts: Iterable[str]):
+        self.parts: Tuple[str, ...] = tuple(part for part in parts if part)
+        self._length = sum(len(part) for part in self.parts)
+        self._text = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = "".join(self.parts)
+        return self._text
+
+    def __getitem__(self, key):
+        # Leading slices (log previews) are served without joining the parts
+        if (
+            isinstance(key, slice) and not key.start and key.step is None
+            and (key.stop is None or key.stop >= 0) and self._text is None
+        ):
+            return self.head(self._length if key.stop is None else key.stop)
+        return str(self)[key]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Prompt):
+            other = str(other)
+        return str(self) == other
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"Prompt(parts={len(self.parts)}, chars={self._length})"
+
+    def head(self, limit: int) -> str:
+        """
+        The first `limit` characters.
+        """
+        pieces = []
+        for part in self.parts:
+            if limit <= 0:
+                break
+            pieces.append(part[:limit])
+            limit -= len(part)
+        return "".join(pieces)
+
+
+# What the LLM providers accept: a plain string or a Prompt
+PromptText = Union[str, Prompt]
+
+
+def prompt_parts(prompt: PromptText) -> Tuple[str, ...]:
+    if isinstance(prompt, Prompt):
+        return prompt.parts
+    return (prompt,)
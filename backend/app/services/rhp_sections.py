@@ -0,0 +1,220 @@
+import re
+import time
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Canonical RHP sections: (key, heading pattern, relevance weight).
+# Headings in offer documents are set in capitals on a line of their own,
+# optionally prefixed with "SECTION IV -". Table-of-contents lines end with a
+# page number and therefore do not match.
+SECTION_DEFINITIONS: List[Tuple[str, str, float]] = [
+    ("risk_factors", r"RISK FACTORS", 1.0),
+    ("financial_information", r"(?:RESTATED |SUMMARY OF )?(?:CONSOLIDATED )?FINANCIAL (?:INFORMATION|STATEMENTS)", 1.0),
+    ("mdna", r"MANAGEMENT['’]?S DISCUSSION AND ANALYSIS[A-Z ,&]*", 0.95),
+    ("business_overview", r"(?:OUR BUSINESS|BUSINESS OVERVIEW|INDUSTRY OVERVIEW)", 0.9),
+    ("objects_of_issue", r"OBJECTS? OF THE (?:ISSUE|OFFER)", 0.9),
+    ("basis_for_price", r"BASIS FOR (?:THE )?(?:ISSUE|OFFER) PRICE", 0.85),
+    ("promoters", r"(?:OUR )?PROMOTERS?(?: AND PROMOTER GROUP)?", 0.8),
+    ("management", r"OUR MANAGEMENT", 0.6),
+    ("offer_summary", r"(?:SUMMARY OF (?:THE )?(?:OFFER DOCUMENT|PROSPECTUS|DRAFT RED HERRING PROSPECTUS|RED HERRING PROSPECTUS)|THE (?:ISSUE|OFFER))", 0.8),
+    ("capital_structure", r"CAPITAL STRUCTURE", 0.5),
+    ("litigation", r"OUTSTANDING LITIGATION[A-Z ,&]*", 0.35),
+    ("approvals", r"GOVERNMENT AND OTHER APPROVALS|KEY REGULATIONS AND POLICIES[A-Z ,&]*", 0.15),
+    ("legal_boilerplate", r"(?:DEFINITIONS AND ABBREVIATIONS|GENERAL INFORMATION|MATERIAL CONTRACTS[A-Z ,&]*|STATUTORY AND OTHER INFORMATION|DECLARATION|(?:ISSUE|OFFER) PROCEDURE|TERMS OF THE (?:ISSUE|OFFER)|MAIN PROVISIONS OF (?:THE )?ARTICLES OF ASSOCIATION)", 0.05),
+]
+
+FRONT_MATTER_KEY = "front_matter"
+FRONT_MATTER_WEIGHT = 0.7
+
+_SECTION_PREFIX = r"^[ \t]*(?:SECTION[ \t]+[IVXLC]+[ \t]*[-–:.]?[ \t]*)?(?:"
+_SECTION_GROUPS = "|".join(f"(?P<{key}>{pattern})" for key, pattern, _ in SECTION_DEFINITIONS)
+
+_HEADING_RE = re.compile(_SECTION_PREFIX + _SECTION_GROUPS + r")[ \t]*$", re.MULTILINE)
+
+# Bookmark titles are often in title case ("Risk Factors")
+_TITLE_RE = re.compile(_SECTION_PREFIX + _SECTION_GROUPS + r")[ \t]*$", re.IGNORECASE)
+
+# Table-of-contents lines: a heading, dot leaders or spaces, then the printed page number
+_TOC_LINE_RE = re.compile(
+    _SECTION_PREFIX + _SECTION_GROUPS + r")[ \t.…]*?[ \t.…](?P<page_number>\d{1,4})[ \t]*$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+_WEIGHTS = {key: weight for key, _, weight in SECTION_DEFINITIONS}
+_WEIGHTS[FRONT_MATTER_KEY] = FRONT_MATTER_WEIGHT
+
+# Terms that make any section more useful for the analysis (matched on lowercased text)
+_SIGNAL_RE = re.compile(
+    r"revenue|profit|ebitda|margin|net worth|borrowing|debt|cash flow|"
+    r"risk|competit|customer|promoter|valuation|price band|issue price|fresh issue",
+)
+
+
+class RHPSection(NamedTuple):
+    key: str
+    title: str
+    start: int
+    end: int
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for budgeting (no tokenizer dependency).
+    """
+    return len(text) // settings.PROMPT_CHARS_PER_TOKEN + 1
+
+
+def split_rhp_sections(rhp_text: str) -> List[RHPSection]:
+    """
+    Split RHP text into sections at recognised headings.
+    Adjacent sections of the same kind (running page headers) are merged.
+    """
+    sections: List[RHPSection] = []
+    key, title, start = FRONT_MATTER_KEY, "Front matter", 0
+
+    for match in _HEADING_RE.finditer(rhp_text):
+        match_key = match.lastgroup
+        if match_key == key:
+            continue
+        if match.start() > start:
+            sections.append(RHPSection(key, title, start, match.start()))
+        key, title, start = match_key, match.group(match_key).strip(), match.start()
+
+    if len(rhp_text) > start:
+        sections.append(RHPSection(key, title, start, len(rhp_text)))
+    return sections
+
+
+def section_weight(key: str) -> float:
+    return _WEIGHTS.get(key, 0.1)
+
+
+def classify_heading(title: str) -> Optional[str]:
+    """
+    Section key for a heading or bookmark title in any case, or None.
+    """
+    match = _TITLE_RE.match(title.strip())
+    return match.lastgroup if match else None
+
+
+def find_headings(text: str) -> List[str]:
+    """
+    Section keys of the headings (lines in capitals) in text, in order.
+    """
+    return [match.lastgroup for match in _HEADING_RE.finditer(text)]
+
+
+def parse_toc_entries(text: str) -> List[Tuple[str, int]]:
+    """
+    (section key, printed page number) for each table-of-contents line in text.
+    """
+    entries = []
+    for match in _TOC_LINE_RE.finditer(text):
+        key = next(key for key, _, _ in SECTION_DEFINITIONS if match.group(key) is not None)
+        entries.append((key, int(match.group("page_number"))))
+    return entries
+
+
+def chunk_sections(rhp_text: str, max_tokens: int) -> List[RHPSection]:
+    """
+    Split RHP text into sections, then split any section larger than
+    max_tokens into consecutive line-aligned chunks of the same kind.
+    """
+    max_chars = max_tokens * settings.PROMPT_CHARS_PER_TOKEN
+    chunks: List[RHPSection] = []
+    for section in split_rhp_sections(rhp_text):
+        start = section.start
+        while section.end - start > max_chars:
+            cut = rhp_text.rfind("\n", start, start + max_chars)
+            end = cut + 1 if cut > start else start + max_chars
+            chunks.append(RHPSection(section.key, section.title, start, end))
+            start = end
+        if section.end > start:
+            chunks.append(RHPSection(section.key, section.title, start, section.end))
+    return chunks
+
+
+def score_section(section: RHPSection, rhp_text: str) -> float:
+    """
+    Relevance score: section weight boosted by the density of analysis terms.
+    Only this section is lowercased, never a copy of the whole document
+    (an IGNORECASE scan avoids the copy but is several times slower).
+    """
+    length = section.end - section.start
+    if length <= 0:
+        return 0.0
+    hits = len(_SIGNAL_RE.findall(rhp_text[section.start:section.end].lower()))
+    density = hits * 1000.0 / length
+    return section_weight(section.key) * (1.0 + min(density, 10.0) / 10.0)
+
+
+def select_relevant_parts(rhp_text: str, token_budget: int) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Keep the highest scoring sections within token_budget and return them in
+    document order, each prefixed with its heading, as a list of text parts
+    for a Prompt. The whole text is returned as the only part, uncopied,
+    when it already fits.
+    Returns: (parts, stats)
+    """
+    started = time.perf_counter()
+    original_tokens = estimate_tokens(rhp_text)
+
+    if token_budget <= 0 or original_tokens <= token_budget:
+        return [rhp_text], {
+            "sections_total": None,
+            "sections_selected": None,
+            "selected_keys": None,
+            "original_chars": len(rhp_text),
+            "selected_chars": len(rhp_text),
+            "original_tokens": original_tokens,
+            "selected_tokens": original_tokens,
+            "selection_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    sections = split_rhp_sections(rhp_text)
+    ranked = sorted(sections, key=lambda s: score_section(s, rhp_text), reverse=True)
+
+    char_budget = token_budget * settings.PROMPT_CHARS_PER_TOKEN
+    chosen: List[Tuple[RHPSection, int]] = []
+    for section in ranked:
+        if char_budget <= 0:
+            break
+        length = section.end - section.start
+        if length <= char_budget:
+            chosen.append((section, section.end))
+            char_budget -= length
+        elif char_budget >= settings.PROMPT_MIN_PARTIAL_SECTION_CHARS:
+            # Keep the head of the section, cut at a line boundary
+            cut = rhp_text.rfind("\n", section.start, section.start + char_budget)
+            end = cut if cut > section.start else section.start + char_budget
+            chosen.append((section, end))
+            char_budget -= end - section.start
+
+    chosen.sort(key=lambda item: item[0].start)
+    parts: List[str] = []
+    for section, end in chosen:
+        parts.append(f"\n[SECTION: {section.title}]\n" if parts else f"[SECTION: {section.title}]\n")
+        parts.append(rhp_text[section.start:end])
+    selected_chars = sum(len(part) for part in parts)
+
+    return parts, {
+        "sections_total": len(sections),
+        "sections_selected": len(chosen),
+        "selected_keys": sorted({section.key for section, _ in chosen}),
+        "original_chars": len(rhp_text),
+        "selected_chars": selected_chars,
+        "original_tokens": original_tokens,
+        "selected_tokens": selected_chars // settings.PROMPT_CHARS_PER_TOKEN + 1,
+        "selection_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def select_relevant_text(rhp_text: str, token_budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    select_relevant_parts joined into one string.
+    Returns: (selected_text, stats)
+    """
+    parts, stats = select_relevant_parts(rhp_text, token_budget)
+    return "".join(parts), stats
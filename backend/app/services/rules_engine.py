@@ -1,28 +1,161 @@
-from typing import Dict, Any
+import re
+from collections import Counter
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Text fields a keyword rule can look at. "rhp" is the full extracted RHP text.
+FIELDS = ("financial_analysis", "key_risks", "key_strengths", "rhp")
+
+
+class KeywordRule(NamedTuple):
+    """
+    Fires when the terms (matched case-insensitively, as substrings) occur
+    at least min_count times in field, then clamps score_key into
+    score_range and/or moves the verdict from verdict_change[0] to
+    verdict_change[1].
+    """
+    name: str
+    field: str
+    terms: Tuple[str, ...]
+    min_count: int = 1
+    score_key: Optional[str] = None
+    score_range: Tuple[int, int] = (0, 10)
+    verdict_change: Optional[Tuple[str, str]] = None
+
+
+# House rules. Only minor adjustments, not aggressive downgrades.
+RULES: List[KeywordRule] = [
+    # Financial analysis mentions a decline repeatedly: cap at 5, floor at 2
+    KeywordRule(
+        name="repeated_decline",
+        field="financial_analysis",
+        terms=("decline", "declining"),
+        min_count=3,
+        score_key="financial_strength",
+        score_range=(2, 5),
+    ),
+]
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Regex for a set of literal terms, factored into a character trie
+    ("declin(?:e|ing)") so the engine follows one branch per position
+    instead of trying every term. Longer terms win where one is a prefix of
+    another.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional: prefer the longer term
+            return f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class CompiledRules:
+    """
+    A rule set compiled into one trie-shaped regex per text field, so each
+    field is lowercased and scanned exactly once however many rules use it.
+    """
+
+    def __init__(self, rules: Iterable[KeywordRule]):
+        self.rules = list(rules)
+        terms_by_field: Dict[str, set] = {}
+        for rule in self.rules:
+            if rule.field not in FIELDS:
+                raise ValueError(f"Rule {rule.name!r} uses unknown field {rule.field!r}")
+            terms_by_field.setdefault(rule.field, set()).update(term.lower() for term in rule.terms)
+
+        # A lookahead match at every position finds overlapping occurrences
+        # too; it reports the longest term there, which the shorter terms
+        # starting at the same position are prefixes of
+        self.matchers = {
+            field: re.compile(f"(?=({_trie_pattern(terms)}))") for field, terms in terms_by_field.items() if terms
+        }
+        self.prefix_terms = {
+            field: {term: [other for other in terms if term.startswith(other)] for term in terms}
+            for field, terms in terms_by_field.items()
+        }
+
+    def count_terms(self, texts: Dict[str, str]) -> Dict[str, Counter]:
+        """
+        Per-field occurrence counts of every term, from a single scan per
+        field. Each term is counted as `text.count(term)` would, so terms
+        overlapping or containing one another all count.
+        """
+        counts = {}
+        for field, matcher in self.matchers.items():
+            prefix_terms = self.prefix_terms[field]
+            field_counts: Counter = Counter()
+            # Like str.count, a term's own occurrences don't overlap
+            next_start: Dict[str, int] = {}
+            for match in matcher.finditer(texts.get(field, "").lower()):
+                start = match.start()
+                for term in prefix_terms[match.group(1)]:
+                    if start >= next_start.get(term, 0):
+                        field_counts[term] += 1
+                        next_start[term] = start + len(term)
+            counts[field] = field_counts
+        return counts
+
+    def fired(self, texts: Dict[str, str]) -> List[KeywordRule]:
+        counts = self.count_terms(texts)
+        return [
+            rule for rule in self.rules
+            if sum(counts.get(rule.field, Counter())[term.lower()] for term in rule.terms) >= rule.min_count
+        ]
+
+
+compiled_rules = CompiledRules(RULES)
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return value or ""
 
 
 def apply_rules_layer(
     llm_result: Dict[str, Any],
     ipo_inputs: Dict[str, float],
+    rhp_text: str = "",
+    rules: Optional[CompiledRules] = None,
 ) -> Dict[str, Any]:
     """
     Apply balanced rules on top of LLM output
     to ensure realistic and fair assessment.
     """
+    rules = rules or compiled_rules
 
     scores = llm_result.get("scores", {})
     verdict = llm_result.get("final_verdict", "")
-    financial_analysis = llm_result.get("financial_analysis", "")
-    key_strengths = llm_result.get("key_strengths", [])
 
-    # Only apply minor adjustments, not aggressive downgrades
-    # Rule 1: If financial analysis mentions "decline" but has strengths, don't aggressively cap
-    decline_count = financial_analysis.lower().count("decline") + financial_analysis.lower().count("declining")
-    if decline_count >= 3:  # Only if multiple mentions
-        fs = scores.get("financial_strength", 5)
-        scores["financial_strength"] = max(2, min(fs, 5))  # Cap at 5, floor at 2
+    texts = {
+        "financial_analysis": _as_text(llm_result.get("financial_analysis")),
+        "key_risks": _as_text(llm_result.get("key_risks")),
+        "key_strengths": _as_text(llm_result.get("key_strengths")),
+        "rhp": rhp_text,
+    }
+    for rule in rules.fired(texts):
+        if rule.score_key is not None:
+            low, high = rule.score_range
+            scores[rule.score_key] = max(low, min(scores.get(rule.score_key, 5), high))
+        if rule.verdict_change is not None and verdict == rule.verdict_change[0]:
+            verdict = rule.verdict_change[1]
 
-    # Rule 2: QIB subscription is just one factor, don't override LLM verdict
+    # QIB subscription is just one factor, don't override LLM verdict
     sub_qib = ipo_inputs.get("sub_qib", 0.0)
     if sub_qib < 0.5 and verdict == "apply":  # Only if extremely low (< 0.5x)
         # Downgrade only if other scores are also weak
@@ -30,21 +163,12 @@ def apply_rules_layer(
         if avg_score < 4:
             verdict = "high-risk-apply"
 
-    # Rule 3: Don't override "apply" verdict unless there are multiple severe issues
+    # Don't override "apply" verdict unless there are multiple severe issues
     if verdict == "apply":
         weak_scores = sum(1 for v in scores.values() if v <= 2)
         if weak_scores >= 3:  # Only if 3+ scores are very low
             verdict = "high-risk-apply"
 
-    # Rule 4: Respect LLM's balanced assessment
-    # Only change to "avoid" if explicitly warranted by multiple factors
-    if verdict == "high-risk-apply":
-        # Keep as high-risk-apply unless there are critical issues
-        critical_issues = financial_analysis.lower().count("critical") + financial_analysis.lower().count("severe")
-        if critical_issues == 0 and len(key_strengths) > 0:
-            # If no critical issues mentioned and there are strengths, keep high-risk-apply
-            pass
-
     llm_result["scores"] = scores
     llm_result["final_verdict"] = verdict
-    return llm_result
\ No newline at end of file
+    return llm_result
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.log import log_event
+from app.services.rhp_sections import RHPSection, split_rhp_sections
+
+# numpy is imported where signatures are computed, keeping it off cold starts
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when signatures or section hashes would change for the same text
+SIGNATURE_VERSION = "minhash-1"
+
+_MAX_HASH = (1 << 64) - 1
+_SHINGLE_BASE = 1000003
+# Shingles hashed per block, bounding the (block x num_perm) work array
+_MINHASH_BLOCK = 8192
+
+
+class DocumentSignature(NamedTuple):
+    """
+    Near-duplicate fingerprint of an extracted RHP: a MinHash signature of
+    its word shingles and an exact hash of each section's text, by section
+    name (see named_sections).
+    """
+    minhash: "np.ndarray"
+    sections: Dict[str, str]
+
+
+class NearDuplicate(NamedTuple):
+    doc_id: str
+    similarity: float
+    changed_sections: List[str]
+    analysis: Dict[str, Any]
+
+
+def _permutations(num_perm: int):
+    import numpy as np
+
+    # Fixed seed: signatures are compared across processes and restarts
+    rng = np.random.RandomState(20240601)
+    a = rng.randint(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text: str, words_per_shingle: int) -> "np.ndarray":
+    """
+    Unique 32-bit hashes of the overlapping word k-shingles of text, combined
+    from per-word CRC32s with a rolling polynomial so no shingle strings are built.
+    """
+    import numpy as np
+
+    tokens = text.split()
+    vocabulary = {word: zlib.crc32(word.encode()) for word in set(tokens)}
+    words = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.uint64, count=len(tokens))
+    if words.size == 0:
+        return words
+    k = min(words_per_shingle, words.size)
+    count = words.size - k + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    base = np.uint64(_SHINGLE_BASE)
+    for j in range(k):
+        # uint64 arithmetic wraps, which is fine for hashing
+        combined = combined * base + words[j:j + count]
+    hashes = (combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    # Sort-based dedup; np.unique's hash-based path is several times slower here
+    hashes.sort()
+    return hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))]
+
+
+def minhash(hashes: "np.ndarray", num_perm: int) -> "np.ndarray":
+    """
+    MinHash signature: for each of num_perm multiply-shift hash functions
+    ((a*x + b) mod 2**64) >> 32, the minimum over all shingle hashes.
+    """
+    import numpy as np
+
+    a, b = _permutations(num_perm)
+    signature = np.full(num_perm, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, hashes.size, _MINHASH_BLOCK):
+        block = hashes[start:start + _MINHASH_BLOCK, None]
+        # uint64 arithmetic wraps, which is the mod 2**64
+        permuted = (block * a + b) >> np.uint64(32)
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature
+
+
+def estimate_similarity(first: "np.ndarray", second: "np.ndarray") -> float:
+    """
+    Estimated Jaccard similarity of the two documents' shingle sets.
+    """
+    return float((first == second).mean())
+
+
+def named_sections(rhp_text: str) -> Dict[str, RHPSection]:
+    """
+    Sections of rhp_text named by kind and occurrence ("risk_factors#0"),
+    so the same section can be found in another version of the document.
+    """
+    named: Dict[str, RHPSection] = {}
+    occurrences: Dict[str, int] = {}
+    for section in split_rhp_sections(rhp_text):
+        ordinal = occurrences.get(section.key, 0)
+        occurrences[section.key] = ordinal + 1
+        named[f"{section.key}#{ordinal}"] = section
+    return named
+
+
+def document_signature(rhp_text: str) -> DocumentSignature:
+    hashes = shingle_hashes(rhp_text, settings.SIMILARITY_SHINGLE_WORDS)
+    sections = {}
+    for name, section in named_sections(rhp_text).items():
+        # Whitespace-insensitive, so re-flowed but unchanged text matches
+        normalized = " ".join(rhp_text[section.start:section.end].split())
+        sections[name] = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    return DocumentSignature(minhash(hashes, settings.SIMILARITY_NUM_PERM), sections)
+
+
+class SimilarityIndex:
+    """
+    On-disk index of analysed RHPs for near-duplicate lookups. MinHash
+    signatures are split into bands and each band is hashed into a bucket
+    (locality-sensitive hashing), so a lookup only compares signatures that
+    share a bucket with the new document. Entries are scoped by a context
+    key (IPO inputs, provider, model) so analyses are only reused for the
+    same inputs.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " doc_id TEXT PRIMARY KEY,"
+                " context TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " minhash BLOB NOT NULL,"
+                " sections TEXT NOT NULL,"
+                " analysis TEXT NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bands ("
+                " bucket BLOB NOT NULL,"
+                " doc_id TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_bucket ON bands (bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_doc ON bands (doc_id)")
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            log_event(logger, "similarity_index_disabled", logging.WARNING, path=self.path, error=str(e))
+            self.path = ""
+            return None
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _buckets(context: str, signature: "np.ndarray") -> List[bytes]:
+        rows = max(1, len(signature) // settings.SIMILARITY_BANDS)
+        return [
+            hashlib.blake2b(
+                f"{context}:{band}:".encode() + signature[start:start + rows].tobytes(), digest_size=12
+            ).digest()
+            for band, start in enumerate(range(0, len(signature) - rows + 1, rows))
+        ]
+
+    def find(self, context: str, signature: DocumentSignature, threshold: float) -> Optional[NearDuplicate]:
+        """
+        The most similar analysed document with estimated similarity of at
+        least threshold, with the sections whose text differs from it.
+        """
+        if not self.enabled:
+            return None
+        import numpy as np
+
+        buckets = self._buckets(context, signature.minhash)
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            placeholders = ",".join("?" * len(buckets))
+            rows = conn.execute(
+                "SELECT doc_id, minhash, sections, analysis FROM documents"
+                " WHERE version = ? AND context = ?"
+                f" AND doc_id IN (SELECT doc_id FROM bands WHERE bucket IN ({placeholders}))",
+                [SIGNATURE_VERSION, context, *buckets],
+            ).fetchall()
+
+        best = None
+        for doc_id, blob, sections, analysis in rows:
+            similarity = estimate_similarity(signature.minhash, np.frombuffer(blob, dtype=np.uint64))
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (doc_id, similarity, sections, analysis)
+        if best is None:
+            return None
+
+        doc_id, similarity, sections, analysis = best
+        previous = json.loads(sections)
+        # Changed or new sections, then sections the new version dropped
+        changed = [name for name, digest in signature.sections.items() if previous.get(name) != digest]
+        changed += [name for name in previous if name not in signature.sections]
+        return NearDuplicate(doc_id, similarity, changed, json.loads(analysis))
+
+    def add(self, doc_id: str, context: str, signature: DocumentSignature, analysis: Dict[str, Any]) -> None:
+        """
+        Store a document's signature with its LLM analysis (before the rules layer).
+        """
+        if not self.enabled:
+            return
+        buckets = self._buckets(context, signature.minhash)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM bands WHERE doc_id = ?", (doc_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO documents"
+                " (doc_id, context, version, minhash, sections, analysis, stored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    doc_id, context, SIGNATURE_VERSION, signature.minhash.tobytes(),
+                    json.dumps(signature.sections), json.dumps(analysis), now,
+                ),
+            )
+            conn.executemany("INSERT INTO bands (bucket, doc_id) VALUES (?, ?)", [(b, doc_id) for b in buckets])
+            # Evict the oldest documents beyond the size limit
+            stale = conn.execute(
+                "SELECT doc_id FROM documents ORDER BY stored_at DESC LIMIT -1 OFFSET ?",
+                (self.max_entries,),
+            ).fetchall()
+            if stale:
+                conn.executemany("DELETE FROM documents WHERE doc_id = ?", stale)
+                conn.executemany("DELETE FROM bands WHERE doc_id = ?", stale)
+            conn.commit()
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM bands")
+            conn.commit()
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+similarity_index = SimilarityIndex(settings.SIMILARITY_INDEX_PATH, settings.SIMILARITY_INDEX_MAX_ENTRIES)
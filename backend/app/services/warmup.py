@@ -0,0 +1,39 @@
+import logging
+import time
+from typing import Callable, Dict
+
+from app.core.log import log_event
+from app.services.llm_service import warm_up_llm_clients
+from app.services.pdf_service import warm_up_pdf_libraries
+
+
+logger = logging.getLogger(__name__)
+
+
+def _import_numpy() -> None:
+    import numpy
+
+
+_WARM_UP_STEPS: Dict[str, Callable[[], None]] = {
+    "pdf": warm_up_pdf_libraries,
+    "numpy": _import_numpy,
+    "llm": warm_up_llm_clients,
+}
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Load everything the first analysis would otherwise load on demand: PDF
+    libraries, numpy and the configured LLM providers' SDKs and clients.
+    Blocking; returns seconds per step. A failing step is logged and skipped.
+    """
+    timings: Dict[str, float] = {}
+    for name, step in _WARM_UP_STEPS.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            log_event(logger, "warm_up_failed", logging.WARNING, step=name, error=str(e))
+        timings[name] = round(time.perf_counter() - started, 4)
+    log_event(logger, "warmed_up", **timings)
+    return timings
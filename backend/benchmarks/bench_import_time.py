@@ -0,0 +1,107 @@
+"""
+Cold start benchmark: imports a module (app.main by default, which is what
+every serverless cold start loads) in fresh interpreters with
+`python -X importtime` and reports the total import time, the slowest
+modules and which heavy libraries were loaded at import rather than on
+first use.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import_time --runs 5 --top 15 --json results/import_time.json
+    python -m benchmarks.bench_import_time --max-ms 1200   # exit 1 above this median, e.g. in CI
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.results import save_results
+
+# Loaded on first use (see pdf_service, llm_service, warmup); one of these
+# showing up here is a cold start regression
+LAZY_MODULES = [
+    "google.genai",
+    "groq",
+    "httpx",
+    "pdfplumber",
+    "pdfminer",
+    "pypdfium2",
+    "pypdf",
+    "numpy",
+]
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_once(module: str) -> Tuple[Dict[str, Tuple[int, int]], float, List[str]]:
+    """
+    {module: (self us, cumulative us)} for one fresh import, its total time
+    in ms and the modules loaded afterwards (importtime also lists failed
+    imports of optional packages that are not installed).
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print(*sys.modules)"],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules, modules[module][1] / 1000, completed.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="fail when the median import time exceeds this")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    cumulative: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        modules, total, loaded = _import_once(args.module)
+        totals.append(total)
+        for name, (_, cumulative_us) in modules.items():
+            cumulative.setdefault(name, []).append(cumulative_us)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.0f} ms, min {min(totals):.0f} ms over {args.runs} runs")
+
+    # Slowest modules by median cumulative import time
+    slowest = sorted(
+        ((name, statistics.median(values) / 1000) for name, values in cumulative.items() if name != args.module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    print(f"\n{'module':<48} {'cumulative ms':>13}")
+    for name, ms in slowest[:args.top]:
+        print(f"{name:<48} {ms:>13.1f}")
+
+    eager = [
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in loaded)
+    ]
+    print(f"\nlazy libraries loaded at import: {', '.join(eager) or 'none'}")
+
+    if args.json_path:
+        save_results(args.json_path, "import_time", vars(args), {
+            "median_ms": median,
+            "min_ms": min(totals),
+            "runs_ms": totals,
+            "slowest_ms": dict(slowest[:args.top]),
+            "eager_lazy_modules": eager,
+        })
+
+    if args.max_ms is not None and median > args.max_ms:
+        raise SystemExit(f"import {args.module} took {median:.0f} ms, above --max-ms {args.max_ms:.0f}")
+
+
+if __name__ == "__main__":
+    main()
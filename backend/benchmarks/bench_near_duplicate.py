@@ -0,0 +1,115 @@
+"""
+Near-duplicate reuse benchmark: analyses a synthetic RHP, then a re-upload
+with the same text, a revision with a few changed pages and an unrelated
+document, reporting the path each took (see SIMILARITY_* settings), the
+time, and the LLM calls and prompt characters sent to the (fake) LLM,
+map-reduce section summaries included.
+
+Usage (from backend/):
+    python -m benchmarks.bench_near_duplicate --pages 300 --revised 12 150 --latency 1.0 --json results/near_dup.json
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Every upload runs the pipeline; only the similarity index is kept
+os.environ["ANALYSIS_CACHE_BACKEND"] = "none"
+os.environ["PAGE_CACHE_PATH"] = ""
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.models.ipo import IPOAnalysisRequest
+from app.services import ipo_analyzer
+from app.services.analysis_pipeline import run_analysis
+from app.services.pdf_service import SpooledPDF, shutdown_pdf_pool
+from app.services.similarity_index import similarity_index
+from benchmarks.fake_llm import install_fake_llm
+from benchmarks.results import save_results
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+_llm_usage = {"calls": 0, "chars": 0}
+
+
+def _count_llm_calls() -> None:
+    call_llm_async = ipo_analyzer.call_llm_async
+
+    async def counted(prompt):
+        _llm_usage["calls"] += 1
+        _llm_usage["chars"] += len(prompt)
+        return await call_llm_async(prompt)
+
+    ipo_analyzer.call_llm_async = counted
+
+
+async def _analyze(path: str) -> Dict[str, Any]:
+    events: Dict[str, Dict[str, Any]] = {}
+    _llm_usage.update(calls=0, chars=0)
+
+    def progress(stage: str, details: Dict[str, Any]) -> None:
+        events[stage] = details
+
+    spooled = SpooledPDF.from_path(path)
+    start = time.perf_counter()
+    await run_analysis(spooled, IPOAnalysisRequest(), progress)
+    seconds = time.perf_counter() - start
+    outcome = events.get("analysis_path", {})
+    return {
+        "path": outcome.get("path"),
+        "similarity": outcome.get("similarity"),
+        "changed_sections": len(outcome.get("changed_sections", [])),
+        "llm_calls": _llm_usage["calls"],
+        "prompt_chars": _llm_usage["chars"],
+        "seconds": seconds,
+    }
+
+
+async def _run(documents: Dict[str, bytes], directory: str) -> List[Dict[str, Any]]:
+    rows = []
+    for name, content in documents.items():
+        path = os.path.join(directory, f"{name}.pdf")
+        with open(path, "wb") as f:
+            f.write(content)
+        row = {"upload": name, **await _analyze(path)}
+        print(
+            f"{name:<10} {row['path']:<24} {row['similarity'] or '-':>6} {row['changed_sections']:>8} "
+            f"{row['llm_calls']:>5} {row['prompt_chars']:>12} {row['seconds']:>8.2f}"
+        )
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--revised", type=int, nargs="+", default=[12, 150], help="pages changed in the revision")
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM latency in seconds")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    install_fake_llm(latency=args.latency)
+    _count_llm_calls()
+    documents = {
+        "original": make_rhp_pdf(args.pages),
+        # Different bytes (trailing comment), same text
+        "reupload": make_rhp_pdf(args.pages) + b"%reupload\n",
+        "revision": make_rhp_pdf(args.pages, revised_pages=args.revised),
+        "unrelated": make_rhp_pdf(args.pages, seed=8),
+    }
+
+    print(f"{'upload':<10} {'path':<24} {'sim':>6} {'changed':>8} {'calls':>5} {'prompt chars':>12} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        similarity_index.path = os.path.join(directory, "similarity_index.sqlite3")
+        try:
+            rows = asyncio.run(_run(documents, directory))
+        finally:
+            shutdown_pdf_pool()
+
+    if args.json_path:
+        save_results(args.json_path, "near_duplicate", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Scanned page OCR benchmark: cost of scanned page detection on a text-only
+RHP, PDFium render time per page, and, when Tesseract is installed, OCR
+inline vs across the process pool and a re-extraction served from the page
+text cache.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ocr --pages 200 --scanned 10 --workers 4 --json results/ocr.json
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Set before importing the app; the OCR cache run enables a temp cache below
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from app.core.config import settings
+from app.services import pdf_service
+from app.services.pdf_service import _extract_pdf_text_sync, import_pypdfium2, ocr_available, shutdown_pdf_pool
+from benchmarks.results import save_results
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+def _extract(content: bytes):
+    start = time.perf_counter()
+    text, _, _, counts = _extract_pdf_text_sync(content)
+    return time.perf_counter() - start, text, counts
+
+
+def _render_seconds(content: bytes, indices, dpi: int) -> float:
+    document = import_pypdfium2().PdfDocument(content)
+    start = time.perf_counter()
+    for i in indices:
+        page = document[i]
+        page.render(scale=dpi / 72, grayscale=True).to_pil()
+        page.close()
+    seconds = time.perf_counter() - start
+    document.close()
+    return seconds / max(1, len(indices))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--scanned", type=int, default=10, help="scanned (image-only) pages, spread evenly")
+    parser.add_argument("--workers", type=int, default=settings.PDF_EXTRACTION_WORKERS)
+    parser.add_argument("--dpi", type=int, default=settings.PDF_OCR_DPI)
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+    settings.PDF_OCR_DPI = args.dpi
+
+    step = max(1, args.pages // max(1, args.scanned))
+    scanned = list(range(step // 2, args.pages, step))[:args.scanned]
+    text_pdf = make_rhp_pdf(args.pages)
+    scanned_pdf = make_rhp_pdf(args.pages, scanned_pages=scanned)
+    results = {"pages": args.pages, "scanned_pages": len(scanned)}
+
+    # Detection overhead: a text-only document with OCR on and off
+    settings.PDF_OCR_ENABLED = False
+    results["text_only_seconds"], _, _ = _extract(text_pdf)
+    settings.PDF_OCR_ENABLED = True
+    results["text_only_detect_seconds"], _, _ = _extract(text_pdf)
+    print(
+        f"text-only extraction: {results['text_only_seconds']:.3f} s, "
+        f"with scanned page detection {results['text_only_detect_seconds']:.3f} s"
+    )
+
+    results["render_seconds_per_page"] = _render_seconds(scanned_pdf, scanned, args.dpi)
+    print(f"render at {args.dpi} dpi: {results['render_seconds_per_page'] * 1000:.1f} ms/page")
+
+    if not ocr_available():
+        print("tesseract is not available (pip install pytesseract and the tesseract binary): OCR timings skipped")
+    else:
+        for label, workers in (("inline", 1), ("pool", args.workers)):
+            settings.PDF_EXTRACTION_WORKERS = workers
+            seconds, text, counts = _extract(scanned_pdf)
+            results[f"ocr_{label}_seconds"] = seconds
+            print(f"OCR {label:<6} ({workers} workers): {seconds:.2f} s, {counts['ocr_pages']} pages OCRed, {len(text)} chars")
+        shutdown_pdf_pool()
+
+        with tempfile.TemporaryDirectory() as directory:
+            pdf_service.page_cache.path = os.path.join(directory, "page_text.sqlite3")
+            _extract(scanned_pdf)
+            results["ocr_cached_seconds"], _, counts = _extract(scanned_pdf)
+            pdf_service.page_cache.path = ""
+        print(f"re-extraction from the page cache: {results['ocr_cached_seconds']:.2f} s")
+
+    if args.json_path:
+        save_results(args.json_path, "ocr", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
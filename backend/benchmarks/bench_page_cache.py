@@ -0,0 +1,55 @@
+"""
+Page text cache benchmark: extraction of a revised RHP after the original
+has been seen, compared with a cold extraction.
+
+Usage (from backend/):
+    python -m benchmarks.bench_page_cache --pages 500 --changed 0.05
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Keep the benchmark's cache away from the application cache
+_cache_dir = tempfile.mkdtemp(prefix="bench-page-cache-")
+os.environ["PAGE_CACHE_PATH"] = os.path.join(_cache_dir, "page_text.sqlite3")
+
+from app.services.pdf_service import _extract_pdf_text_sync, page_cache
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+def _timed(content: bytes):
+    start = time.perf_counter()
+    text, _, pages, counts = _extract_pdf_text_sync(content)
+    return time.perf_counter() - start, text, pages, counts["cached_pages"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of pages revised")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    revised_pages = rng.sample(range(args.pages), int(args.pages * args.changed))
+    original = make_rhp_pdf(args.pages)
+    revised = make_rhp_pdf(args.pages, revised_pages=revised_pages)
+    print(f"Synthetic RHP: {args.pages} pages, {len(revised_pages)} revised")
+
+    cold_time, _, pages, cached = _timed(original)
+    print(f"cold (original):  {cold_time:.2f}s  {cached}/{pages} pages from cache")
+
+    warm_time, warm_text, pages, cached = _timed(revised)
+    print(f"warm (revised):   {warm_time:.2f}s  {cached}/{pages} pages from cache ({cached / pages:.0%})")
+
+    # Cached output must match a from-scratch extraction of the revised PDF
+    page_cache.path = ""
+    fresh_time, fresh_text, _, cached = _timed(revised)
+    assert cached == 0 and fresh_text == warm_text, "cached text differs from fresh extraction"
+    print(f"cold (revised):   {fresh_time:.2f}s")
+    print(f"speedup:          {fresh_time / warm_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Page triage benchmark: full extraction vs two-pass triage (section map from
+the PDF outline, the table of contents or page headers, then extraction of
+the relevant sections only).
+
+Usage (from backend/):
+    python -m benchmarks.bench_page_triage --pages 100 500 --extractor pdfplumber --json results/triage.json
+
+With the default fast extractor most of the time goes to the few table pages
+re-extracted with pdfplumber, which triage keeps (financial statements), so
+savings are smaller than the share of pages skipped.
+"""
+import argparse
+import os
+import time
+
+# Measure extraction itself, not the page text cache
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from app.core.config import settings
+from app.services.pdf_service import _extract_pdf_text_sync, map_section_pages
+from benchmarks.results import save_results
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+# Synthetic PDF variants, each exercising one section mapping method
+VARIANTS = {
+    "headers": {},
+    "toc": {"toc": True},
+    "outline": {"outline": True},
+}
+
+
+def _extract(content: bytes, triage: bool):
+    settings.PDF_PAGE_TRIAGE = triage
+    start = time.perf_counter()
+    text, total_pages, pages, _ = _extract_pdf_text_sync(content)
+    return time.perf_counter() - start, text, total_pages, pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--extractor", default=settings.PDF_TEXT_EXTRACTOR, help="PDF_TEXT_EXTRACTOR")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+    settings.PDF_TEXT_EXTRACTOR = args.extractor
+
+    rows = []
+    print(
+        f"{'pages':>6} {'method':<8} {'map s':>7} {'full s':>8} {'triage s':>9} "
+        f"{'pages':>6} {'full chars':>11} {'chars':>10}"
+    )
+    for pages in args.pages:
+        for variant, options in VARIANTS.items():
+            content = make_rhp_pdf(pages, **options)
+            full_time, full_text, total_pages, _ = _extract(content, triage=False)
+
+            start = time.perf_counter()
+            _, method = map_section_pages(content, total_pages)
+            map_time = time.perf_counter() - start
+
+            triage_time, text, _, pages_read = _extract(content, triage=True)
+            print(
+                f"{total_pages:>6} {method or '-':<8} {map_time:>7.3f} {full_time:>8.3f} {triage_time:>9.3f} "
+                f"{pages_read:>6} {len(full_text):>11} {len(text):>10}"
+            )
+            rows.append({
+                "pages": total_pages,
+                "variant": variant,
+                "method": method,
+                "map_seconds": map_time,
+                "full_seconds": full_time,
+                "triage_seconds": triage_time,
+                "pages_extracted": pages_read,
+                "full_chars": len(full_text),
+                "triage_chars": len(text),
+            })
+
+    if args.json_path:
+        save_results(args.json_path, "page_triage", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Serial vs parallel PDF extraction benchmark.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_extraction --pages 400 --workers 4
+"""
+import argparse
+import os
+import time
+
+# Measure extraction itself, not the page text cache (also in worker processes)
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from app.services.pdf_service import (
+    _extract_pdf_text_sync,
+    _extract_pdf_text_parallel,
+    shutdown_pdf_pool,
+)
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+def _time(fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_rhp_pdf(args.pages)
+    print(f"Synthetic PDF: {args.pages} pages, {len(content) / 1e6:.1f} MB")
+
+    serial_time, (serial_text, _, _, _) = _time(lambda: _extract_pdf_text_sync(content), args.repeat)
+
+    # Warm the pool so process start-up is not counted against every run
+    _extract_pdf_text_parallel(content, args.workers)
+    parallel_time, (parallel_text, _, _, _) = _time(
+        lambda: _extract_pdf_text_parallel(content, args.workers), args.repeat
+    )
+    shutdown_pdf_pool()
+
+    assert parallel_text == serial_text, "parallel output differs from serial output"
+
+    print(f"serial:   {serial_time:.2f}s  ({args.pages / serial_time:.1f} pages/s)")
+    print(f"parallel: {parallel_time:.2f}s  ({args.pages / parallel_time:.1f} pages/s, {args.workers} workers)")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Time and memory of the local pipeline stages on synthetic RHPs: PDF text
+extraction, prompt building (full and with section selection), the Gemini
+request payload for the full prompt and the rules layer. Memory is the peak of Python allocations (tracemalloc) during
+one run of the stage; PDFium's native buffers are not included.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --pages 10 100 500 1000 --json results/pipeline.json
+"""
+import argparse
+import copy
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+# Measure extraction itself, not the page text cache
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from app.models.ipo import IPOAnalysisRequest
+from app.services.ipo_analyzer import build_ipo_prompt, prepare_ipo_prompt
+from app.services.llm_service import _gemini_request
+from app.services.pdf_service import _extract_pdf_text_sync
+from app.services.rules_engine import apply_rules_layer
+from benchmarks.fake_llm import FAKE_ANALYSIS
+from benchmarks.results import save_results
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Tuple[Dict[str, float], Any]:
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak / 1e6}, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    ipo_data = IPOAnalysisRequest()
+    ipo_inputs = ipo_data.model_dump()
+    rows = []
+
+    print(f"{'pages':>6} {'MB':>6} {'stage':<14} {'seconds':>9} {'peak MB':>8}")
+    for pages in args.pages:
+        content = make_rhp_pdf(pages)
+        stages: Dict[str, Dict[str, float]] = {}
+
+        stages["extract_pdf"], (text, _, _, _) = _measure(lambda: _extract_pdf_text_sync(content), args.repeat)
+        stages["build_prompt"], prompt = _measure(lambda: build_ipo_prompt(text, ipo_data), args.repeat)
+        stages["prepare_prompt"], _ = _measure(lambda: prepare_ipo_prompt(text, ipo_data), args.repeat)
+        stages["gemini_request"], _ = _measure(lambda: _gemini_request(prompt), args.repeat)
+        stages["rules"], _ = _measure(
+            lambda: apply_rules_layer(copy.deepcopy(FAKE_ANALYSIS), ipo_inputs, rhp_text=text), args.repeat
+        )
+
+        for stage, measured in stages.items():
+            print(
+                f"{pages:>6} {len(content) / 1e6:>6.1f} {stage:<14} "
+                f"{measured['seconds']:>9.4f} {measured['peak_mb']:>8.1f}"
+            )
+        rows.append({"pages": pages, "pdf_bytes": len(content), "text_chars": len(text), "stages": stages})
+
+    if args.json_path:
+        save_results(args.json_path, "pipeline", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Prompt size before and after section-aware selection.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prompt_size --pages 100 300 600 --budget 60000
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.models.ipo import IPOAnalysisRequest
+from app.services.ipo_analyzer import build_ipo_prompt, prepare_ipo_prompt
+from app.services.rhp_sections import estimate_tokens
+from benchmarks.synthetic_pdf import make_rhp_text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 600])
+    parser.add_argument("--budget", type=int, default=settings.PROMPT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    settings.PROMPT_TOKEN_BUDGET = args.budget
+    ipo_data = IPOAnalysisRequest()
+
+    print(f"{'pages':>6} {'full chars':>11} {'full tok':>9} {'sel chars':>10} {'sel tok':>8} {'prep ms':>8}")
+    for pages in args.pages:
+        rhp_text = make_rhp_text(pages)
+        full_prompt = build_ipo_prompt(rhp_text, ipo_data)
+
+        start = time.perf_counter()
+        prompt = prepare_ipo_prompt(rhp_text, ipo_data)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{pages:>6} {len(full_prompt):>11} {estimate_tokens(full_prompt):>9} "
+            f"{len(prompt):>10} {estimate_tokens(prompt):>8} {elapsed_ms:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Text extractor benchmark: throughput (pages/sec) and fidelity against
+pdfplumber's layout-aware output, for each backend on its own and for the
+fast path with automatic pdfplumber fallback.
+
+Usage (from backend/):
+    python -m benchmarks.bench_text_extractors --pages 200
+"""
+import argparse
+import difflib
+import os
+import time
+from typing import List
+
+# Measure extraction itself, not the page text cache
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from app.core.config import settings
+from app.services.pdf_service import (
+    TEXT_EXTRACTORS,
+    _extract_pages,
+    open_pdf,
+)
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+def _fidelity(pages: List[str], reference: List[str]):
+    exact = sum(1 for page, ref in zip(pages, reference) if page.strip() == ref.strip())
+    similarity = sum(
+        difflib.SequenceMatcher(None, page.split(), ref.split(), autojunk=False).ratio()
+        for page, ref in zip(pages, reference)
+    )
+    return exact / len(reference), similarity / len(reference)
+
+
+def _report(label: str, seconds: float, pages: List[str], reference: List[str], note: str = "") -> None:
+    exact, similarity = _fidelity(pages, reference)
+    print(
+        f"{label:<22} {len(pages) / seconds:>9.1f} {exact:>9.1%} {similarity:>11.2%}  {note}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    content = make_rhp_pdf(args.pages)
+    indices = list(range(args.pages))
+    print(f"Synthetic RHP: {args.pages} pages, {len(content) / 1e6:.1f} MB\n")
+    print(f"{'extractor':<22} {'pages/s':>9} {'exact':>9} {'similarity':>11}")
+
+    results = {}
+    for name, extractor in TEXT_EXTRACTORS.items():
+        try:
+            with open_pdf(content) as pdf:
+                start = time.perf_counter()
+                texts = extractor.extract(pdf, content, indices)
+                results[name] = (time.perf_counter() - start, [texts[i] for i in indices])
+        except RuntimeError as e:
+            print(f"{name:<22} skipped: {e}")
+
+    reference = results["pdfplumber"][1]
+    for name, (seconds, pages) in results.items():
+        _report(name, seconds, pages, reference)
+
+    for name, extractor in TEXT_EXTRACTORS.items():
+        if not extractor.fast or name not in results:
+            continue
+        settings.PDF_TEXT_EXTRACTOR = name
+        with open_pdf(content) as pdf:
+            start = time.perf_counter()
+            pages, counts = _extract_pages(pdf, content, list(range(args.pages)))
+            seconds = time.perf_counter() - start
+        _report(
+            f"{name} + fallback",
+            seconds,
+            pages,
+            reference,
+            f"{counts['fallback_pages']} pages via pdfplumber",
+        )
+
+
+if __name__ == "__main__":
+    main()
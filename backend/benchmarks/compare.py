@@ -0,0 +1,53 @@
+"""
+Compare two saved benchmark result files (see benchmarks/results.py) and
+print every numeric result side by side with the relative change.
+
+Usage (from backend/):
+    python -m benchmarks.compare results/pipeline-before.json results/pipeline-after.json
+"""
+import argparse
+import json
+from typing import Any, Dict
+
+
+def _flatten(value: Any, prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            # Label rows by their identifying field where there is one
+            label = item.get("pages", item.get("concurrency", i)) if isinstance(item, dict) else i
+            flat.update(_flatten(item, f"{prefix}[{label}]"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix] = float(value)
+    return flat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before["benchmark"] != after["benchmark"]:
+        raise SystemExit(f"Different benchmarks: {before['benchmark']} vs {after['benchmark']}")
+
+    print(f"{before['benchmark']}: {before['run'].get('commit') or '?'} -> {after['run'].get('commit') or '?'}")
+    old = _flatten(before["results"])
+    new = _flatten(after["results"])
+    width = max((len(key) for key in old), default=10)
+    for key, old_value in old.items():
+        if key not in new:
+            continue
+        change = f"{(new[key] - old_value) / old_value * 100:+.1f}%" if old_value else "-"
+        print(f"{key:<{width}} {old_value:>12.4f} {new[key]:>12.4f} {change:>8}")
+
+
+if __name__ == "__main__":
+    main()
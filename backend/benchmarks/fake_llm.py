@@ -0,0 +1,74 @@
+"""
+Local fake LLM provider for benchmarks: returns a valid analysis after a
+configurable latency, so the pipeline can be measured without API keys or
+quotas.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict
+
+from app.core.config import settings
+from app.services.llm_service import LLMProvider, register_provider
+
+FAKE_PROVIDER = "fake"
+
+FAKE_ANALYSIS: Dict[str, Any] = {
+    "company_overview": "A mid-sized manufacturer with a growing export business.",
+    "business_summary": "Makes industrial components for domestic and export customers.",
+    "financial_analysis": "Revenue grew steadily; margins declined slightly in the latest year.",
+    "financial_metrics": {
+        "yearly_data": [
+            {"year": "FY2022", "revenue": 100.5, "profit": 15.2, "loss": 0, "margin": 15.1, "growth_rate": 0},
+            {"year": "FY2023", "revenue": 125.3, "profit": 22.5, "loss": 0, "margin": 17.9, "growth_rate": 24.7},
+            {"year": "FY2024", "revenue": 156.8, "profit": 31.2, "loss": 0, "margin": 19.9, "growth_rate": 25.1},
+        ],
+        "total_revenue": 382.6,
+        "total_profit": 68.9,
+        "total_loss": 0,
+        "avg_margin": 17.6,
+        "revenue_growth_trend": "increasing",
+        "profitability_trend": "improving",
+    },
+    "key_strengths": ["Diversified customers", "Export growth", "Low debt", "Experienced promoters"],
+    "key_risks": ["Customer concentration", "Raw material prices", "Competition", "Regulatory approvals", "Working capital"],
+    "valuation_analysis": "Fairly priced against listed peers.",
+    "profit_potential": "Moderate listing gains are possible.",
+    "investment_recommendation": "Apply for the long term.",
+    "scores": {"financial_strength": 7, "valuation_comfort": 6, "promoter_quality": 7, "demand_strength": 6},
+    "final_verdict": "apply",
+    "final_comment": "Reasonable business at a fair price.",
+}
+
+
+def install_fake_llm(latency: float = 0.5, jitter: float = 0.0, chunks: int = 20) -> None:
+    """
+    Register the fake provider and make it the only one in the chain.
+    Each call takes latency +/- jitter seconds; streams spread that over
+    `chunks` deltas.
+    """
+    payload = json.dumps(FAKE_ANALYSIS)
+
+    def delay() -> float:
+        return max(0.0, latency + random.uniform(-jitter, jitter))
+
+    async def call(prompt: str) -> Dict[str, Any]:
+        await asyncio.sleep(delay())
+        return json.loads(payload)
+
+    def call_sync(prompt: str) -> Dict[str, Any]:
+        time.sleep(delay())
+        return json.loads(payload)
+
+    async def stream(prompt: str) -> AsyncIterator[str]:
+        step = max(1, len(payload) // chunks)
+        pause = delay() / chunks
+        for i in range(0, len(payload), step):
+            await asyncio.sleep(pause)
+            yield payload[i:i + step]
+
+    register_provider(FAKE_PROVIDER, LLMProvider(call, call_sync, stream, model="fake-1"))
+    settings.LLM_PROVIDER = FAKE_PROVIDER
+    settings.LLM_PROVIDER_CHAIN = [FAKE_PROVIDER]
+    settings.LLM_HEDGE_DELAY_SECONDS = 0
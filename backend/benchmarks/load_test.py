@@ -0,0 +1,120 @@
+"""
+Load test for POST /api/v1/ipo/analyze: concurrent clients drive the
+in-process FastAPI app (httpx ASGI transport) with the fake LLM, and
+throughput and latency percentiles are reported per concurrency level.
+
+The analysis and page text caches and the similarity index are disabled so every request runs the
+full pipeline. Each request uploads a different synthetic PDF unless
+--same-pdf is given, which exercises request coalescing instead.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 1 4 16 --requests 32 --pages 100 --latency 1.0 --json results/load.json
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+os.environ["ANALYSIS_CACHE_BACKEND"] = "none"
+os.environ["PAGE_CACHE_PATH"] = ""
+os.environ["SIMILARITY_INDEX_PATH"] = ""
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+
+from app.core.config import settings
+from app.main import create_app
+from app.services.pdf_service import shutdown_pdf_pool
+from benchmarks.fake_llm import install_fake_llm
+from benchmarks.results import latency_summary, save_results
+from benchmarks.synthetic_pdf import make_rhp_pdf
+
+
+async def _run_level(app, documents: List[bytes], concurrency: int, requests: int) -> Dict[str, Any]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(documents[i % len(documents)])
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while True:
+            try:
+                content = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/ipo/analyze", files={"rhp": ("rhp.pdf", content, "application/pdf")}
+            )
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "wall_seconds": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "latency_seconds": latency_summary(latencies),
+    }
+
+
+async def _run_levels(app, documents: List[bytes], args) -> List[Dict[str, Any]]:
+    # One event loop for all levels, since limiter locks are bound to their loop
+    levels = []
+    for concurrency in args.concurrency:
+        level = await _run_level(app, documents, concurrency, args.requests)
+        latency = level["latency_seconds"]
+        print(
+            f"{concurrency:>7} {level['succeeded']:>4} {sum(level['errors'].values()):>4} "
+            f"{level['throughput_rps']:>7.2f} {latency.get('p50', 0):>7.2f} "
+            f"{latency.get('p95', 0):>7.2f} {latency.get('p99', 0):>7.2f}"
+        )
+        levels.append(level)
+    return levels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="fake LLM latency jitter in seconds")
+    parser.add_argument("--extraction", choices=["serial", "parallel"], default=settings.PDF_EXTRACTION_MODE)
+    parser.add_argument("--same-pdf", action="store_true", help="every request uploads the same PDF")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    install_fake_llm(latency=args.latency, jitter=args.jitter)
+    settings.PDF_EXTRACTION_MODE = args.extraction
+    app = create_app()
+
+    count = 1 if args.same_pdf else args.requests
+    documents = [make_rhp_pdf(args.pages, seed=seed) for seed in range(count)]
+    print(f"{count} synthetic PDF(s) of {args.pages} pages, fake LLM {args.latency}s +/- {args.jitter}s")
+
+    print(f"{'clients':>7} {'ok':>4} {'err':>4} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}")
+    try:
+        levels = asyncio.run(_run_levels(app, documents, args))
+    finally:
+        shutdown_pdf_pool()
+
+    if args.json_path:
+        save_results(args.json_path, "load_test", vars(args), levels)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Dependency-free generator for synthetic RHP-like PDFs used by the benchmarks.
+
+Pages cycle through the usual offer document sections (risk factors,
+business overview, restated financial statements, ...) so that text
+extraction, section splitting and the rules layer all see realistic input.
+Scanned (image-only) pages are rasterised with pypdfium2, installed with
+pdfplumber.
+"""
+import random
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+
+SECTIONS = [
+    "RISK FACTORS",
+    "OUR BUSINESS",
+    "OBJECTS OF THE ISSUE",
+    "OUR PROMOTERS AND PROMOTER GROUP",
+    "FINANCIAL INFORMATION",
+    "MANAGEMENT'S DISCUSSION AND ANALYSIS",
+    "OUTSTANDING LITIGATION AND MATERIAL DEVELOPMENTS",
+    "MATERIAL CONTRACTS AND DOCUMENTS FOR INSPECTION",
+]
+
+WORDS = (
+    "company revenue operations growth market customers risk promoter issue "
+    "equity shares capital expenditure subsidiary regulatory approval debt "
+    "profit margin decline severe critical competition manufacturing export "
+    "segment strategy facility investment dividend liability statutory"
+).split()
+
+STATEMENT_ROWS = [
+    "Revenue from operations", "Other income", "Total income", "Cost of materials consumed",
+    "Employee benefits expense", "Finance costs", "Depreciation and amortisation",
+    "Other expenses", "Total expenses", "Profit before tax", "Current tax", "Deferred tax",
+    "Profit after tax", "Trade receivables", "Inventories", "Cash and cash equivalents",
+    "Borrowings", "Trade payables", "Total equity", "Total assets",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+SECTION_PAGES = 12
+
+
+def _page_lines(page_no: int, rng: random.Random, lines_per_page: int) -> List[str]:
+    section = SECTIONS[(page_no // SECTION_PAGES) % len(SECTIONS)]
+    lines = [section, f"Page {page_no + 1}"]
+    if section == "FINANCIAL INFORMATION" and page_no % 3 == 0:
+        # Full statement page: almost entirely a table of figures
+        lines.append("Restated Statement of Assets and Liabilities (in millions)")
+        lines.append("Particulars FY2022 FY2023 FY2024")
+        for label in STATEMENT_ROWS:
+            values = " ".join(f"{rng.uniform(50, 900):,.2f}" for _ in range(3))
+            lines.append(f"{label} {values}")
+    elif section == "FINANCIAL INFORMATION":
+        lines.append("Restated Statement of Profit and Loss (in millions)")
+        lines.append("Particulars FY2022 FY2023 FY2024")
+        for label in ("Revenue from operations", "Total income", "Profit after tax"):
+            values = " ".join(f"{rng.uniform(50, 900):,.2f}" for _ in range(3))
+            lines.append(f"{label} {values}")
+    while len(lines) < lines_per_page:
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return lines
+
+
+def _section_starts(n_pages: int) -> List[Tuple[int, str]]:
+    return [
+        (i, SECTIONS[(i // SECTION_PAGES) % len(SECTIONS)])
+        for i in range(0, n_pages, SECTION_PAGES)
+    ]
+
+
+def _toc_pages(n_pages: int, lines_per_page: int) -> List[List[str]]:
+    # Printed page numbers are those of the body pages ("Page N")
+    entries = [f"{title} {'.' * 12} {i + 1}" for i, title in _section_starts(n_pages)]
+    per_page = lines_per_page - 1
+    return [
+        ["TABLE OF CONTENTS"] + entries[start:start + per_page]
+        for start in range(0, len(entries), per_page)
+    ]
+
+
+def make_rhp_pdf(
+    n_pages: int,
+    lines_per_page: int = 45,
+    seed: int = 7,
+    revised_pages: Iterable[int] = (),
+    toc: bool = False,
+    outline: bool = False,
+    scanned_pages: Iterable[int] = (),
+    scan_dpi: int = 150,
+) -> bytes:
+    """
+    Build an n-page PDF with Helvetica text content streams.
+    Pages listed in revised_pages get an extra line, as in an addendum to an
+    earlier filing; every other page is byte-identical to the unrevised PDF.
+    toc prepends unnumbered table-of-contents pages listing every section
+    start; outline adds a bookmark (in title case) for each.
+    Pages listed in scanned_pages are grayscale images of the same page at
+    scan_dpi, with no text layer, as in a scanned annexure.
+    """
+    rng = random.Random(seed)
+    revised = set(revised_pages)
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+
+    def add(num: int, body: bytes) -> None:
+        offsets[num] = len(out)
+        out.extend(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    pages = _toc_pages(n_pages, lines_per_page) if toc else []
+    body_start = len(pages)
+    for i in range(n_pages):
+        lines = _page_lines(i, rng, lines_per_page)
+        if i in revised:
+            lines.insert(2, "This page has been updated in the addendum to the offer document.")
+        pages.append(lines)
+
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    outline_id = 4 + 2 * len(pages)
+    catalog = "<< /Type /Catalog /Pages 2 0 R"
+    catalog += f" /Outlines {outline_id} 0 R >>" if outline else " >>"
+    add(1, catalog.encode())
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    add(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    add(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    scans = _scan_images(n_pages, lines_per_page, seed, revised, set(scanned_pages), scan_dpi)
+    # Image objects are numbered after the outline, if any
+    next_id = outline_id + (1 + len(_section_starts(n_pages)) if outline else 0)
+
+    for page_no, (lines, pid) in enumerate(zip(pages, page_ids)):
+        scan = scans.get(page_no - body_start)
+        if scan is not None:
+            width, height, pixels = scan
+            stream = b"q 595 0 0 842 0 0 cm /Im1 Do Q"
+            add(
+                pid,
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /XObject << /Im1 {next_id} 0 R >> >> /Contents {pid + 1} 0 R >>".encode(),
+            )
+            add(pid + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+            add(
+                next_id,
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceGray "
+                f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>\nstream\n".encode()
+                + pixels + b"\nendstream",
+            )
+            next_id += 1
+            continue
+        ops = " ".join(f"({_escape(line)}) '" for line in lines)
+        stream = f"BT /F1 9 Tf 40 800 Td 16 TL {ops} ET".encode("latin-1")
+        add(
+            pid,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode(),
+        )
+        add(pid + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    if outline:
+        starts = _section_starts(n_pages)
+        item_ids = [outline_id + 1 + k for k in range(len(starts))]
+        add(outline_id, f"<< /Type /Outlines /First {item_ids[0]} 0 R /Last {item_ids[-1]} 0 R /Count {len(starts)} >>".encode())
+        for k, ((i, title), item_id) in enumerate(zip(starts, item_ids)):
+            links = f" /Prev {item_ids[k - 1]} 0 R" if k else ""
+            links += f" /Next {item_ids[k + 1]} 0 R" if k + 1 < len(item_ids) else ""
+            add(
+                item_id,
+                f"<< /Title ({_escape(title.title())}) /Parent {outline_id} 0 R{links} "
+                f"/Dest [{page_ids[body_start + i]} 0 R /Fit] >>".encode("latin-1"),
+            )
+
+    size = max(offsets) + 1
+    xref_at = len(out)
+    out.extend(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+    for num in range(1, size):
+        out.extend(f"{offsets[num]:010d} 00000 n \n".encode())
+    out.extend(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode())
+    return bytes(out)
+
+
+def _scan_images(
+    n_pages: int,
+    lines_per_page: int,
+    seed: int,
+    revised: set,
+    scanned: set,
+    dpi: int,
+) -> Dict[int, Tuple[int, int, bytes]]:
+    """
+    {body page index: (width, height, Flate-compressed grayscale pixels)}
+    of the text version of each scanned page.
+    """
+    if not scanned:
+        return {}
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(make_rhp_pdf(n_pages, lines_per_page, seed, revised))
+    images = {}
+    try:
+        for i in sorted(scanned):
+            if not 0 <= i < n_pages:
+                continue
+            page = document[i]
+            image = page.render(scale=dpi / 72, grayscale=True).to_pil().convert("L")
+            page.close()
+            images[i] = (image.width, image.height, zlib.compress(image.tobytes()))
+    finally:
+        document.close()
+    return images
+
+
+def make_rhp_text(n_pages: int, lines_per_page: int = 45, seed: int = 7) -> str:
+    """
+    The text make_rhp_pdf would yield after extraction, without building a PDF.
+    """
+    rng = random.Random(seed)
+    return "".join(
+        "\n".join(_page_lines(i, rng, lines_per_page)) + "\n" for i in range(n_pages)
+    )
@@ -0,0 +1,73 @@
+import asyncio
+import copy
+
+import pytest
+
+from app.models.ipo import IPOAnalysisRequest
+from app.services import analysis_pipeline
+from app.services.cache_service import analysis_cache
+from app.services.llm_service import LLMError
+from app.services.similarity_index import NearDuplicate
+from benchmarks.fake_llm import FAKE_ANALYSIS
+
+
+def _run(monkeypatch, financial_metrics, stored_analysis, llm_result=FAKE_ANALYSIS, cache_key="key", signature=None):
+    calls = []
+
+    async def extract_inputs(spooled, progress):
+        return "RHP text", financial_metrics
+
+    async def find_near_duplicate(rhp_text, context):
+        if stored_analysis is None:
+            return signature, None
+        return signature, NearDuplicate("earlier", 1.0, [], stored_analysis)
+
+    async def full_analysis(rhp_text, ipo_data, progress=None, financial_metrics=None):
+        calls.append("full")
+        return copy.deepcopy(llm_result)
+
+    monkeypatch.setattr(analysis_pipeline, "_extract_inputs", extract_inputs)
+    monkeypatch.setattr(analysis_pipeline, "_find_near_duplicate", find_near_duplicate)
+    monkeypatch.setattr(analysis_pipeline, "request_ipo_analysis_async", full_analysis)
+    paths = []
+    result = asyncio.run(analysis_pipeline._analyze_uncached(
+        None, IPOAnalysisRequest(), cache_key, lambda stage, details: paths.append(details.get("path")),
+    ))
+    return result, calls, paths[-1]
+
+
+def test_reused_analysis_without_metrics_runs_full_analysis(monkeypatch):
+    stored = {key: value for key, value in FAKE_ANALYSIS.items() if key != "financial_metrics"}
+    result, calls, path = _run(monkeypatch, None, stored)
+    assert calls == ["full"] and path == "full"
+    assert result["financial_metrics"] == FAKE_ANALYSIS["financial_metrics"]
+
+
+def test_reused_analysis_takes_this_documents_metrics(monkeypatch):
+    stored = {key: value for key, value in FAKE_ANALYSIS.items() if key != "financial_metrics"}
+    metrics = dict(FAKE_ANALYSIS["financial_metrics"], total_revenue=1.0)
+    result, calls, path = _run(monkeypatch, metrics, stored)
+    assert calls == [] and path == "near_duplicate_rules"
+    assert result["financial_metrics"]["total_revenue"] == 1.0
+
+
+def test_invalid_analysis_is_not_cached(monkeypatch):
+    llm_result = copy.deepcopy(FAKE_ANALYSIS)
+    del llm_result["scores"]["demand_strength"]
+    with pytest.raises(LLMError):
+        _run(monkeypatch, None, None, llm_result, cache_key="invalid")
+    assert analysis_cache.get("invalid") is None
+
+
+def test_only_valid_analyses_are_indexed(monkeypatch):
+    from app.services.similarity_index import similarity_index
+
+    added = []
+    monkeypatch.setattr(similarity_index, "add", lambda *args: added.append(args))
+    llm_result = {key: value for key, value in FAKE_ANALYSIS.items() if key != "final_comment"}
+    with pytest.raises(LLMError):
+        _run(monkeypatch, None, None, llm_result, cache_key="unindexed", signature="signature")
+    assert added == []
+
+    _run(monkeypatch, None, None, cache_key="indexed", signature="signature")
+    assert [args[0] for args in added] == ["indexed"]
@@ -0,0 +1,26 @@
+import asyncio
+import copy
+
+from app.models.ipo import BatchAnalysisResponse, IPOAnalysisRequest
+from app.services import batch_service
+from app.services.pdf_service import SpooledPDF
+from benchmarks.fake_llm import FAKE_ANALYSIS
+
+
+def test_invalid_document_fails_only_its_row(monkeypatch):
+    async def run_analysis(spooled, ipo_data, progress=None, llm_slots=None):
+        progress("pages_extracted", {"total_pages": 10})
+        result = copy.deepcopy(FAKE_ANALYSIS)
+        if spooled.filename == "bad.pdf":
+            del result["scores"]["demand_strength"]
+        return result
+
+    monkeypatch.setattr(batch_service, "run_analysis", run_analysis)
+    documents = [SpooledPDF(f"/tmp/{name}", "0" * 64, 0, name, owned=False) for name in ("good.pdf", "bad.pdf")]
+    batch = asyncio.run(batch_service.analyze_batch(documents, IPOAnalysisRequest()))
+
+    response = BatchAnalysisResponse(**batch)
+    assert response.succeeded == 1
+    good, bad = response.items
+    assert good.filename == "good.pdf" and good.pages == 10 and good.result is not None
+    assert bad.filename == "bad.pdf" and "demand_strength" in bad.error
@@ -0,0 +1,24 @@
+from app.core.config import settings
+from app.models.ipo import IPOAnalysisRequest
+from app.services.cache_service import make_cache_key, make_context_key
+from app.services.llm_service import get_llm_models
+
+
+def _keys():
+    ipo_data = IPOAnalysisRequest()
+    return make_cache_key("0" * 64, ipo_data, get_llm_models()), make_context_key(ipo_data, get_llm_models())
+
+
+def test_keys_follow_the_provider_chain(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "gemini")
+    monkeypatch.setattr(settings, "LLM_PROVIDER_CHAIN", ["gemini", "groq"])
+    assert get_llm_models() == [f"gemini:{settings.GEMINI_MODEL}", f"groq:{settings.GROQ_MODEL}"]
+    chained = _keys()
+
+    # A fallback provider's model changes the keys...
+    monkeypatch.setattr(settings, "GROQ_MODEL", "another-model")
+    assert _keys()[0] != chained[0] and _keys()[1] != chained[1]
+
+    # ...and so does LLM_PROVIDER_CHAIN with LLM_PROVIDER unchanged
+    monkeypatch.setattr(settings, "LLM_PROVIDER_CHAIN", ["groq", "gemini"])
+    assert _keys()[0] != chained[0]
@@ -0,0 +1,21 @@
+from app.services.financial_tables import _header_years, parse_statement_rows
+
+
+def test_header_with_stub_period_keeps_full_years():
+    assert _header_years("Particulars Sep 30, 2024 March 31, 2024 March 31, 2023") == [None, "FY2024", "FY2023"]
+    assert _header_years("Particulars 2024 2024 2023") == [None, "FY2024", "FY2023"]
+    assert _header_years("Particulars Fiscal 2024 Fiscal 2023") == ["FY2024", "FY2023"]
+    # One fiscal year is not a header
+    assert _header_years("Sep 30, 2024 March 31, 2024") == []
+
+
+def test_statement_with_stub_period_column():
+    rows = [
+        ["Particulars", "Sep 30, 2024", "March 31, 2024", "March 31, 2023", "March 31, 2022"],
+        ["Revenue from operations", "80.0", "150.0", "120.0", "100.0"],
+        ["Restated profit for the year", "8.0", "15.0", "12.0", "(2.0)"],
+    ]
+    parsed = parse_statement_rows(rows)
+    assert parsed["years"] == ["FY2022", "FY2023", "FY2024"]
+    assert list(parsed["revenue"]) == [100.0, 120.0, 150.0]
+    assert list(parsed["profit"]) == [-2.0, 12.0, 15.0]
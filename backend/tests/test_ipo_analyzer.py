@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.services import ipo_analyzer
+from app.services.rhp_sections import RHPSection
+
+
+def _chunks(n):
+    return [RHPSection(f"section_{i}", f"Section {i}", i * 10, i * 10 + 10) for i in range(n)]
+
+
+def test_map_sections_propagates_cancellation(monkeypatch):
+    async def call_llm_async(prompt):
+        if "Section 1" in str(prompt):
+            raise asyncio.CancelledError()
+        return {"summary": "ok"}
+
+    monkeypatch.setattr(ipo_analyzer, "call_llm_async", call_llm_async)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(ipo_analyzer._map_sections("x" * 30, _chunks(3)))
+
+
+def test_map_sections_skips_failed_chunks(monkeypatch):
+    async def call_llm_async(prompt):
+        if "Section 1" in str(prompt):
+            raise ipo_analyzer.LLMError("bad JSON")
+        return {"summary": "ok"}
+
+    monkeypatch.setattr(ipo_analyzer, "call_llm_async", call_llm_async)
+    notes = asyncio.run(ipo_analyzer._map_sections("x" * 30, _chunks(3)))
+    assert len(notes) == 2
@@ -0,0 +1,87 @@
+import asyncio
+import copy
+import time
+
+from app.models.ipo import IPOAnalysisRequest
+from app.services import job_service
+from app.services.job_service import JobManager, JobStore
+from app.services.pdf_service import SpooledPDF
+from benchmarks.fake_llm import FAKE_ANALYSIS
+
+
+def test_unwritable_store_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = JobStore(str(blocker / "jobs.sqlite3"))
+
+    store.create("job", "rhp.pdf")
+    assert store.path == ":memory:"
+    assert store.get("job")["status"] == "queued"
+
+
+def test_cancelled_job_publishes_terminal_event(tmp_path, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(spooled, ipo_data, progress=None):
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(job_service, "run_analysis", hang)
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1, max_queue_depth=4)
+
+    async def scenario():
+        await manager.start()
+        job_id = await manager.submit(SpooledPDF(str(tmp_path / "rhp.pdf"), "0" * 64, 0, owned=False), IPOAnalysisRequest())
+        stages = []
+
+        async def follow():
+            async for event in manager.events(job_id, heartbeat=1):
+                stages.append(event["stage"])
+
+        follower = asyncio.create_task(follow())
+        await started.wait()
+        await manager.stop()
+        await asyncio.wait_for(follower, timeout=5)
+        return job_id, stages
+
+    job_id, stages = asyncio.run(scenario())
+    assert stages[-1] == "failed"
+    assert manager.store.get(job_id)["error"] == "Cancelled"
+
+
+def test_invalid_result_fails_the_job(tmp_path, monkeypatch):
+    async def invalid(spooled, ipo_data, progress=None):
+        result = copy.deepcopy(FAKE_ANALYSIS)
+        del result["scores"]["demand_strength"]
+        return result
+
+    monkeypatch.setattr(job_service, "run_analysis", invalid)
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1, max_queue_depth=4)
+
+    async def scenario():
+        await manager.start()
+        job_id = await manager.submit(SpooledPDF(str(tmp_path / "rhp.pdf"), "0" * 64, 0, owned=False), IPOAnalysisRequest())
+        stages = [event["stage"] async for event in manager.events(job_id, heartbeat=1)]
+        job = await manager.get(job_id)
+        await manager.stop()
+        return stages, job
+
+    stages, job = asyncio.run(scenario())
+    assert stages[-1] == "failed"
+    assert job["status"] == "failed" and "demand_strength" in job["error"]
+
+
+def test_prune_deletes_only_old_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    for job_id in ("old", "running", "recent"):
+        store.create(job_id, None)
+        store.add_event(job_id, "started", {})
+    store.finish("old", "completed", {})
+    time.sleep(0.01)
+    cutoff = time.time()
+    time.sleep(0.01)
+    store.finish("recent", "failed", {})
+
+    assert store.prune(cutoff) == 1
+    assert store.get("old") is None and store.events("old") == []
+    assert store.get("running") is not None and store.get("recent") is not None
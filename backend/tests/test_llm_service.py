@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service
+from app.services.llm_service import LLMProvider, get_circuit_breaker, register_provider
+
+
+def _half_open(name):
+    breaker = get_circuit_breaker(name)
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = breaker.clock() - breaker.reset_seconds
+    return breaker
+
+
+def _slow_provider():
+    async def call(prompt):
+        await asyncio.sleep(10)
+        return {}
+
+    async def stream(prompt):
+        yield "{"
+        await asyncio.sleep(10)
+
+    return LLMProvider(call, stream=stream)
+
+
+def test_cancelled_trial_call_releases_breaker():
+    register_provider("slow", _slow_provider())
+    breaker = _half_open("slow")
+
+    async def cancel_call():
+        task = asyncio.create_task(llm_service._call_provider_async("slow", "prompt"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancel_call())
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_closed_stream_releases_breaker(monkeypatch):
+    register_provider("slow", _slow_provider())
+    breaker = _half_open("slow")
+    monkeypatch.setattr(settings, "LLM_PROVIDER_CHAIN", ["slow"])
+
+    async def disconnect():
+        stream = llm_service.stream_llm_async("prompt")
+        assert await stream.__anext__() == "{"
+        await stream.aclose()
+
+    asyncio.run(disconnect())
+    assert breaker.allow()
+
+
+def test_sync_calls_share_the_rate_limit(monkeypatch):
+    calls = []
+    register_provider("counted", LLMProvider(None, call_sync=lambda prompt: calls.append(prompt) or {}))
+    monkeypatch.setattr(settings, "LLM_PROVIDER_CHAIN", ["counted"])
+    # 600 RPM with the bucket drained: the next request waits ~0.1 s
+    limiter = llm_service.RateLimiter(requests_per_minute=600)
+    limiter.requests.level = 0
+    monkeypatch.setitem(llm_service._rate_limiters, "counted", limiter)
+
+    started = time.perf_counter()
+    llm_service.call_llm("prompt")
+    assert calls == ["prompt"]
+    assert time.perf_counter() - started >= 0.08
+
+
+def test_configuration_errors_fail_fast(monkeypatch):
+    calls = []
+
+    async def call(prompt):
+        calls.append(prompt)
+        raise llm_service.LLMConfigError("API key is not set")
+
+    register_provider("unconfigured", LLMProvider(call))
+    monkeypatch.setattr(settings, "LLM_MAX_ATTEMPTS", 3)
+
+    with pytest.raises(llm_service.LLMConfigError):
+        asyncio.run(llm_service._call_provider_async("unconfigured", "prompt"))
+    assert calls == ["prompt"]
+    assert get_circuit_breaker("unconfigured").failures == 0
+
+
+def test_streamed_json_errors_name_the_answering_provider(monkeypatch):
+    async def failing_stream(prompt):
+        raise llm_service.LLMError("down")
+        yield
+
+    async def answering_stream(prompt):
+        yield "not json"
+
+    register_provider("primary", LLMProvider(None, stream=failing_stream))
+    register_provider("fallback", LLMProvider(None, stream=answering_stream))
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "primary")
+    monkeypatch.setattr(settings, "LLM_PROVIDER_CHAIN", ["primary", "fallback"])
+
+    async def collect():
+        answered = []
+        text = "".join([chunk async for chunk in llm_service.stream_llm_async("prompt", on_provider=answered.append)])
+        return text, answered
+
+    text, answered = asyncio.run(collect())
+    assert answered == ["fallback"]
+    with pytest.raises(llm_service.LLMError, match="from Fallback"):
+        llm_service.parse_llm_json(text, answered[0])
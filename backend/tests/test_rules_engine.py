@@ -0,0 +1,67 @@
+from app.services.rules_engine import CompiledRules, KeywordRule, apply_rules_layer
+
+
+def _substring_counts(rules, texts):
+    # The original per-term `text.lower().count(term)` evaluation
+    return {
+        rule.name: sum(texts.get(rule.field, "").lower().count(term) for term in rule.terms)
+        for rule in rules
+    }
+
+
+def _rule(name, *terms, min_count=1):
+    return KeywordRule(name=name, field="financial_analysis", terms=terms, min_count=min_count)
+
+
+OVERLAPPING_RULES = [
+    _rule("a", "loss"),
+    _rule("b", "losses", "loss making"),
+    _rule("c", "risk"),
+    _rule("d", "high risk", "risky"),
+    _rule("e", "ana", min_count=2),
+]
+
+TEXT = (
+    "Losses narrowed, a loss making unit and one-off losses. "
+    "A high risk, risky business with high risks. Banana bandana."
+)
+
+
+def test_counts_match_substring_counting_for_overlapping_terms():
+    texts = {"financial_analysis": TEXT}
+    compiled = CompiledRules(OVERLAPPING_RULES)
+    counts = compiled.count_terms(texts)["financial_analysis"]
+
+    expected = _substring_counts(OVERLAPPING_RULES, texts)
+    assert {rule.name: sum(counts[term] for term in rule.terms) for rule in OVERLAPPING_RULES} == expected
+    assert counts["loss"] == 3 and counts["losses"] == 2
+    assert counts["risk"] == 3
+    # Like str.count, "banana" holds one "ana", not two
+    assert counts["ana"] == 2
+
+
+def test_contained_terms_all_fire():
+    texts = {"financial_analysis": TEXT}
+    fired = {rule.name for rule in CompiledRules(OVERLAPPING_RULES).fired(texts)}
+    expected = {name for name, count in _substring_counts(OVERLAPPING_RULES, texts).items() if count}
+    assert fired == expected == {"a", "b", "c", "d", "e"}
+
+
+def test_overlapping_terms_reach_min_count():
+    # "losses" also holds "loss": two mentions are four hits, as before
+    rules = CompiledRules([
+        KeywordRule(
+            name="losses",
+            field="key_risks",
+            terms=("loss", "losses"),
+            min_count=4,
+            score_key="financial_strength",
+            score_range=(2, 5),
+        ),
+    ])
+    result = apply_rules_layer(
+        {"key_risks": ["Losses in FY23", "Further losses expected"], "scores": {"financial_strength": 8}},
+        {"sub_qib": 1.0},
+        rules=rules,
+    )
+    assert result["scores"]["financial_strength"] == 5